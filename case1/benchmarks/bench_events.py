@@ -0,0 +1,91 @@
+"""
+Benchmark: parsing of the match event columns
+
+Compares ast.literal_eval plus splitting each goal on "|" (the previous
+ResultsService parsing) against services.events, over every event cell of
+the matches file. Caches are cleared before each round, so the times are
+for cells never seen before. Both parsers must give the same events.
+
+Usage (from case1/):
+    python -m benchmarks.bench_events [matches csv path or URL]
+"""
+
+import ast
+import sys
+import time
+
+import pandas as pd
+from services.events import event_fields, parse_event_list
+from services.results import EVENT_COLUMNS
+
+URL_MATCHES = "https://raw.githubusercontent.com/daramireh/simonBolivarCienciaDatos/refs/heads/main/matches_1991_2023.csv"
+ROUNDS = 5
+
+
+def literal_events(x) -> list:
+    if not isinstance(x, str):
+        return []
+    try:
+        parsed = ast.literal_eval(x)
+    except (ValueError, SyntaxError):
+        return []
+    return parsed if isinstance(parsed, list) else []
+
+
+def baseline(cells: dict) -> dict:
+    parsed = {}
+    for column, values in cells.items():
+        events = [literal_events(x) for x in values]
+        if EVENT_COLUMNS[column][1] == "goal":
+            events = [[e.split("|")[2].strip() for e in cell] for cell in events]
+        parsed[column] = events
+    return parsed
+
+
+def fast(cells: dict) -> dict:
+    parse_event_list.cache_clear()
+    parsed = {}
+    for column, values in cells.items():
+        events = [parse_event_list(x) if isinstance(x, str) else () for x in values]
+        if EVENT_COLUMNS[column][1] == "goal":
+            players = iter(
+                event_fields([e for cell in events for e in cell], "goal")["player"]
+            )
+            events = [[next(players) for _ in cell] for cell in events]
+        else:
+            events = [list(cell) for cell in events]
+        parsed[column] = events
+    return parsed
+
+
+def best_ms(fn, cells) -> float:
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn(cells)
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else URL_MATCHES
+    matches = pd.read_csv(source)
+    columns = [
+        column
+        for column, (_, kind) in EVENT_COLUMNS.items()
+        if kind != "penalty_goal" and column in matches
+    ]
+    cells = {column: matches[column].tolist() for column in columns}
+    n_cells = sum(len(values) for values in cells.values())
+
+    assert baseline(cells) == fast(cells)
+    baseline_ms = best_ms(baseline, cells)
+    fast_ms = best_ms(fast, cells)
+    print(f"{len(matches):,} matches, {n_cells:,} event cells")
+    print(f"{'literal_eval':<16} {baseline_ms:>10.1f} ms")
+    print(f"{'services.events':<16} {fast_ms:>10.1f} ms")
+    print(f"{'speedup':<16} {baseline_ms / fast_ms:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,14 @@
 # import matplotlib.pyplot as plt
 import pandas as pd
 from services.analysis import AnalysisService
-from services.results import ResultsService
+from services.dataset import FifaDataset
+from services.results import DATA_COLUMNS, ResultsService
 
-url_wc = "https://raw.githubusercontent.com/daramireh/simonBolivarCienciaDatos/refs/heads/main/world_cup_women.csv"
-url_matches = "https://raw.githubusercontent.com/daramireh/simonBolivarCienciaDatos/refs/heads/main/matches_1991_2023.csv"
-
-world_cup = pd.read_csv(url_wc)
-matches = pd.read_csv(url_matches)
+# Downloaded once into the local cache (case1/.cache)
+dataset = FifaDataset()
+world_cup = dataset.world_cup()
+matches = dataset.matches()
+results_data = dataset.matches(columns=DATA_COLUMNS)
 
 analysis_wc = AnalysisService(world_cup)
 analysis_matches = AnalysisService(matches)
@@ -17,19 +18,16 @@ analysis_matches.summary()
 
 AnalysisService.related_columns(world_cup, matches)
 
-matches_1991 = matches[matches["Year"] == 1991].copy()
-
-results = ResultsService(matches_1991)
-table_1991 = results.get_results()
+# Standings of every tournament are computed once
+results = ResultsService(results_data)
+table_1991 = results.get_results(year=1991)
 print(table_1991)
 
-matches_2023 = matches[matches["Year"] == 2023].copy()
+matches_2023 = results_data[results_data["Year"] == 2023].copy()
 
-results = ResultsService(matches_2023)
-top_scorers_2023 = results.top_scorers()
+top_scorers_2023 = ResultsService(matches_2023).top_scorers()
 print(top_scorers_2023)
 
-results = ResultsService(matches)
 summary = results.world_cup_summary()
 print(summary)
 
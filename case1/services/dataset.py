@@ -0,0 +1,209 @@
+import hashlib
+import io
+import json
+import os
+import urllib.request
+from pathlib import Path
+
+import pandas as pd
+from services.events import parse_event_list
+from services.results import EVENT_COLUMNS
+
+BASE_URL = "https://raw.githubusercontent.com/daramireh/simonBolivarCienciaDatos/refs/heads/main"
+SOURCES = {
+    "world_cup": f"{BASE_URL}/world_cup_women.csv",
+    "matches": f"{BASE_URL}/matches_1991_2023.csv",
+}
+CACHE_DIR = Path(
+    os.getenv("FIFA_CACHE_DIR", Path(__file__).resolve().parent.parent / ".cache")
+)
+# Bump when the ingest (dtypes, parsing, layout) changes, so old caches are
+# rebuilt
+CACHE_VERSION = 2
+
+# Explicit dtypes of the known columns, the rest keep the inferred ones.
+# Integer dtypes are only applied to columns read as numbers
+DTYPES = {
+    "world_cup": {
+        "Year": "Int16",
+        "Host": "category",
+        "Champion": "category",
+        "Runner-Up": "category",
+        "Teams": "Int8",
+        "Matches": "Int16",
+        "Attendance": "Int32",
+    },
+    "matches": {
+        "Year": "Int16",
+        "Host": "category",
+        "Attendance": "Int32",
+        "home_score": "Int8",
+        "away_score": "Int8",
+    },
+}
+# Columns sharing one categorical dtype, so they concatenate and compare
+TEAM_COLUMNS = {"world_cup": [], "matches": ["home_team", "away_team"]}
+# List columns stored as tuples of events (None for missing cells)
+LIST_COLUMNS = {
+    "world_cup": [],
+    "matches": [
+        column for column, (_, kind) in EVENT_COLUMNS.items() if kind != "penalty_goal"
+    ],
+}
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _read_source(source: str) -> bytes:
+    if source.startswith(("http://", "https://")):
+        with urllib.request.urlopen(source) as response:
+            return response.read()
+    return Path(source).read_bytes()
+
+
+class FifaDataset:
+    def __init__(self, cache_dir=CACHE_DIR, sources: dict = None):
+        self.cache_dir = Path(cache_dir)
+        self.sources = {**SOURCES, **(sources or {})}
+
+    def world_cup(self, columns: list = None, refresh: bool = False) -> pd.DataFrame:
+        return self.load("world_cup", columns, refresh)
+
+    def matches(self, columns: list = None, refresh: bool = False) -> pd.DataFrame:
+        return self.load("matches", columns, refresh)
+
+    def load(self, name: str, columns: list = None, refresh: bool = False):
+        # The CSV is only read when the cache is missing, stale or corrupt.
+        # Each column is a file of its own, so only the requested ones are
+        # read and verified
+        manifest = self._manifest(name)
+        df = None if refresh else self._cached(name, manifest, columns)
+        if df is None:
+            manifest = self.ingest(name)
+            df = self._cached(name, manifest, columns)
+        return df
+
+    def source_file(self, name: str, refresh: bool = False) -> Path:
+        # Local copy of the source CSV, downloaded once
+        manifest = self._manifest(name)
+        if refresh or self._cached_source(name, manifest) is None:
+            manifest = self.ingest(name, refresh)
+        return self.cache_dir / manifest["source_file"]
+
+    def ingest(self, name: str, refresh: bool = False) -> dict:
+        # Typed copy of the source, which is only downloaded again on
+        # refresh or when the local copy doesn't match its checksum
+        source = self.sources[name]
+        raw = None if refresh else self._cached_source(name, self._manifest(name))
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        source_file = f"{name}.csv"
+        if raw is None:
+            raw = _read_source(source)
+            self._write(source_file, raw)
+
+        df = self._typed(name, pd.read_csv(io.BytesIO(raw)))
+        directory = f"{name}.v{CACHE_VERSION}"
+        (self.cache_dir / directory).mkdir(exist_ok=True)
+        files = {}
+        for i, (column, values) in enumerate(df.items()):
+            file = f"{directory}/{i}.pkl"
+            data = self._serialize(values)
+            self._write(file, data)
+            files[column] = {"file": file, "sha256": _sha256(data)}
+
+        manifest = {
+            "version": CACHE_VERSION,
+            "source": source,
+            "source_file": source_file,
+            "source_sha256": _sha256(raw),
+            "rows": len(df),
+            "columns": files,
+            "dtypes": {column: str(dtype) for column, dtype in df.dtypes.items()},
+        }
+        self._write(f"{name}.json", json.dumps(manifest, indent=2).encode())
+        return manifest
+
+    def _write(self, file: str, data: bytes):
+        tmp = self.cache_dir / f"{file}.tmp"
+        tmp.write_bytes(data)
+        os.replace(tmp, self.cache_dir / file)
+
+    def _manifest(self, name: str):
+        try:
+            return json.loads((self.cache_dir / f"{name}.json").read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _cached(self, name: str, manifest, columns: list = None):
+        # Frame of the requested columns, or None when the cache is stale or
+        # one of their files doesn't match the manifest
+        if not manifest or manifest.get("version") != CACHE_VERSION:
+            return None
+        if manifest.get("source") != self.sources[name]:
+            return None
+        files = manifest["columns"]
+        columns = list(files) if columns is None else list(columns)
+        missing = [column for column in columns if column not in files]
+        if missing:
+            raise KeyError(f"Columns not in {name}: {missing}")
+
+        series = {}
+        for column in columns:
+            data = self._read_verified(files[column]["file"], files[column]["sha256"])
+            if data is None:
+                return None
+            series[column] = pd.read_pickle(io.BytesIO(data), compression=None)
+        return pd.DataFrame(series, index=pd.RangeIndex(manifest["rows"]))
+
+    def _cached_source(self, name: str, manifest):
+        if not manifest or manifest.get("source") != self.sources[name]:
+            return None
+        return self._read_verified(
+            manifest.get("source_file"), manifest.get("source_sha256")
+        )
+
+    def _read_verified(self, file: str, sha256: str):
+        # File contents, or None when missing or not matching the checksum
+        if file is None:
+            return None
+        try:
+            data = (self.cache_dir / file).read_bytes()
+        except OSError:
+            return None
+        return data if _sha256(data) == sha256 else None
+
+    @staticmethod
+    def _typed(name: str, df: pd.DataFrame) -> pd.DataFrame:
+        for column, dtype in DTYPES[name].items():
+            if column not in df:
+                continue
+            if dtype == "category" or pd.api.types.is_numeric_dtype(df[column]):
+                df[column] = df[column].astype(dtype)
+
+        teams = [column for column in TEAM_COLUMNS[name] if column in df]
+        if teams:
+            categories = sorted(set().union(*(df[c].dropna() for c in teams)))
+            for column in teams:
+                df[column] = pd.Categorical(df[column], categories=categories)
+
+        for column in LIST_COLUMNS[name]:
+            if column in df:
+                df[column] = pd.Series(
+                    [
+                        parse_event_list(x) if isinstance(x, str) else None
+                        for x in df[column]
+                    ],
+                    index=df.index,
+                    dtype=object,
+                )
+        return df
+
+    @staticmethod
+    def _serialize(values: pd.Series) -> bytes:
+        # pandas' pickle keeps every dtype (categories, nullable integers and
+        # the tuples of the list columns) with no dependency beyond pandas
+        buffer = io.BytesIO()
+        values.to_pickle(buffer, compression=None)
+        return buffer.getvalue()
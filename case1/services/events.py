@@ -0,0 +1,93 @@
+import ast
+import re
+import warnings
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# A list display of plain string literals (no escapes, prefixes, implicit
+# concatenation or line breaks) is split with regexes; anything else is left
+# to ast.literal_eval, so both paths give the same result
+_STRING = r"""'[^'\\\n\r\x00\ud800-\udfff]*'|"[^"\\\n\r\x00\ud800-\udfff]*\""""
+_STRING_LIST = re.compile(rf"\[ *(?:(?:{_STRING}) *(?:, *(?:{_STRING}) *)*,? *)?\]")
+_STRING_ITEM = re.compile(r"""'([^']*)'|"([^"]*)\"""")
+
+# Goals are "minute|score|player[|Assist:name]" and cards also start with
+# the minute; penalty goals are parsed into player names
+_MINUTE = re.compile(r"\s*(\d{1,3})(?!\d)")
+ASSIST_MARK = "Assist:"
+
+
+@lru_cache(maxsize=1 << 16)
+def parse_event_list(text: str) -> tuple:
+    # Same result as ast.literal_eval for a list, () for anything else.
+    # Cached, so each distinct cell is parsed once per process
+    if _STRING_LIST.fullmatch(text):
+        return tuple(single or double for single, double in _STRING_ITEM.findall(text))
+    return literal_event_list(text)
+
+
+def literal_event_list(text: str) -> tuple:
+    # ast.literal_eval of a list cell, () for anything else. Invalid escapes
+    # such as "\:" in the scraped names are kept as they are, without the
+    # warning the compiler emits for each of them
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=DeprecationWarning)
+            warnings.simplefilter("ignore", category=SyntaxWarning)
+            parsed = ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return ()
+    return tuple(parsed) if isinstance(parsed, list) else ()
+
+
+def parse_penalty_goals(text: str) -> list:
+    return [event.split("·")[0].replace("(P)", "").strip() for event in text.split("|")]
+
+
+def _minutes(events: list) -> pd.arrays.IntegerArray:
+    minutes = [_MINUTE.match(event) for event in events]
+    values = np.array(
+        [int(minute.group(1)) if minute else -1 for minute in minutes], dtype=np.int16
+    )
+    return pd.arrays.IntegerArray(values, values < 0)
+
+
+def _assist(event: str):
+    start = event.index(ASSIST_MARK) + len(ASSIST_MARK)
+    end = event.find("|", start)
+    return event[start : end if end >= 0 else None].strip()
+
+
+def event_fields(events: list, kind: str) -> pd.DataFrame:
+    # Typed minute, player and assist columns of the events of one kind,
+    # extracted column by column. Fields that are absent or malformed are
+    # missing values
+    n = len(events)
+    if kind == "penalty_goal":
+        minutes = pd.array([pd.NA] * n, dtype="Int16")
+        players = list(events)
+        assists = [None] * n
+        return _fields_frame(minutes, players, assists)
+
+    events = [event if isinstance(event, str) else "" for event in events]
+    if kind == "goal":
+        minutes = _minutes(events)
+        fields = [event.split("|", 3) for event in events]
+        players = [field[2].strip() if len(field) > 2 else None for field in fields]
+        assists = [_assist(event) if ASSIST_MARK in event else None for event in events]
+    else:
+        minutes = _minutes(events)
+        players = assists = [None] * n
+    return _fields_frame(minutes, players, assists)
+
+
+def _fields_frame(minutes, players: list, assists: list) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "minute": minutes,
+            "player": pd.Series(players, dtype=object),
+            "assist": pd.Series(assists, dtype=object),
+        }
+    )
@@ -1,63 +1,217 @@
-import ast
+from functools import cached_property
 
+import numpy as np
 import pandas as pd
+from services.events import event_fields, parse_event_list, parse_penalty_goals
+
+# Event columns of the matches data: column -> (team column, event kind)
+EVENT_COLUMNS = {
+    "home_goal_long": ("home_team", "goal"),
+    "away_goal_long": ("away_team", "goal"),
+    "home_penalty_goal": ("home_team", "penalty_goal"),
+    "away_penalty_goal": ("away_team", "penalty_goal"),
+    "home_yellow_card_long": ("home_team", "yellow_card"),
+    "away_yellow_card_long": ("away_team", "yellow_card"),
+    "home_red_card": ("home_team", "red_card"),
+    "away_red_card": ("away_team", "red_card"),
+}
+GOAL_COLUMNS = ["home_goal_long", "away_goal_long"]
+PENALTY_COLUMNS = ["home_penalty_goal", "away_penalty_goal"]
+# Columns of the matches data read by ResultsService
+DATA_COLUMNS = [
+    "Year",
+    "Host",
+    "Attendance",
+    "home_team",
+    "away_team",
+    "home_score",
+    "away_score",
+    *EVENT_COLUMNS,
+]
+# Keys of the running sums every table is computed from
+TOTAL_KEYS = ["Year", "Host", "team"]
 
 
 class ResultsService:
     def __init__(self, data: pd.DataFrame):
-        self.data = data
-        self.base_matches = self._build_base_matches()
-        self.matches = self._build_results_matches()
+        # Parsed rows of each added frame, concatenated only when read
+        self._parts = []
+        self._n_rows = 0
+        # Running sums per (Year, Host, team) and scorer counts per goal
+        # column, which get_results, world_cup_summary and top_scorers read
+        self._totals = None
+        self._scorers = {}
+        self._n_events = {}
+        self._malformed_goals = {column: [] for column in GOAL_COLUMNS}
+        self.add_matches(data)
+
+    def add_matches(self, data: pd.DataFrame):
+        # Parses only the new rows and merges their sums into the running
+        # ones. The results are the same as building the service on all the
+        # matches concatenated.
+        if self._parts and set(data.columns) != set(self._parts[0]["data"].columns):
+            raise ValueError("New matches must have the same columns as the data")
+
+        events = self._build_events(data)
+        base_matches = self._build_base_matches(data)
+        matches = self._build_results_matches(data, base_matches, events)
+
+        self._totals = self._merge_sums(
+            self._totals, self._group_totals(data, matches, events)
+        )
+        for column, counts in self._count_scorers(events).items():
+            self._scorers[column] = self._merge_sums(
+                self._scorers.get(column),
+                counts,
+                {"count": ("count", "sum"), "first": ("first", "min")},
+            )
+        for column in self._malformed_goals:
+            goals = events[(events["source"] == column) & events["team"].notna()]
+            self._malformed_goals[column] += goals.loc[
+                goals["player"].isna(), "event"
+            ].tolist()
+
+        events["match"] += self._n_rows
+        self._parts.append(
+            {
+                "data": data,
+                "events": events,
+                "base_matches": base_matches,
+                "matches": matches,
+            }
+        )
+        self._n_rows += len(data)
+        self._invalidate()
+
+    def _invalidate(self):
+        # Drops the frames cached by the properties below, which are rebuilt
+        # from the parts on their next read
+        for name in ("data", "events", "base_matches", "matches", "standings"):
+            try:
+                delattr(self, name)
+            except AttributeError:
+                pass
+
+    @cached_property
+    def data(self) -> pd.DataFrame:
+        if len(self._parts) == 1:
+            return self._parts[0]["data"]
+        return pd.concat([part["data"] for part in self._parts])
+
+    @cached_property
+    def events(self) -> pd.DataFrame:
+        # Tidy table with one row per event of the event columns present in
+        # the data, in column order and then match order
+        if len(self._parts) == 1:
+            return self._parts[0]["events"]
+        events = pd.concat([part["events"] for part in self._parts], ignore_index=True)
+        order = events["source"].map({c: i for i, c in enumerate(EVENT_COLUMNS)})
+        return events.iloc[np.argsort(order.to_numpy(), kind="stable")].reset_index(
+            drop=True
+        )
+
+    @cached_property
+    def base_matches(self) -> pd.DataFrame:
+        return self._concat_sides("base_matches")
+
+    @cached_property
+    def matches(self) -> pd.DataFrame:
+        return self._concat_sides("matches")
+
+    @cached_property
+    def standings(self) -> pd.DataFrame:
+        # Table of every tournament, computed in one grouped pass
+        return self._standings(["Year", "team"])
+
+    def _concat_sides(self, name: str) -> pd.DataFrame:
+        # Home rows of every part and then their away rows
+        if len(self._parts) == 1:
+            return self._parts[0][name]
+        sides = [
+            part[name].iloc[side * len(part["data"]) : (side + 1) * len(part["data"])]
+            for side in (0, 1)
+            for part in self._parts
+        ]
+        return pd.concat(sides, ignore_index=True)
 
     @staticmethod
     def _parse_events(x) -> list:
-        if pd.isna(x) or isinstance(x, list):
-            return x if isinstance(x, list) else []
+        if isinstance(x, (list, tuple)):
+            return list(x)
+        if pd.isna(x):
+            return []
         if isinstance(x, str):
-            try:
-                parsed = ast.literal_eval(x)
-                return parsed if isinstance(parsed, list) else []
-            except (ValueError, SyntaxError):
-                return []
+            return list(parse_event_list(x))
         return []
 
-    @staticmethod
-    def _count_events(x) -> int:
-        return len(ResultsService._parse_events(x))
-
     @staticmethod
     def _parse_penalty_goals(x) -> list:
         if pd.isna(x) or not isinstance(x, str):
             return []
-        return [
-            event.split("·")[0].replace("(P)", "").strip() for event in x.split("|")
+        return parse_penalty_goals(x)
+
+    def _build_events(self, data: pd.DataFrame) -> pd.DataFrame:
+        # One row per event of the event columns present in the data, in
+        # column order and then match order, with the typed fields of each
+        # event. Cells are parsed once here and every sum is built from it.
+        frames = []
+        for column, (team_col, kind) in EVENT_COLUMNS.items():
+            if column not in data:
+                continue
+            values = data[column].tolist()
+            if kind == "penalty_goal":
+                parsed = [self._parse_penalty_goals(x) for x in values]
+            else:
+                parsed = [
+                    parse_event_list(x) if isinstance(x, str) else self._parse_events(x)
+                    for x in values
+                ]
+            match = np.repeat(np.arange(len(parsed)), [len(x) for x in parsed])
+            frame = (
+                data[[team_col, "Year", "Host"]]
+                .iloc[match]
+                .rename(columns={team_col: "team"})
+                .reset_index(drop=True)
+            )
+            frame.insert(0, "match", match)
+            frame.insert(0, "kind", kind)
+            frame.insert(0, "source", column)
+            events = [event for events in parsed for event in events]
+            frame["event"] = pd.Series(events, dtype=object)
+            frames.append(frame.join(event_fields(events, kind)))
+
+        columns = [
+            "source",
+            "kind",
+            "match",
+            "team",
+            "Year",
+            "Host",
+            "event",
+            "minute",
+            "player",
+            "assist",
         ]
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)[columns]
 
-    def _explode_events(self, df, event_col, team_col, parser):
-        return (
-            df[[event_col, team_col]]
-            .dropna()
-            .assign(player=lambda x: x[event_col].apply(parser))
-            .explode("player")
-            .drop(columns=event_col)
-            .dropna()
-            .rename(columns={team_col: "team"})
-        )
+    @staticmethod
+    def _require(data: pd.DataFrame, columns: list):
+        missing = [column for column in columns if column not in data]
+        if missing:
+            raise KeyError(f"Missing event columns: {missing}")
 
-    def _count_goal_assists(self, df, goal_col, team_col):
-        return (
-            df[[goal_col, team_col, "Year", "Host"]]
-            .dropna(subset=[goal_col])
-            .assign(events=lambda x: x[goal_col].apply(self._parse_events))
-            .explode("events")
-            .assign(has_assist=lambda x: x["events"].str.contains("Assist:"))
-            .rename(columns={team_col: "team"})
-            .groupby(["Year", "Host", "team"])["has_assist"]
-            .sum()
-            .reset_index(name="assists")
-        )
+    @staticmethod
+    def _select_events(events: pd.DataFrame, columns: list) -> pd.DataFrame:
+        return events[events["source"].isin(columns)]
 
-    def _build_base_matches(self) -> pd.DataFrame:
+    @staticmethod
+    def _count_column_events(events: pd.DataFrame, column: str, n: int) -> np.ndarray:
+        match = events.loc[events["source"] == column, "match"]
+        return np.bincount(match, minlength=n)
+
+    def _build_base_matches(self, data: pd.DataFrame) -> pd.DataFrame:
         cols_home = [
             "Year",
             "Host",
@@ -89,86 +243,174 @@ class ResultsService:
             "red_cards",
         ]
 
-        home = self.data[cols_home].copy()
+        home = data[cols_home].copy()
         home.columns = cols_final
 
-        away = self.data[cols_away].copy()
+        away = data[cols_away].copy()
         away.columns = cols_final
 
         return pd.concat([home, away], ignore_index=True)
 
-    def _build_results_matches(self) -> pd.DataFrame:
-        df = self.base_matches.copy()
-        df["yellow_cards"] = df["yellow_cards"].apply(self._count_events)
-        df["red_cards"] = df["red_cards"].apply(self._count_events)
-        df["win"] = (df["goals_for"] > df["goals_against"]).astype(int)
-        df["draw"] = (df["goals_for"] == df["goals_against"]).astype(int)
-        df["loss"] = (df["goals_for"] < df["goals_against"]).astype(int)
+    def _build_results_matches(
+        self, data: pd.DataFrame, base_matches: pd.DataFrame, events: pd.DataFrame
+    ) -> pd.DataFrame:
+        df = base_matches.copy()
+        for result_col, columns in (
+            ("yellow_cards", ["home_yellow_card_long", "away_yellow_card_long"]),
+            ("red_cards", ["home_red_card", "away_red_card"]),
+        ):
+            self._require(data, columns)
+            df[result_col] = np.concatenate(
+                [self._count_column_events(events, c, len(data)) for c in columns]
+            )
+        # A missing score (NA with nullable dtypes) is no win, draw or loss
+        df["win"] = (df["goals_for"] > df["goals_against"]).fillna(False).astype(int)
+        df["draw"] = (df["goals_for"] == df["goals_against"]).fillna(False).astype(int)
+        df["loss"] = (df["goals_for"] < df["goals_against"]).fillna(False).astype(int)
         df["points"] = df["win"] * 3 + df["draw"]
         df["fair_play"] = -df["yellow_cards"] - 2 * df["red_cards"]
         return df
 
-    def get_results(self) -> pd.DataFrame:
-        results = (
-            self.matches.groupby("team")
+    def _group_totals(
+        self, data: pd.DataFrame, matches: pd.DataFrame, events: pd.DataFrame
+    ) -> pd.DataFrame:
+        # Sums per (Year, Host, team) of the new rows, missing keys included
+        # so the all-time table still counts them
+        assists = np.zeros(len(matches), dtype=np.int64)
+        if all(column in data for column in GOAL_COLUMNS):
+            goals = self._select_events(events, GOAL_COLUMNS)
+            goals = goals[goals["assist"].notna()]
+            side = (goals["source"] == GOAL_COLUMNS[1]).to_numpy()
+            assists = np.bincount(
+                goals["match"].to_numpy() + side * len(data), minlength=len(matches)
+            )
+
+        return (
+            matches.assign(assists=assists)
+            .groupby(TOTAL_KEYS, dropna=False, observed=True)
             .agg(
                 GP=("team", "count"),
                 W=("win", "sum"),
                 D=("draw", "sum"),
                 L=("loss", "sum"),
                 GF=("goals_for", "sum"),
+                GF_n=("goals_for", "count"),
                 GA=("goals_against", "sum"),
+                GA_n=("goals_against", "count"),
                 FP=("fair_play", "sum"),
                 Points=("points", "sum"),
+                assists=("assists", "sum"),
+            )
+        )
+
+    def _count_scorers(self, events: pd.DataFrame) -> dict:
+        # Goals per (player, team) of each goal column, with the position of
+        # their first goal in the column, which orders ties like value_counts
+        counts = {}
+        for column in GOAL_COLUMNS + PENALTY_COLUMNS:
+            source = self._select_events(events, [column])
+            seen = self._n_events.get(column, 0)
+            first = seen + np.arange(len(source))
+            self._n_events[column] = seen + len(source)
+            scored = (source["team"].notna() & source["player"].notna()).to_numpy()
+            counts[column] = (
+                pd.DataFrame(
+                    {
+                        "player": source["player"][scored].tolist(),
+                        "team": source["team"][scored],
+                        "first": first[scored],
+                    }
+                )
+                .groupby(["player", "team"], observed=True)
+                .agg(count=("first", "size"), first=("first", "min"))
             )
+        return counts
+
+    @staticmethod
+    def _merge_sums(current, new, aggregations: dict = None):
+        # Sums (or other aggregations) indexed by group keys; an empty side
+        # keeps the other's dtypes
+        if current is None or current.empty:
+            return new
+        if new.empty:
+            return current
+        levels = list(range(current.index.nlevels))
+        grouped = pd.concat([current, new]).groupby(
+            level=levels, dropna=False, observed=True
+        )
+        return grouped.sum() if aggregations is None else grouped.agg(**aggregations)
+
+    def _standings(self, keys: list) -> pd.DataFrame:
+        # Points, GD and fair play per group of keys, sorted by the
+        # get_results tie-break (points, then GD) within each year. The host
+        # of a tournament is its first one in key order.
+        aggregations = {
+            "GP": ("GP", "sum"),
+            "W": ("W", "sum"),
+            "D": ("D", "sum"),
+            "L": ("L", "sum"),
+            "GF": ("GF", "sum"),
+            "GA": ("GA", "sum"),
+            "FP": ("FP", "sum"),
+            "Points": ("Points", "sum"),
+        }
+        if "Year" in keys:
+            aggregations = {"Host": ("Host", "first"), **aggregations}
+        results = (
+            self._totals.reset_index()
+            .groupby(keys, observed=True)
+            .agg(**aggregations)
             .reset_index()
         )
         results["GD"] = results["GF"] - results["GA"]
-        results = results[
-            ["team", "GP", "W", "D", "L", "GF", "GA", "GD", "FP", "Points"]
-        ]
-        return results.sort_values(
-            by=["Points", "GD"], ascending=False, ignore_index=True
-        ).rename(columns={"team": "Team"})
+        columns = ["team", "GP", "W", "D", "L", "GF", "GA", "GD", "FP", "Points"]
+        order = ["Points", "GD"]
+        if "Year" in keys:
+            columns = ["Year", "Host", *columns]
+            order = ["Year", *order]
+        return (
+            results[columns]
+            .sort_values(
+                by=order,
+                ascending=[key == "Year" for key in order],
+                ignore_index=True,
+                kind="stable",
+            )
+            .rename(columns={"team": "Team"})
+        )
+
+    def get_results(self, year: int = None) -> pd.DataFrame:
+        if year is None:
+            return self._standings(["team"])
+        table = self.standings[self.standings["Year"] == year]
+        return table.drop(columns=["Year", "Host"]).reset_index(drop=True)
 
     def top_scorers(
         self, include_penalties: bool = True, top_n: int = 10
     ) -> pd.DataFrame:
-        parser = lambda x: [e.split("|")[2].strip() for e in self._parse_events(x)]
-
-        goals_play = pd.concat(
-            [
-                self._explode_events(self.data, "home_goal_long", "home_team", parser),
-                self._explode_events(self.data, "away_goal_long", "away_team", parser),
-            ],
-            ignore_index=True,
-        )
-
-        dfs = [goals_play]
+        columns = GOAL_COLUMNS + (PENALTY_COLUMNS if include_penalties else [])
+        self._require(self._parts[0]["data"], columns)
+        malformed = [
+            event for column in GOAL_COLUMNS for event in self._malformed_goals[column]
+        ]
+        if malformed:
+            raise ValueError(f"Goal events without a player: {malformed[:5]}")
 
-        if include_penalties:
-            penalties = pd.concat(
+        # Pairs in order of their first goal (by column, then match), so
+        # ties keep the order of the goal events
+        counts = (
+            pd.concat(
                 [
-                    self._explode_events(
-                        self.data,
-                        "home_penalty_goal",
-                        "home_team",
-                        self._parse_penalty_goals,
-                    ),
-                    self._explode_events(
-                        self.data,
-                        "away_penalty_goal",
-                        "away_team",
-                        self._parse_penalty_goals,
-                    ),
-                ],
-                ignore_index=True,
+                    self._scorers[column].assign(column=i)
+                    for i, column in enumerate(columns)
+                ]
             )
-            dfs.append(penalties)
-
+            .sort_values(["column", "first"], kind="stable")
+            .groupby(level=["player", "team"], observed=True, sort=False)["count"]
+            .sum()
+        )
         scorers = (
-            pd.concat(dfs, ignore_index=True)
-            .value_counts(["player", "team"])
+            counts.sort_values(ascending=False, kind="stable")
             .reset_index(name="Goals")
             .sort_values("Goals", ascending=False)
             .reset_index(drop=True)
@@ -186,35 +428,10 @@ class ResultsService:
         )
 
     def world_cup_summary(self) -> pd.DataFrame:
-        summary = (
-            self.matches.groupby(["Year", "Host", "team"])
-            .agg(
-                GP=("team", "count"),
-                GF=("goals_for", "sum"),
-                GF_avg=("goals_for", "mean"),
-                GA=("goals_against", "sum"),
-                GA_avg=("goals_against", "mean"),
-                W=("win", "sum"),
-                D=("draw", "sum"),
-                L=("loss", "sum"),
-            )
-            .reset_index()
-        )
-
-        assists = (
-            pd.concat(
-                [
-                    self._count_goal_assists(self.data, "home_goal_long", "home_team"),
-                    self._count_goal_assists(self.data, "away_goal_long", "away_team"),
-                ],
-                ignore_index=True,
-            )
-            .groupby(["Year", "Host", "team"], as_index=False)["assists"]
-            .sum()
-        )
-
-        summary = summary.merge(assists, on=["Year", "Host", "team"], how="left")
-        summary["assists"] = summary["assists"].fillna(0)
+        self._require(self._parts[0]["data"], GOAL_COLUMNS)
+        summary = self._totals.reset_index().dropna(subset=TOTAL_KEYS)
+        summary["GF_avg"] = summary["GF"] / summary["GF_n"]
+        summary["GA_avg"] = summary["GA"] / summary["GA_n"]
         summary["Assist Avg"] = summary["assists"] / summary["GP"]
 
         summary = summary[
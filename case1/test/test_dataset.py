@@ -0,0 +1,138 @@
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from services.dataset import FifaDataset
+from services.results import DATA_COLUMNS, ResultsService
+
+MATCHES = pd.DataFrame(
+    {
+        "home_team": ["A", "B", "C"],
+        "away_team": ["B", "C", "A"],
+        "Year": [1991, 1991, 1995],
+        "Host": ["China", "China", "Sweden"],
+        "Attendance": [1000, 2000, 3000],
+        "home_score": [2, 0, 1],
+        "away_score": [1, 0, 1],
+        "home_goal_long": [
+            "['10&rsquo;|1:0|Ana|Assist:Bea', '20&rsquo;|2:0|Ana']",
+            "[]",
+            "['5&rsquo;|1:0|Cai']",
+        ],
+        "away_goal_long": ["['30&rsquo;|2:1|Dan']", "[]", "['50&rsquo;|1:1|Ana']"],
+        "home_penalty_goal": [None, None, None],
+        "away_penalty_goal": [None, None, None],
+        "home_yellow_card_long": ["['12&rsquo;|Eva']", None, "[]"],
+        "away_yellow_card_long": ["[]", "[]", "[]"],
+        "home_red_card": [None, None, None],
+        "away_red_card": [None, None, None],
+        "Venue": ["X", "Y", "Z"],
+    }
+)
+
+
+def make_dataset(tmp: str) -> FifaDataset:
+    source = Path(tmp) / "matches.csv"
+    MATCHES.to_csv(source, index=False)
+    return FifaDataset(Path(tmp) / "cache", {"matches": str(source)})
+
+
+def test_matches_are_typed_and_parsed():
+    with tempfile.TemporaryDirectory() as tmp:
+        matches = make_dataset(tmp).matches()
+
+        assert matches["Year"].dtype == "Int16"
+        assert matches["home_score"].dtype == "Int8"
+        assert matches["Host"].dtype == "category"
+        assert matches["home_team"].dtype == matches["away_team"].dtype
+        assert list(matches["home_team"].cat.categories) == ["A", "B", "C"]
+        assert matches["home_goal_long"][0] == (
+            "10&rsquo;|1:0|Ana|Assist:Bea",
+            "20&rsquo;|2:0|Ana",
+        )
+        assert matches["home_yellow_card_long"][1] is None
+
+
+def test_cached_load_works_offline():
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset = make_dataset(tmp)
+        first = dataset.matches()
+        os.remove(Path(tmp) / "matches.csv")
+
+        pd.testing.assert_frame_equal(dataset.matches(), first)
+        projected = dataset.matches(columns=DATA_COLUMNS)
+        assert list(projected.columns) == DATA_COLUMNS
+
+
+def test_corrupt_or_stale_cache_is_rebuilt():
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset = make_dataset(tmp)
+        first = dataset.matches()
+        os.remove(Path(tmp) / "matches.csv")
+
+        cache = dataset.cache_dir
+        manifest = json.loads((cache / "matches.json").read_text())
+        (cache / manifest["columns"]["Year"]["file"]).write_bytes(b"corrupt")
+        pd.testing.assert_frame_equal(dataset.matches(), first)
+
+        manifest["version"] = 0
+        (cache / "matches.json").write_text(json.dumps(manifest))
+        pd.testing.assert_frame_equal(dataset.matches(), first)
+        assert json.loads((cache / "matches.json").read_text())["version"] != 0
+
+
+def test_projection_reads_only_requested_columns():
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset = make_dataset(tmp)
+        first = dataset.matches()
+
+        cache = dataset.cache_dir
+        manifest = (cache / "matches.json").read_text()
+        venue = cache / json.loads(manifest)["columns"]["Venue"]["file"]
+        os.remove(venue)
+
+        projected = dataset.matches(columns=DATA_COLUMNS)
+        pd.testing.assert_frame_equal(projected, first[DATA_COLUMNS])
+        # The missing file was not needed, so the cache was not rebuilt
+        assert not venue.exists()
+        assert (cache / "matches.json").read_text() == manifest
+
+        pd.testing.assert_frame_equal(dataset.matches(), first)
+        assert venue.exists()
+
+        try:
+            dataset.matches(columns=["Year", "Stadium"])
+        except KeyError as error:
+            assert "Stadium" in str(error)
+        else:
+            raise AssertionError("Unknown column was not rejected")
+
+
+def test_results_match_csv():
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset = make_dataset(tmp)
+        csv = pd.read_csv(dataset.source_file("matches"))
+        cached = ResultsService(dataset.matches(columns=DATA_COLUMNS))
+        expected = ResultsService(csv)
+
+        for method in ("get_results", "top_scorers", "world_cup_summary"):
+            pd.testing.assert_frame_equal(
+                getattr(cached, method)(),
+                getattr(expected, method)(),
+                check_dtype=False,
+                check_categorical=False,
+            )
+
+
+if __name__ == "__main__":
+    test_matches_are_typed_and_parsed()
+    test_cached_load_works_offline()
+    test_corrupt_or_stale_cache_is_rebuilt()
+    test_projection_reads_only_requested_columns()
+    test_results_match_csv()
+    print("All dataset tests passed")
@@ -0,0 +1,212 @@
+import ast
+import os
+import random
+import sys
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from services.events import event_fields, parse_event_list, parse_penalty_goals
+from services.results import ResultsService
+
+ALPHABET = "ab Zé'\"\\|·:()0123456789,[]\t\nñ✓"
+
+
+def literal_events(text: str) -> tuple:
+    # Previous parsing of the event cells, without its invalid escape warnings
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=DeprecationWarning)
+            warnings.simplefilter("ignore", category=SyntaxWarning)
+            parsed = ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return ()
+    return tuple(parsed) if isinstance(parsed, list) else ()
+
+
+def random_list_text(rng: random.Random) -> str:
+    items = [
+        "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 12)))
+        for _ in range(rng.randint(0, 4))
+    ]
+    text = repr(items)
+    if rng.random() < 0.2:
+        text = text.replace(", ", rng.choice([",", " , ", ",  "]))
+    if rng.random() < 0.1:
+        position = rng.randint(0, len(text))
+        text = text[:position] + text[position + 1 :]
+    return text
+
+
+def test_parse_event_list_matches_literal_eval():
+    cells = [
+        "[]",
+        "[ ]",
+        "['a']",
+        "['a',]",
+        "['a' , 'b']",
+        "[\"O'Neil\", 'b']",
+        r"['a\'b']",
+        r"['a\\b']",
+        r"['a\nb']",
+        "['a' 'b']",
+        "[u'a', b'b']",
+        r"[r'a\b']",
+        "['a', 1, None]",
+        "[['a']]",
+        "['a'",
+        "'a'",
+        "('a',)",
+        "{'a'}",
+        "",
+        "nan",
+        "['67&rsquo;|1:0|Player|Assist:Other']",
+        r"['67&rsquo;|1\:0|Player']",
+    ]
+    rng = random.Random(0)
+    cells += [random_list_text(rng) for _ in range(5000)]
+    for cell in cells:
+        assert parse_event_list(cell) == literal_events(cell), cell
+
+
+def test_goal_fields_match_split():
+    goals = [
+        "67&rsquo;|1:0|Player Name|Assist:Other Player",
+        "90+3&rsquo;|2:1| Player Name ",
+        "45&rsquo;|0:1|Player|Assist: Other |extra",
+        "|1:0|Player",
+        "1234|0:1|Player",
+        "Player only",
+        "a|b",
+        "Assist:X|1:0|Player",
+    ]
+    fields = event_fields(goals, "goal")
+    for goal, minute, player, assist in zip(
+        goals, fields["minute"], fields["player"], fields["assist"]
+    ):
+        parts = goal.split("|")
+        assert player == (parts[2].strip() if len(parts) > 2 else None)
+        assert (assist is not None) == ("Assist:" in goal)
+    assert fields["minute"].tolist()[:4] == [67, 90, 45, pd.NA]
+    assert fields["minute"].isna().tolist()[4:] == [True, True, True, True]
+    assert fields["assist"].tolist()[:3] == ["Other Player", None, "Other"]
+    assert str(fields["minute"].dtype) == "Int16"
+
+
+def test_card_and_penalty_fields():
+    cards = event_fields(["12&rsquo;|Player", 3, "Player"], "card")
+    assert cards["minute"].tolist() == [12, pd.NA, pd.NA]
+    assert cards["player"].isna().all()
+
+    penalties = parse_penalty_goals("Name One (P) · 1|Name Two (P) · 2")
+    assert penalties == ["Name One", "Name Two"]
+    fields = event_fields(penalties, "penalty_goal")
+    assert fields["player"].tolist() == penalties
+    assert fields["minute"].isna().all()
+
+
+def test_invalid_escapes_parse_without_warnings():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert parse_event_list(r"['1\:0|Ana', 'a\|b']") == ("1\\:0|Ana", "a\\|b")
+
+
+def sample_matches() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "home_team": ["A", "B"],
+            "away_team": ["B", "A"],
+            "Year": [1994, 1994],
+            "Host": ["USA", "USA"],
+            "Attendance": [1000, 1000],
+            "home_score": [2, 1],
+            "away_score": [1, 1],
+            "home_goal_long": [
+                "['10&rsquo;|1:0|Ana|Assist:Bea', '20&rsquo;|2:0|Ana']",
+                "[]",
+            ],
+            "away_goal_long": ["['30&rsquo;|2:1|Cai']", "['5&rsquo;|0:1|Ana']"],
+            "home_penalty_goal": [None, "Dan (P) · 1"],
+            "away_penalty_goal": [None, None],
+            "home_yellow_card_long": ["[]", "['12&rsquo;|Eva']"],
+            "away_yellow_card_long": ["[]", "[]"],
+            "home_red_card": [None, None],
+            "away_red_card": [None, None],
+        }
+    )
+
+
+def test_events_table_shape_and_contents():
+    events = ResultsService(sample_matches()).events
+
+    assert events.columns.tolist() == [
+        "source",
+        "kind",
+        "match",
+        "team",
+        "Year",
+        "Host",
+        "event",
+        "minute",
+        "player",
+        "assist",
+    ]
+    assert str(events["minute"].dtype) == "Int16"
+    assert events.index.tolist() == list(range(6))
+    rows = [
+        tuple(None if pd.isna(value) else value for value in row)
+        for row in events.drop(columns=["Year", "Host"]).itertuples(index=False)
+    ]
+    assert rows == [
+        (
+            "home_goal_long",
+            "goal",
+            0,
+            "A",
+            "10&rsquo;|1:0|Ana|Assist:Bea",
+            10,
+            "Ana",
+            "Bea",
+        ),
+        ("home_goal_long", "goal", 0, "A", "20&rsquo;|2:0|Ana", 20, "Ana", None),
+        ("away_goal_long", "goal", 0, "B", "30&rsquo;|2:1|Cai", 30, "Cai", None),
+        ("away_goal_long", "goal", 1, "A", "5&rsquo;|0:1|Ana", 5, "Ana", None),
+        ("home_penalty_goal", "penalty_goal", 1, "B", "Dan", None, "Dan", None),
+        (
+            "home_yellow_card_long",
+            "yellow_card",
+            1,
+            "B",
+            "12&rsquo;|Eva",
+            12,
+            None,
+            None,
+        ),
+    ]
+    assert (events["Year"] == 1994).all() and (events["Host"] == "USA").all()
+
+
+def test_events_table_of_added_matches():
+    data = sample_matches()
+    service = ResultsService(data.iloc[:1])
+    service.add_matches(data.iloc[1:])
+    pd.testing.assert_frame_equal(service.events, ResultsService(data).events)
+
+
+def test_top_scorers_uses_parsed_players():
+    service = ResultsService(sample_matches())
+    scorers = service.top_scorers(include_penalties=True)
+    goals = dict(zip(scorers["Player"], scorers["Goals"]))
+    assert goals == {"Ana": 3, "Cai": 1, "Dan": 1}
+
+
+if __name__ == "__main__":
+    test_parse_event_list_matches_literal_eval()
+    test_goal_fields_match_split()
+    test_card_and_penalty_fields()
+    test_invalid_escapes_parse_without_warnings()
+    test_events_table_shape_and_contents()
+    test_events_table_of_added_matches()
+    test_top_scorers_uses_parsed_players()
+    print("All event parsing tests passed")
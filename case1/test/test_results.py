@@ -0,0 +1,124 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from services.results import ResultsService
+
+TEAMS = ["Brazil", "China PR", "England", "Germany", "Japan", "Norway", "Sweden"]
+PLAYERS = ["Ana", "Bea", "Cai", "Dan", "Eva", "Fay"]
+YEARS = [1991, 1995, 1999, 2003]
+
+
+def events(rng: random.Random, n: int, kind: str) -> str:
+    if kind == "goal":
+        items = [
+            f"{rng.randint(1, 90)}&rsquo;|{k}:0|{rng.choice(PLAYERS)}"
+            + (f"|Assist:{rng.choice(PLAYERS)}" if rng.random() < 0.5 else "")
+            for k in range(n)
+        ]
+    else:
+        items = [f"{rng.randint(1, 90)}&rsquo;|{rng.choice(PLAYERS)}" for _ in range(n)]
+    return repr(items)
+
+
+def random_matches(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        year = rng.choice(YEARS)
+        home, away = rng.sample(TEAMS, 2)
+        home_score, away_score = rng.randint(0, 4), rng.randint(0, 4)
+        rows.append(
+            {
+                "Year": year,
+                "Host": f"Host {year}",
+                "Attendance": rng.randint(1000, 90000),
+                "home_team": home,
+                "away_team": away,
+                "home_score": home_score,
+                "away_score": away_score,
+                "home_goal_long": events(rng, home_score, "goal"),
+                "away_goal_long": events(rng, away_score, "goal"),
+                "home_penalty_goal": None,
+                "away_penalty_goal": None,
+                "home_yellow_card_long": events(rng, rng.randint(0, 3), "card"),
+                "away_yellow_card_long": events(rng, rng.randint(0, 3), "card"),
+                "home_red_card": events(rng, rng.randint(0, 1), "card"),
+                "away_red_card": None,
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def test_get_results_by_year_matches_year_slice():
+    matches = random_matches(300)
+    service = ResultsService(matches)
+
+    for year in YEARS:
+        expected = ResultsService(matches[matches["Year"] == year].copy())
+        pd.testing.assert_frame_equal(
+            service.get_results(year=year), expected.get_results()
+        )
+    assert service.get_results(year=1800).empty
+
+
+def test_standings_cover_every_tournament():
+    matches = random_matches(300, seed=1)
+    standings = ResultsService(matches).standings
+
+    assert standings["Year"].is_monotonic_increasing
+    assert sorted(standings["Year"].unique()) == YEARS
+    for year, table in standings.groupby("Year"):
+        assert (table["Host"] == f"Host {year}").all()
+        assert table["GP"].sum() == 2 * (matches["Year"] == year).sum()
+        assert (table["Points"] == 3 * table["W"] + table["D"]).all()
+
+
+def test_add_matches_matches_full_rebuild():
+    matches = random_matches(300, seed=2)
+    goalless = random_matches(20, seed=3).assign(
+        home_score=0, away_score=0, home_goal_long="[]", away_goal_long="[]"
+    )
+    parts = [matches.iloc[:120], goalless, matches.iloc[120:299], matches.iloc[299:]]
+
+    frames = ("data", "events", "base_matches", "matches", "standings")
+    service = ResultsService(parts[0])
+    for part in parts[1:]:
+        # Frames cached before an add are rebuilt after it
+        for name in frames:
+            getattr(service, name)
+        service.add_matches(part)
+    expected = ResultsService(pd.concat(parts))
+
+    for name in frames:
+        pd.testing.assert_frame_equal(getattr(service, name), getattr(expected, name))
+    pd.testing.assert_frame_equal(service.get_results(), expected.get_results())
+    for include_penalties in (True, False):
+        pd.testing.assert_frame_equal(
+            service.top_scorers(include_penalties, top_n=1000),
+            expected.top_scorers(include_penalties, top_n=1000),
+        )
+    pd.testing.assert_frame_equal(
+        service.world_cup_summary(), expected.world_cup_summary()
+    )
+
+
+def test_add_matches_requires_same_columns():
+    matches = random_matches(10)
+    service = ResultsService(matches)
+    try:
+        service.add_matches(matches.drop(columns=["Attendance"]))
+    except ValueError:
+        return
+    raise AssertionError("Expected ValueError")
+
+
+if __name__ == "__main__":
+    test_get_results_by_year_matches_year_slice()
+    test_standings_cover_every_tournament()
+    test_add_matches_matches_full_rebuild()
+    test_add_matches_requires_same_columns()
+    print("All results tests passed")
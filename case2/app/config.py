@@ -3,6 +3,7 @@ App configuration
 """
 
 from functools import lru_cache
+from typing import Optional
 
 from pydantic_settings import BaseSettings
 
@@ -18,6 +19,50 @@ class Settings(BaseSettings):
     CLASSIFICATION_MODEL: str = "best_classification_model.pkl"
     REGRESSION_MODEL: str = "best_regression_model.pkl"
     SCALER_MODEL: str = "scaler.pkl"
+    LINEAR_FAST_PATH: bool = True
+    MODEL_BUNDLE: Optional[str] = None
+    MODEL_MMAP: bool = False
+
+    MODEL_RELOAD_CANARY_SIZE: int = 1024
+    MODEL_RELOAD_WARMUP_ROUNDS: int = 3
+    MODEL_RELOAD_WATCH_INTERVAL_SECONDS: float = 0.0
+    MODEL_RELOAD_RESCORE: bool = False
+
+    PREDICTION_CACHE_ENABLED: bool = True
+    PREDICTION_CACHE_MAX_ENTRIES: int = 10000
+    PREDICTION_CACHE_TTL_SECONDS: float = 300.0
+    PREDICTION_CACHE_KEY_DECIMALS: int = 6
+
+    PREDICTION_TABLE_ENABLED: bool = False
+    PREDICTION_TABLE_FLOAT_STEP: float = 1.0
+    PREDICTION_TABLE_MAX_CELLS: int = 50_000_000
+    PREDICTION_TABLE_OFF_GRID: str = "model"
+    PREDICTION_TABLE_PATH: Optional[str] = None
+
+    PREDICTION_EXECUTOR: str = "thread"
+    PREDICTION_WORKERS: int = 4
+    PREDICTION_QUEUE_SIZE: int = 64
+    PREDICTION_RETRY_AFTER_SECONDS: int = 1
+
+    PREDICTION_BATCHER_ENABLED: bool = False
+    PREDICTION_BATCHER_MAX_WAIT_MS: float = 5.0
+    PREDICTION_BATCHER_MAX_BATCH_SIZE: int = 64
+
+    REPOSITORY_BACKEND: str = "memory"
+    SQLITE_PATH: str = "./data/students.db"
+    SQLITE_BUSY_TIMEOUT_SECONDS: float = 5.0
+    BULK_IMPORT_MAX_ROWS: int = 200_000
+    RESCORE_ON_READ: bool = True
+    RESCORE_CHUNK_SIZE: int = 10_000
+    FAST_SERIALIZATION: bool = True
+
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    WORKERS: int = 1
+    TCP_NODELAY: bool = True
+
+    METRICS_ENABLED: bool = True
+    PROFILING_ENABLED: bool = False
 
     DEBUG: bool = False
     API_PREFIX: str = "/api/v1"
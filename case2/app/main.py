@@ -1,16 +1,20 @@
 import logging
+import socket
 from contextlib import asynccontextmanager
 from datetime import datetime
 
 import uvicorn
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from uvicorn.protocols.http.auto import AutoHTTPProtocol
 
 from app.config import get_settings
+from app.metrics import CONTENT_TYPE, REGISTRY, MetricsMiddleware
+from app.profiling import PROFILER, ProfilingMiddleware
 from app.models.schemas import HealthResponse
-from app.routers import prediction, students
-from app.services.model_loader import ModelLoader
+from app.routers import admin, prediction, students
+from app.services.container import ServiceContainer
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -19,29 +23,36 @@ logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
+REGISTRY.enabled = settings.METRICS_ENABLED
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
-    Lifespan events - Load models
+    Lifespan events - Load models and build the service container
     """
-    model_loader = ModelLoader()
-    success = model_loader.load_models(
-        models_path=settings.MODELS_PATH,
-        classification_name=settings.CLASSIFICATION_MODEL,
-        regression_name=settings.REGRESSION_MODEL,
-        scaler_name=settings.SCALER_MODEL,
-    )
+    container = ServiceContainer(settings)
+    app.state.container = container
 
-    if not success:
+    if not container.start():
         logger.error("Error loading ML models")
         raise RuntimeError("Could not load ML models")
 
+    REGISTRY.add_collector(container.collect_metrics)
+
+    if settings.MODEL_RELOAD_WATCH_INTERVAL_SECONDS > 0:
+        container.model_reloader.start_watching(
+            settings.MODEL_RELOAD_WATCH_INTERVAL_SECONDS
+        )
+
     logger.info("API ready to receive requests")
 
     yield
 
     logger.info("Closing API...")
+    REGISTRY.remove_collector(container.collect_metrics)
+    PROFILER.stop()
+    container.shutdown()
 
 
 app = FastAPI(
@@ -61,6 +72,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 
 @app.exception_handler(Exception)
@@ -78,6 +92,7 @@ async def global_exception_handler(request: Request, exc: Exception):
 
 app.include_router(prediction.router, prefix=settings.API_PREFIX)
 app.include_router(students.router, prefix=settings.API_PREFIX)
+app.include_router(admin.router, prefix=settings.API_PREFIX)
 
 
 @app.get(
@@ -87,21 +102,36 @@ app.include_router(students.router, prefix=settings.API_PREFIX)
     summary="Health Check",
     description="Verify API and models",
 )
-async def health_check() -> HealthResponse:
+async def health_check(request: Request) -> HealthResponse:
     """
     Health check endpoint
     """
-    model_loader = ModelLoader()
+    container = getattr(request.app.state, "container", None)
+    ready = container is not None and container.is_ready()
 
     return HealthResponse(
-        status="healthy" if model_loader.is_loaded() else "unhealthy",
+        status="healthy" if ready else "unhealthy",
         app_name=settings.APP_NAME,
         version=settings.APP_VERSION,
-        models_loaded=model_loader.is_loaded(),
+        models_loaded=ready,
         timestamp=datetime.now(),
     )
 
 
+@app.get(
+    "/metrics",
+    tags=["Health"],
+    summary="Metrics",
+    description="Request, stage and component metrics in the Prometheus text format",
+    response_class=Response,
+)
+async def metrics() -> Response:
+    """
+    Prometheus scrape endpoint (metrics of the worker that serves the request)
+    """
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 @app.get(
     "/",
     tags=["Root"],
@@ -123,11 +153,45 @@ async def root():
             "predictions": f"{settings.API_PREFIX}/predictions",
             "students": f"{settings.API_PREFIX}/students",
             "health": "/health",
+            "metrics": "/metrics",
         },
     }
 
 
-if __name__ == "__main__":
+class NoDelayHTTPProtocol(AutoHTTPProtocol):
+    """
+    uvicorn HTTP protocol that sets TCP_NODELAY on every TCP connection
+
+    With several workers uvicorn binds the shared socket with protocol 0,
+    which asyncio does not recognize as TCP, so it leaves Nagle's algorithm
+    on and keep-alive responses stall on delayed ACKs.
+    """
+
+    def connection_made(self, transport):
+        sock = transport.get_extra_info("socket")
+        if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        super().connection_made(transport)
+
+
+def serve():
+    """
+    Runs the API with settings.WORKERS worker processes
+
+    Multi-worker mode needs REPOSITORY_BACKEND=sqlite so every worker sees the
+    same students (the container refuses the per-process backends). DEBUG
+    runs a single reloading worker. TCP_NODELAY selects NoDelayHTTPProtocol.
+    """
     uvicorn.run(
-        "main:app", host="0.0.0.0", port=8000, reload=settings.DEBUG, log_level="info"
+        "app.main:app",
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=None if settings.DEBUG else settings.WORKERS,
+        reload=settings.DEBUG,
+        http="app.main:NoDelayHTTPProtocol" if settings.TCP_NODELAY else "auto",
+        log_level="info",
     )
+
+
+if __name__ == "__main__":
+    serve()
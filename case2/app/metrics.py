@@ -0,0 +1,394 @@
+"""
+In-process metrics registry with Prometheus text exposition
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence
+
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+STAGE_BUCKETS = (
+    0.000005,
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.1,
+    1.0,
+)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Formats a label set as {a="x",b="y"}"""
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = (
+            str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        )
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Formats a sample value"""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base of the metric types: a name, a help text and label names"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        """Renders the HELP/TYPE header and the samples"""
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self._samples(),
+        ]
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic counter"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1):
+        """Increments the counter of a label set"""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.label_names, labels)} "
+            f"{_format_value(value)}"
+            for labels, value in items
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1):
+        """Decrements the gauge of a label set"""
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, value: float, *label_values: str):
+        """Sets the gauge of a label set"""
+        with self._lock:
+            self._values[label_values] = value
+
+    def clear(self):
+        """Removes every label set"""
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    """Distribution over fixed cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *label_values: str):
+        """Records one observation for a label set"""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                state = self._values[label_values] = [0] * (len(self.buckets) + 1)
+                state.append(0.0)
+            state[index] += 1
+            state[-1] += value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(
+                (labels, list(state)) for labels, state in self._values.items()
+            )
+        names = self.label_names + ("le",)
+        lines = []
+        for labels, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                bucket_labels = _format_labels(names, labels + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds the metrics of the process and renders them for /metrics
+
+    Collectors are callbacks run before each render, used to copy the
+    counters that components already keep (cache, executor, reloader) into
+    gauges. Each worker process has its own registry.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labels=()) -> Counter:
+        """Creates and registers a counter"""
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels=()) -> Gauge:
+        """Creates and registers a gauge"""
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(
+        self, name: str, documentation: str, labels=(), buckets=LATENCY_BUCKETS
+    ) -> Histogram:
+        """Creates and registers a histogram"""
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def add_collector(self, collector: Callable[[], None]):
+        """Registers a callback run before each render"""
+        self._collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[[], None]):
+        """Unregisters a callback added with add_collector"""
+        if collector in self._collectors:
+            self._collectors.remove(collector)
+
+    def render(self) -> str:
+        """
+        Renders every metric in the Prometheus text format
+
+        Returns:
+            Exposition text
+        """
+        for collector in list(self._collectors):
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total",
+    "HTTP requests by route and status",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ("method", "route"),
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "http_requests_in_flight", "HTTP requests being processed"
+)
+HTTP_REQUEST_SIZE = REGISTRY.histogram(
+    "http_request_size_bytes",
+    "HTTP request body size by route",
+    ("method", "route"),
+    SIZE_BUCKETS,
+)
+HTTP_RESPONSE_SIZE = REGISTRY.histogram(
+    "http_response_size_bytes",
+    "HTTP response body size by route",
+    ("method", "route"),
+    SIZE_BUCKETS,
+)
+STAGE_DURATION = REGISTRY.histogram(
+    "app_stage_duration_seconds",
+    "Time spent in internal stages (inference steps, repository calls, "
+    "serialization)",
+    ("stage",),
+    STAGE_BUCKETS,
+)
+
+
+class _StageTimer:
+    """Context manager observing the time spent in a stage"""
+
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        STAGE_DURATION.observe(time.perf_counter() - self.start, self.stage)
+        return False
+
+
+class _NoopTimer:
+    """Context manager used while metrics are disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+def stage_timer(stage: str):
+    """
+    Times a block as an internal stage
+
+    Args:
+        stage: Stage name (label of app_stage_duration_seconds)
+
+    Returns:
+        Context manager
+    """
+    if not REGISTRY.enabled:
+        return _NOOP_TIMER
+    return _StageTimer(stage)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, in-flight requests and payload sizes
+
+    Requests are labelled with the route template (e.g. /students/{student_id})
+    resolved by the router, so label cardinality stays bounded. Response sizes
+    include streamed bodies.
+    """
+
+    def __init__(self, app, excluded_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.excluded_paths = set(excluded_paths)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not REGISTRY.enabled
+            or scope["path"] in self.excluded_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        request_size = 0
+        response_size = 0
+        status: Optional[int] = None
+
+        async def receive_wrapper():
+            nonlocal request_size
+            message = await receive()
+            if message["type"] == "http.request":
+                request_size += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message):
+            nonlocal response_size, status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+
+            route = route_template(scope)
+            HTTP_REQUEST_DURATION.observe(duration, method, route)
+            HTTP_REQUEST_SIZE.observe(request_size, method, route)
+            HTTP_RESPONSE_SIZE.observe(response_size, method, route)
+            HTTP_REQUESTS.inc(method, route, str(status or 500))
+
+
+def route_template(scope) -> str:
+    """
+    Gets the path template of the matched route
+
+    Rebuilt from the full path and the path parameters, since the route of
+    an included router does not carry the prefix it was included with.
+    """
+    if scope.get("route") is None:
+        return "unmatched"
+    path = scope["path"]
+    path_params = scope.get("path_params")
+    if path_params:
+        names = {str(value): name for name, value in path_params.items()}
+        path = "/".join(
+            f"{{{names[segment]}}}" if segment in names else segment
+            for segment in path.split("/")
+        )
+    return path
@@ -3,7 +3,7 @@ Models Pydantic for data validation (DTOs)
 """
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -75,10 +75,45 @@ class StudentResponse(BaseModel):
     name: str
     input_data: StudentInput
     prediction: Optional[PredictionResponse] = None
+    model_version: Optional[str] = Field(
+        None, description="Version of the models that made the prediction"
+    )
     created_at: datetime
     updated_at: datetime
 
 
+class StudentPage(BaseModel):
+    """Page of students with keyset pagination"""
+
+    items: List[Dict[str, Any]] = Field(
+        ..., description="Students of the page (projected to the requested fields)"
+    )
+    limit: int = Field(..., description="Maximum number of students per page")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor of the next page (null on the last page)"
+    )
+
+
+class BulkRowResult(BaseModel):
+    """Status of one row of a bulk import"""
+
+    row: int = Field(..., description="Position of the row in the upload (0-based)")
+    student_id: Optional[str] = None
+    status: str = Field(
+        ..., description="created, invalid, duplicate (in upload) or exists"
+    )
+    detail: Optional[str] = None
+
+
+class BulkImportResponse(BaseModel):
+    """Response for bulk student import"""
+
+    total: int
+    created: int
+    rejected: int
+    results: List[BulkRowResult]
+
+
 class HealthResponse(BaseModel):
     """Response for health check"""
 
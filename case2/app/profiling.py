@@ -0,0 +1,371 @@
+"""
+On-demand profiling of live requests
+"""
+
+import contextvars
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import random
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from app.metrics import route_template
+
+MODE_CPROFILE = "cprofile"
+MODE_SAMPLING = "sampling"
+
+FORMAT_PSTATS = "pstats"
+FORMAT_TEXT = "text"
+FORMAT_COLLAPSED = "collapsed"
+
+PROFILE_HEADER = b"x-profile"
+TEXT_TOP_FUNCTIONS = 40
+
+
+class _RequestRecord:
+    """Profiles and stack samples of one request being profiled"""
+
+    __slots__ = ("mode", "profiles", "samples")
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.profiles: List[cProfile.Profile] = []
+        self.samples: Counter = Counter()
+
+
+_current_record: contextvars.ContextVar[Optional[_RequestRecord]] = (
+    contextvars.ContextVar("profiling_record", default=None)
+)
+
+
+class _Session:
+    """Settings and per-route results of a profiling session"""
+
+    def __init__(self, mode: str, sample_rate: float, interval_ms: float):
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.interval_ms = interval_ms
+        self.started_at = datetime.now()
+        self.stopped_at: Optional[datetime] = None
+        self.skipped = 0
+        self.requests: Counter = Counter()
+        self.stats: Dict[str, pstats.Stats] = {}
+        self.stacks: Dict[str, Counter] = {}
+
+
+def _frame_label(frame) -> str:
+    """Names a frame as function (file:line) for the collapsed stacks"""
+    code = frame.f_code
+    return (
+        f"{getattr(code, 'co_qualname', code.co_name)} "
+        f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class Profiler:
+    """
+    Profiles a sample of the live requests and aggregates the results by route
+
+    Two modes:
+    - cprofile: deterministic profile of the event loop thread while a sampled
+      request is in flight, plus the prediction worker threads it uses. One
+      request is profiled at a time and coroutines of other requests that
+      interleave with it are included, so it is best under low concurrency.
+    - sampling: a background thread snapshots the stacks of the threads
+      running a sampled request every interval_ms. Stacks are attributed to
+      their request exactly and can be rendered as flame graphs.
+
+    Requests are chosen with probability sample_rate, or always when they
+    carry the header X-Profile: 1. Each worker process profiles its own
+    requests; the prediction processes of the process executor are not
+    covered.
+    """
+
+    def __init__(self):
+        self.session: Optional[_Session] = None
+        self.last: Optional[_Session] = None
+        self._lock = threading.Lock()
+        self._targets: Dict[object, _RequestRecord] = {}
+        self._cprofile_busy = False
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_sampler = threading.Event()
+
+    def start(self, mode: str, sample_rate: float, interval_ms: float = 5.0) -> dict:
+        """
+        Starts a new session, discarding the results of the previous one
+
+        Args:
+            mode: cprofile or sampling
+            sample_rate: Fraction of the requests profiled (0, 1]
+            interval_ms: Time between stack samples (sampling mode)
+
+        Returns:
+            Status of the session
+
+        Raises:
+            ValueError: If the mode or the rates are invalid
+        """
+        if mode not in (MODE_CPROFILE, MODE_SAMPLING):
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        if not 0 < sample_rate <= 1:
+            raise ValueError("sample_rate must be in (0, 1]")
+        if interval_ms <= 0:
+            raise ValueError("interval_ms must be positive")
+
+        self.stop()
+        session = _Session(mode, sample_rate, interval_ms)
+        if mode == MODE_SAMPLING:
+            self._stop_sampler = threading.Event()
+            self._sampler = threading.Thread(
+                target=self._sample_loop,
+                args=(interval_ms / 1000, self._stop_sampler),
+                name="profiling-sampler",
+                daemon=True,
+            )
+            self._sampler.start()
+        self.session = self.last = session
+        return self.status()
+
+    def stop(self) -> dict:
+        """
+        Stops the active session, keeping its results for download
+
+        Returns:
+            Status of the last session
+        """
+        session = self.session
+        self.session = None
+        if session is not None:
+            session.stopped_at = datetime.now()
+        if self._sampler is not None:
+            self._stop_sampler.set()
+            self._sampler.join()
+            self._sampler = None
+        return self.status()
+
+    def _should_profile(self, scope, session: _Session) -> bool:
+        """Draws whether a request is profiled (runs on the event loop)"""
+        forced = any(
+            name == PROFILE_HEADER and value == b"1" for name, value in scope["headers"]
+        )
+        if not forced and random.random() >= session.sample_rate:
+            return False
+        if session.mode == MODE_CPROFILE:
+            if self._cprofile_busy:
+                session.skipped += 1
+                return False
+            self._cprofile_busy = True
+        return True
+
+    def _sample_loop(self, interval_seconds: float, stop: threading.Event):
+        """Sampler thread: attributes the stacks of the tracked frames"""
+        own_id = threading.get_ident()
+        while not stop.wait(interval_seconds):
+            targets = self._targets
+            if not targets:
+                continue
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    record = targets.get(frame)
+                    if record is not None:
+                        record.samples[";".join(reversed(stack))] += 1
+                        break
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+
+    def _merge(self, session: _Session, route: str, record: _RequestRecord):
+        """Adds the results of a profiled request to its route"""
+        with self._lock:
+            session.requests[route] += 1
+            if record.profiles:
+                stats = session.stats.get(route)
+                if stats is None:
+                    session.stats[route] = pstats.Stats(*record.profiles)
+                else:
+                    stats.add(*record.profiles)
+            if record.samples:
+                session.stacks.setdefault(route, Counter()).update(record.samples)
+
+    def status(self) -> dict:
+        """
+        Gets the state of the active or last session
+
+        Returns:
+            Dict with the settings and the profiled requests by route
+        """
+        session = self.last
+        if session is None:
+            return {"active": False, "mode": None, "routes": {}}
+
+        with self._lock:
+            routes = {
+                route: {
+                    "requests": requests,
+                    "samples": sum(session.stacks.get(route, {}).values()),
+                }
+                for route, requests in sorted(session.requests.items())
+            }
+        return {
+            "active": self.session is session,
+            "mode": session.mode,
+            "sample_rate": session.sample_rate,
+            "interval_ms": session.interval_ms,
+            "started_at": session.started_at,
+            "stopped_at": session.stopped_at,
+            "skipped": session.skipped,
+            "routes": routes,
+        }
+
+    def export(self, export_format: str, route: Optional[str] = None) -> bytes:
+        """
+        Exports the results of the active or last session
+
+        Args:
+            export_format: pstats or text (cprofile mode), collapsed (sampling)
+            route: Route template to export (all routes if None)
+
+        Returns:
+            Marshalled pstats data, a pstats report or collapsed stacks
+
+        Raises:
+            ValueError: If the format does not match the session mode
+            LookupError: If there is nothing profiled for the route
+        """
+        session = self.last
+        if session is None:
+            raise LookupError("No profiling session")
+
+        if export_format in (FORMAT_PSTATS, FORMAT_TEXT):
+            if session.mode != MODE_CPROFILE:
+                raise ValueError(f"{export_format} needs a cprofile session")
+            with self._lock:
+                selected = [
+                    stats
+                    for name, stats in session.stats.items()
+                    if route is None or name == route
+                ]
+                if not selected:
+                    raise LookupError("Nothing profiled for this route")
+                merged = pstats.Stats()
+                merged.add(*selected)
+
+            if export_format == FORMAT_PSTATS:
+                return marshal.dumps(merged.stats)
+            stream = io.StringIO()
+            merged.stream = stream
+            merged.sort_stats("cumulative").print_stats(TEXT_TOP_FUNCTIONS)
+            return stream.getvalue().encode()
+
+        if export_format == FORMAT_COLLAPSED:
+            if session.mode != MODE_SAMPLING:
+                raise ValueError("collapsed needs a sampling session")
+            with self._lock:
+                lines = [
+                    f"{name};{stack} {count}" if stack else f"{name} {count}"
+                    for name, stacks in sorted(session.stacks.items())
+                    if route is None or name == route
+                    for stack, count in stacks.most_common()
+                ]
+            if not lines:
+                raise LookupError("Nothing profiled for this route")
+            return ("\n".join(lines) + "\n").encode()
+
+        raise ValueError(f"Unknown export format: {export_format}")
+
+    def bind(self, fn: Callable) -> Callable:
+        """
+        Wraps a callable submitted to a worker thread by a profiled request
+
+        Args:
+            fn: Callable run on the worker thread
+
+        Returns:
+            fn itself if the current request is not profiled
+        """
+        record = _current_record.get()
+        if record is None:
+            return fn
+
+        if record.mode == MODE_CPROFILE:
+
+            def profiled(*args):
+                profile = cProfile.Profile()
+                profile.enable()
+                try:
+                    return fn(*args)
+                finally:
+                    profile.disable()
+                    record.profiles.append(profile)
+
+        else:
+
+            def profiled(*args):
+                frame = sys._getframe()
+                self._targets[frame] = record
+                try:
+                    return fn(*args)
+                finally:
+                    del self._targets[frame]
+
+        return profiled
+
+
+PROFILER = Profiler()
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles the requests drawn by the profiler
+
+    Only installed when PROFILING_ENABLED; without an active session it costs
+    one attribute read per request.
+    """
+
+    def __init__(self, app, profiler: Optional[Profiler] = None):
+        self.app = app
+        self.profiler = profiler or PROFILER
+
+    async def __call__(self, scope, receive, send):
+        profiler = self.profiler
+        session = profiler.session
+        if (
+            session is None
+            or scope["type"] != "http"
+            or not profiler._should_profile(scope, session)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        record = _RequestRecord(session.mode)
+        token = _current_record.set(record)
+        try:
+            if session.mode == MODE_CPROFILE:
+                profile = cProfile.Profile()
+                record.profiles.append(profile)
+                profile.enable()
+                try:
+                    await self.app(scope, receive, send)
+                finally:
+                    profile.disable()
+                    profiler._cprofile_busy = False
+            else:
+                # The frame of this coroutine is on the thread stack whenever
+                # the request runs, which is how the sampler finds it
+                frame = sys._getframe()
+                profiler._targets[frame] = record
+                try:
+                    await self.app(scope, receive, send)
+                finally:
+                    del profiler._targets[frame]
+        finally:
+            _current_record.reset(token)
+            profiler._merge(session, route_template(scope), record)
@@ -0,0 +1,294 @@
+"""
+Incrementally maintained student aggregates
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Bins histogrammed densely by from_columns regardless of the value count
+DENSE_BINS_MAX = 1 << 16
+
+
+def _to_cents(value: float) -> int:
+    """Converts a performance index (2 decimals) to integer hundredths"""
+    return int(round(value * 100))
+
+
+class QuantileSketch:
+    """
+    Streaming quantile sketch over fixed-width bins
+
+    Supports removals, so it stays correct under updates and deletes. Memory
+    depends on the value range, not on the number of students, and quantiles
+    are accurate to half a bin width.
+    """
+
+    def __init__(self, bin_width: float = 0.1):
+        """
+        Initializes the sketch
+
+        Args:
+            bin_width: Width of each bin, in performance index units
+        """
+        self.bin_width_cents = max(_to_cents(bin_width), 1)
+        self.bins: Dict[int, int] = {}
+        self.count = 0
+
+    def add(self, cents: int):
+        """Adds a value (in hundredths)"""
+        key = cents // self.bin_width_cents
+        self.bins[key] = self.bins.get(key, 0) + 1
+        self.count += 1
+
+    def remove(self, cents: int):
+        """Removes a value previously added (in hundredths)"""
+        key = cents // self.bin_width_cents
+        remaining = self.bins.get(key, 0) - 1
+        if remaining > 0:
+            self.bins[key] = remaining
+        else:
+            self.bins.pop(key, None)
+        self.count -= 1
+
+    def merge(self, other: "QuantileSketch", sign: int = 1):
+        """
+        Adds (sign 1) or removes (sign -1) the values of another sketch
+
+        Args:
+            other: Sketch with the same bin width
+            sign: 1 to add its values, -1 to remove them
+        """
+        bins = self.bins
+        for key, count in other.bins.items():
+            remaining = bins.get(key, 0) + sign * count
+            if remaining > 0:
+                bins[key] = remaining
+            else:
+                bins.pop(key, None)
+        self.count += sign * other.count
+
+    def quantiles(self, qs: List[float]) -> List[Optional[float]]:
+        """
+        Gets approximate quantiles
+
+        Args:
+            qs: Quantiles in [0, 1], sorted ascending
+
+        Returns:
+            List with the midpoint of the bin holding each quantile
+        """
+        if self.count == 0:
+            return [None for _ in qs]
+
+        results = []
+        targets = iter(qs)
+        q = next(targets, None)
+        seen = 0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            while q is not None and seen >= max(math.ceil(q * self.count), 1):
+                midpoint = (key + 0.5) * self.bin_width_cents / 100
+                results.append(round(midpoint, 2))
+                q = next(targets, None)
+            if q is None:
+                break
+        return results
+
+
+class StudentAggregates:
+    """
+    Running aggregates of the stored students
+
+    Performance sums are kept in integer hundredths, so they are exact and do
+    not drift after many updates and deletes.
+    """
+
+    def __init__(self, quantile_bin_width: float = 0.1):
+        """
+        Initializes empty aggregates
+
+        Args:
+            quantile_bin_width: Bin width of the percentile sketch
+        """
+        self.count = 0
+        self.with_prediction = 0
+        self.at_risk = 0
+        self.performance_sum_cents = 0
+        self.performance_sumsq_cents = 0
+        self.risk_levels: Dict[str, int] = {}
+        self.sketch = QuantileSketch(quantile_bin_width)
+
+    @classmethod
+    def from_students(
+        cls, students: Iterable[dict], quantile_bin_width: float = 0.1
+    ) -> "StudentAggregates":
+        """
+        Builds the aggregates with a full scan
+
+        Args:
+            students: Stored student dicts
+            quantile_bin_width: Bin width of the percentile sketch
+
+        Returns:
+            StudentAggregates
+        """
+        aggregates = cls(quantile_bin_width)
+        for student in students:
+            aggregates.add(student.get("prediction"))
+        return aggregates
+
+    @classmethod
+    def from_columns(
+        cls,
+        count: int,
+        performance: np.ndarray,
+        low_performance: np.ndarray,
+        risk_levels: Dict[str, int],
+        quantile_bin_width: float = 0.1,
+    ) -> "StudentAggregates":
+        """
+        Builds the aggregates with vectorized reductions over columns
+
+        Args:
+            count: Number of students
+            performance: Performance index of the students with prediction
+            low_performance: low_performance_predicted of the same students
+            risk_levels: Students with prediction by risk level
+            quantile_bin_width: Bin width of the percentile sketch
+
+        Returns:
+            StudentAggregates
+        """
+        aggregates = cls(quantile_bin_width)
+        cents = np.rint(performance * 100).astype(np.int64)
+        aggregates.count = count
+        aggregates.with_prediction = len(cents)
+        aggregates.at_risk = int(np.count_nonzero(low_performance == 1))
+        magnitude = int(np.abs(cents).max()) if len(cents) else 0
+        if magnitude * magnitude * len(cents) < 2**63:
+            aggregates.performance_sum_cents = int(cents.sum())
+            aggregates.performance_sumsq_cents = int(np.dot(cents, cents))
+        else:
+            # The int64 reductions could overflow; sum exactly in Python
+            values = cents.tolist()
+            aggregates.performance_sum_cents = sum(values)
+            aggregates.performance_sumsq_cents = sum(v * v for v in values)
+        aggregates.risk_levels = dict(risk_levels)
+
+        sketch = aggregates.sketch
+        if len(cents):
+            keys = cents // sketch.bin_width_cents
+            offset = int(keys.min())
+            if int(keys.max()) - offset <= max(len(keys), DENSE_BINS_MAX):
+                counts = np.bincount(keys - offset)
+                keys = np.flatnonzero(counts)
+                counts = counts[keys]
+                keys += offset
+            else:
+                # Sparse values (outliers): avoid a huge dense histogram
+                keys, counts = np.unique(keys, return_counts=True)
+            sketch.bins = dict(zip(keys.tolist(), counts.tolist()))
+        sketch.count = len(cents)
+        return aggregates
+
+    def add(self, prediction: Optional[dict]):
+        """
+        Accounts for a student
+
+        Args:
+            prediction: Stored prediction of the student (may be None)
+        """
+        self.count += 1
+        if not prediction:
+            return
+
+        cents = _to_cents(prediction["performance_index_predicted"])
+        self.with_prediction += 1
+        self.at_risk += prediction["low_performance_predicted"] == 1
+        self.performance_sum_cents += cents
+        self.performance_sumsq_cents += cents * cents
+        risk_level = prediction["risk_level"]
+        self.risk_levels[risk_level] = self.risk_levels.get(risk_level, 0) + 1
+        self.sketch.add(cents)
+
+    def remove(self, prediction: Optional[dict]):
+        """
+        Removes a student previously added
+
+        Args:
+            prediction: Stored prediction of the student (may be None)
+        """
+        self.count -= 1
+        if not prediction:
+            return
+
+        cents = _to_cents(prediction["performance_index_predicted"])
+        self.with_prediction -= 1
+        self.at_risk -= prediction["low_performance_predicted"] == 1
+        self.performance_sum_cents -= cents
+        self.performance_sumsq_cents -= cents * cents
+        risk_level = prediction["risk_level"]
+        remaining = self.risk_levels.get(risk_level, 0) - 1
+        if remaining > 0:
+            self.risk_levels[risk_level] = remaining
+        else:
+            self.risk_levels.pop(risk_level, None)
+        self.sketch.remove(cents)
+
+    def merge(self, other: "StudentAggregates", sign: int = 1):
+        """
+        Adds (sign 1) or removes (sign -1) the students of other aggregates
+
+        Used to account for many rows at once with aggregates built over
+        them by from_columns.
+
+        Args:
+            other: Aggregates with the same quantile bin width
+            sign: 1 to add its students, -1 to remove them
+        """
+        self.count += sign * other.count
+        self.with_prediction += sign * other.with_prediction
+        self.at_risk += sign * other.at_risk
+        self.performance_sum_cents += sign * other.performance_sum_cents
+        self.performance_sumsq_cents += sign * other.performance_sumsq_cents
+        for risk_level, count in other.risk_levels.items():
+            remaining = self.risk_levels.get(risk_level, 0) + sign * count
+            if remaining > 0:
+                self.risk_levels[risk_level] = remaining
+            else:
+                self.risk_levels.pop(risk_level, None)
+        self.sketch.merge(other.sketch, sign)
+
+    def snapshot(self) -> dict:
+        """
+        Gets the raw counters
+
+        Returns:
+            Dict with the exact aggregate values
+        """
+        return {
+            "count": self.count,
+            "with_prediction": self.with_prediction,
+            "at_risk": self.at_risk,
+            "performance_sum_cents": self.performance_sum_cents,
+            "performance_sumsq_cents": self.performance_sumsq_cents,
+            "risk_levels": dict(sorted(self.risk_levels.items())),
+        }
+
+    def mean(self) -> float:
+        """Average performance of the students with prediction"""
+        if not self.with_prediction:
+            return 0.0
+        return self.performance_sum_cents / self.with_prediction / 100
+
+    def std(self) -> float:
+        """Population standard deviation of the performance"""
+        if not self.with_prediction:
+            return 0.0
+        n = self.with_prediction
+        variance_cents = (
+            self.performance_sumsq_cents - self.performance_sum_cents**2 / n
+        ) / n
+        return math.sqrt(max(variance_cents, 0.0)) / 100
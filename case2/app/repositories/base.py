@@ -0,0 +1,121 @@
+"""
+Students Repository interface
+"""
+
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.models.schemas import PredictionResponse, StudentInput
+from app.repositories.aggregates import StudentAggregates
+
+
+class IStudentRepository(ABC):
+    """
+    Interface of the student storage backends
+    Principle: Dependency Inversion - Services depend on this abstraction
+    """
+
+    @abstractmethod
+    def create(
+        self,
+        student_id: str,
+        name: str,
+        input_data: StudentInput,
+        prediction: Optional[PredictionResponse] = None,
+        model_version: Optional[str] = None,
+    ) -> dict:
+        """
+        Creates a new student, tagging the prediction with model_version
+
+        Raises:
+            ValueError: If student_id already exists
+        """
+
+    @abstractmethod
+    def create_many(
+        self,
+        student_ids: Sequence[str],
+        names: Sequence[str],
+        inputs: Sequence[StudentInput],
+        predictions: Sequence[Optional[PredictionResponse]],
+        model_version: Optional[str] = None,
+    ) -> List[dict]:
+        """
+        Creates several students in one transaction (all or nothing)
+
+        Raises:
+            ValueError: If any student_id already exists or is repeated
+        """
+
+    @abstractmethod
+    def get_by_id(self, student_id: str) -> Optional[dict]:
+        """Gets a student by ID, or None if not found"""
+
+    @abstractmethod
+    def get_all(self) -> List[dict]:
+        """Gets all students"""
+
+    @abstractmethod
+    def list_page(
+        self,
+        limit: int,
+        sort_by: str = "created_at",
+        descending: bool = False,
+        cursor: Optional[tuple] = None,
+        risk_level: Optional[str] = None,
+        low_performance_predicted: Optional[int] = None,
+    ) -> List[Tuple[tuple, dict]]:
+        """
+        Gets a page of students in keyset order
+
+        The cursor is the sort key (sort_value, student_id) of the last
+        student of the previous page; each item is returned with its own key.
+        """
+
+    @abstractmethod
+    def update(
+        self,
+        student_id: str,
+        name: Optional[str] = None,
+        input_data: Optional[StudentInput] = None,
+        prediction: Optional[PredictionResponse] = None,
+        model_version: Optional[str] = None,
+    ) -> Optional[dict]:
+        """Updates an existing student, or returns None if not found"""
+
+    @abstractmethod
+    def update_predictions(
+        self,
+        student_ids: Sequence[str],
+        predictions: Sequence[PredictionResponse],
+        model_version: str,
+    ) -> int:
+        """
+        Replaces the predictions of students not yet scored by model_version
+
+        Students that no longer exist or are already at model_version are
+        skipped; updated_at is left untouched. Returns the number updated.
+        """
+
+    @abstractmethod
+    def delete(self, student_id: str) -> bool:
+        """Deletes a student, returns False if not found"""
+
+    @abstractmethod
+    def exists(self, student_id: str) -> bool:
+        """Verifies if a student exists"""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Counts the total number of students"""
+
+    @abstractmethod
+    def get_aggregates(self) -> StudentAggregates:
+        """Gets the running aggregates, kept up to date on every write"""
+
+    def existing_ids(self, student_ids: Iterable[str]) -> Set[str]:
+        """Gets the subset of student_ids that are already stored"""
+        return {student_id for student_id in student_ids if self.exists(student_id)}
+
+    def close(self):
+        """Releases the resources held by the backend"""
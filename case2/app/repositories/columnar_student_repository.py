@@ -0,0 +1,734 @@
+"""
+Columnar Students Repository backed by NumPy arrays
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.schemas import PredictionResponse, StudentInput
+from app.repositories.aggregates import StudentAggregates
+from app.repositories.base import IStudentRepository
+from app.repositories.sorted_index import NO_PERFORMANCE, SORT_FIELDS
+
+logger = logging.getLogger(__name__)
+
+INPUT_FIELDS = (
+    "hours_studied",
+    "previous_scores",
+    "extracurricular_activities",
+    "sleep_hours",
+    "sample_questions_practiced",
+)
+PREDICTION_FIELDS = (
+    "performance_index_predicted",
+    "low_performance_predicted",
+    "low_performance_probability",
+)
+STRING_FIELDS = ("student_id", "name")
+
+# Categorical columns store codes (-1 means no value) and strings are slices
+# (start, length) of a UTF-8 heap per field
+COLUMN_DTYPES = {
+    "hours_studied": np.float64,
+    "previous_scores": np.float64,
+    "extracurricular_activities": np.int8,
+    "sleep_hours": np.float64,
+    "sample_questions_practiced": np.int8,
+    "performance_index_predicted": np.float64,
+    "low_performance_predicted": np.int8,
+    "low_performance_probability": np.float64,
+    "risk_level": np.int8,
+    "model_version": np.int16,
+    "created_at": "datetime64[us]",
+    "updated_at": "datetime64[us]",
+    "alive": np.bool_,
+    "student_id_start": np.int64,
+    "student_id_length": np.int16,
+    "name_start": np.int64,
+    "name_length": np.int16,
+}
+
+INITIAL_CAPACITY = 1024
+# Tombstones are compacted once they are the majority of the rows
+COMPACT_MIN_ROWS = 1024
+# New IDs are merged into the sorted hash index in batches of this size
+PENDING_IDS_MAX = 4096
+# A string heap is rewritten once most of it belongs to replaced strings
+HEAP_COMPACT_MIN_BYTES = 1 << 20
+
+
+class ColumnarStudentRepository(IStudentRepository):
+    """
+    In-memory repository that stores each field in a typed NumPy column
+
+    A student is a row: features and prediction outputs live in growable
+    arrays, risk levels and model versions are dictionary encoded, and IDs
+    and names are slices of a UTF-8 byte heap. IDs are found through a sorted
+    array of their hashes, so no Python object is kept per student. Deletes
+    leave a tombstone that is compacted away once most rows are dead.
+
+    Filters and pages are vectorized over the columns; student dicts are
+    only built for the rows returned. The aggregates are kept up to date on
+    every write, with reductions over the columns of the rows written.
+    """
+
+    def __init__(self):
+        """Initialize the empty columns"""
+        self._capacity = INITIAL_CAPACITY
+        self._size = 0
+        self._dead = 0
+        self._columns: Dict[str, np.ndarray] = {
+            name: np.zeros(self._capacity, dtype=dtype)
+            for name, dtype in COLUMN_DTYPES.items()
+        }
+        self._heaps: Dict[str, bytearray] = {
+            field: bytearray() for field in STRING_FIELDS
+        }
+        self._heap_garbage: Dict[str, int] = {field: 0 for field in STRING_FIELDS}
+        # Sorted hashes of the IDs and their rows; IDs created since the last
+        # merge are in _pending_ids. Entries of deleted rows are skipped.
+        self._id_hashes = np.empty(0, dtype=np.int64)
+        self._id_rows = np.empty(0, dtype=np.int64)
+        self._pending_ids: Dict[str, int] = {}
+        self._risk_levels: List[str] = []
+        self._risk_codes: Dict[str, int] = {}
+        self._versions: List[str] = []
+        self._version_codes: Dict[str, int] = {}
+        self._aggregates = StudentAggregates()
+        logger.info("ColumnarStudentRepository initialized")
+
+    def _reserve(self, extra: int):
+        """Grows the columns (doubling) to fit extra more rows"""
+        needed = self._size + extra
+        if needed <= self._capacity:
+            return
+        capacity = max(needed, self._capacity * 2)
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[: self._size] = column[: self._size]
+            self._columns[name] = grown
+        self._capacity = capacity
+
+    @staticmethod
+    def _code(value: Optional[str], values: List[str], codes: Dict[str, int]) -> int:
+        """Dictionary encodes a categorical value (-1 for None)"""
+        if value is None:
+            return -1
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    def _write_strings(self, field: str, rows, values: Sequence[str]):
+        """Appends strings to the heap of field and points rows at them"""
+        encoded = [value.encode("utf-8", "surrogatepass") for value in values]
+        lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+        heap = self._heaps[field]
+        self._columns[f"{field}_start"][rows] = len(heap) + np.cumsum(lengths) - lengths
+        self._columns[f"{field}_length"][rows] = lengths
+        heap += b"".join(encoded)
+
+    def _read_strings(self, field: str, rows) -> List[str]:
+        """Decodes the strings of field for rows"""
+        starts = self._columns[f"{field}_start"][rows].tolist()
+        lengths = self._columns[f"{field}_length"][rows].tolist()
+        with memoryview(self._heaps[field]) as view:
+            return [
+                str(view[start : start + length], "utf-8", "surrogatepass")
+                for start, length in zip(starts, lengths)
+            ]
+
+    def _compact_heap(self, field: str):
+        """Rewrites the heap of field with the strings of the alive rows"""
+        rows = self._alive_rows()
+        values = self._read_strings(field, rows)
+        self._heaps[field] = bytearray()
+        self._heap_garbage[field] = 0
+        self._write_strings(field, rows, values)
+
+    def _id_keys(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Gets the IDs of rows as fixed-width UTF-8 bytes
+
+        They compare like the decoded strings, so ties on the sort value are
+        broken without building a Python string per row.
+        """
+        starts = self._columns["student_id_start"][rows]
+        lengths = self._columns["student_id_length"][rows].astype(np.int64)
+        width = max(int(lengths.max()) if len(rows) else 0, 1)
+        offsets = np.arange(width)
+        inside = offsets < lengths[:, None]
+        heap = np.frombuffer(self._heaps["student_id"], dtype=np.uint8)
+        keys = np.where(inside, heap[np.where(inside, starts[:, None] + offsets, 0)], 0)
+        # Releases the buffer of the heap so it can grow again
+        del heap
+        return keys.astype(np.uint8).view(f"S{width}").ravel()
+
+    def _find(self, student_id: str) -> Optional[int]:
+        """Gets the row of an alive student, or None"""
+        row = self._pending_ids.get(student_id)
+        if row is not None:
+            return row
+
+        hashes = self._id_hashes
+        value = hash(student_id)
+        position = int(np.searchsorted(hashes, value))
+        alive = self._columns["alive"]
+        while position < len(hashes) and hashes[position] == value:
+            row = int(self._id_rows[position])
+            if alive[row] and self._read_strings("student_id", [row])[0] == student_id:
+                return row
+            position += 1
+        return None
+
+    def _find_many(self, student_ids: Sequence[str]) -> List[str]:
+        """Gets the student_ids already stored, probing the index at once"""
+        found = [sid for sid in student_ids if sid in self._pending_ids]
+        hashes = np.fromiter(
+            map(hash, student_ids), dtype=np.int64, count=len(student_ids)
+        )
+        candidates = np.searchsorted(self._id_hashes, hashes, side="right") > (
+            np.searchsorted(self._id_hashes, hashes, side="left")
+        )
+        found.extend(
+            student_ids[i]
+            for i in np.flatnonzero(candidates).tolist()
+            if student_ids[i] not in self._pending_ids
+            and self._find(student_ids[i]) is not None
+        )
+        return found
+
+    def _merge_ids(self, student_ids: Sequence[str], rows: Sequence[int]):
+        """Inserts IDs into the sorted hash index"""
+        hashes = np.fromiter(
+            map(hash, student_ids), dtype=np.int64, count=len(student_ids)
+        )
+        order = np.argsort(hashes, kind="stable")
+        hashes = hashes[order]
+        positions = np.searchsorted(self._id_hashes, hashes)
+        self._id_hashes = np.insert(self._id_hashes, positions, hashes)
+        self._id_rows = np.insert(
+            self._id_rows, positions, np.asarray(rows, dtype=np.int64)[order]
+        )
+
+    def _flush_pending_ids(self):
+        """Moves the recently created IDs into the sorted hash index"""
+        if self._pending_ids:
+            self._merge_ids(list(self._pending_ids), list(self._pending_ids.values()))
+            self._pending_ids.clear()
+
+    def _write_inputs(self, rows, inputs: Sequence[StudentInput]):
+        """Stores the academic data of rows"""
+        columns = self._columns
+        for field in INPUT_FIELDS:
+            columns[field][rows] = [getattr(data, field) for data in inputs]
+
+    def _write_predictions(
+        self,
+        rows,
+        predictions: Sequence[Optional[PredictionResponse]],
+        model_version: Optional[str],
+    ):
+        """Stores the predictions of rows (None clears the prediction)"""
+        columns = self._columns
+        for field in PREDICTION_FIELDS:
+            columns[field][rows] = [
+                getattr(prediction, field) if prediction else 0
+                for prediction in predictions
+            ]
+        columns["risk_level"][rows] = [
+            self._code(
+                prediction.risk_level if prediction else None,
+                self._risk_levels,
+                self._risk_codes,
+            )
+            for prediction in predictions
+        ]
+        version_code = self._code(model_version, self._versions, self._version_codes)
+        columns["model_version"][rows] = [
+            version_code if prediction else -1 for prediction in predictions
+        ]
+
+    def _to_dicts(self, rows: np.ndarray) -> List[dict]:
+        """Builds the student dicts of rows, one column at a time"""
+        columns = self._columns
+        inputs = zip(*(columns[field][rows].tolist() for field in INPUT_FIELDS))
+        outputs = zip(*(columns[field][rows].tolist() for field in PREDICTION_FIELDS))
+        risk_levels = self._risk_levels
+        versions = self._versions
+
+        students = []
+        for (
+            student_id,
+            name,
+            input_values,
+            output_values,
+            risk_code,
+            version_code,
+            created_at,
+            updated_at,
+        ) in zip(
+            self._read_strings("student_id", rows),
+            self._read_strings("name", rows),
+            inputs,
+            outputs,
+            columns["risk_level"][rows].tolist(),
+            columns["model_version"][rows].tolist(),
+            columns["created_at"][rows].tolist(),
+            columns["updated_at"][rows].tolist(),
+        ):
+            prediction = None
+            if risk_code >= 0:
+                prediction = dict(zip(PREDICTION_FIELDS, output_values))
+                prediction["risk_level"] = risk_levels[risk_code]
+            students.append(
+                {
+                    "student_id": student_id,
+                    "name": name,
+                    "input_data": dict(zip(INPUT_FIELDS, input_values)),
+                    "prediction": prediction,
+                    "model_version": (
+                        versions[version_code] if version_code >= 0 else None
+                    ),
+                    "created_at": created_at,
+                    "updated_at": updated_at,
+                }
+            )
+        return students
+
+    def _rows_aggregates(self, rows: np.ndarray) -> StudentAggregates:
+        """Builds the aggregates of rows with vectorized reductions"""
+        columns = self._columns
+        codes = columns["risk_level"][rows]
+        with_prediction = rows[codes >= 0]
+        counts = np.bincount(codes[codes >= 0], minlength=len(self._risk_levels))
+        return StudentAggregates.from_columns(
+            count=len(rows),
+            performance=columns["performance_index_predicted"][with_prediction],
+            low_performance=columns["low_performance_predicted"][with_prediction],
+            risk_levels={
+                risk_level: count
+                for risk_level, count in zip(self._risk_levels, counts.tolist())
+                if count
+            },
+        )
+
+    def _prediction(self, row: int) -> Optional[dict]:
+        """Gets the stored prediction of a row as aggregated (None if absent)"""
+        columns = self._columns
+        risk_code = int(columns["risk_level"][row])
+        if risk_code < 0:
+            return None
+        return {
+            "performance_index_predicted": float(
+                columns["performance_index_predicted"][row]
+            ),
+            "low_performance_predicted": int(columns["low_performance_predicted"][row]),
+            "risk_level": self._risk_levels[risk_code],
+        }
+
+    def _append(
+        self,
+        student_ids: Sequence[str],
+        names: Sequence[str],
+        inputs: Sequence[StudentInput],
+        predictions: Sequence[Optional[PredictionResponse]],
+        model_version: Optional[str],
+    ) -> np.ndarray:
+        """Appends new rows and returns their positions"""
+        n = len(student_ids)
+        self._reserve(n)
+        rows = np.arange(self._size, self._size + n)
+        now = np.datetime64(datetime.now(), "us")
+
+        self._write_strings("student_id", rows, student_ids)
+        self._write_strings("name", rows, names)
+        self._write_inputs(rows, inputs)
+        self._write_predictions(rows, predictions, model_version)
+        self._columns["created_at"][rows] = now
+        self._columns["updated_at"][rows] = now
+        self._columns["alive"][rows] = True
+        self._size += n
+
+        if len(self._pending_ids) + n > PENDING_IDS_MAX:
+            self._flush_pending_ids()
+            self._merge_ids(student_ids, rows)
+        else:
+            self._pending_ids.update(zip(student_ids, rows.tolist()))
+        self._aggregates.merge(self._rows_aggregates(rows))
+        return rows
+
+    def create(
+        self,
+        student_id: str,
+        name: str,
+        input_data: StudentInput,
+        prediction: Optional[PredictionResponse] = None,
+        model_version: Optional[str] = None,
+    ) -> dict:
+        """
+        Creates a new student
+
+        Args:
+            student_id: Unique student ID
+            name: Student name
+            input_data: Academic data
+            prediction: Prediction (optional)
+            model_version: Version of the models that made the prediction
+
+        Returns:
+            dict with student data
+
+        Raises:
+            ValueError: If student_id already exists
+        """
+        if self._find(student_id) is not None:
+            raise ValueError(f"Student with ID {student_id} already exists")
+
+        rows = self._append(
+            [student_id], [name], [input_data], [prediction], model_version
+        )
+        logger.info(f"Student {student_id} created successfully")
+        return self._to_dicts(rows)[0]
+
+    def create_many(
+        self,
+        student_ids: Sequence[str],
+        names: Sequence[str],
+        inputs: Sequence[StudentInput],
+        predictions: Sequence[Optional[PredictionResponse]],
+        model_version: Optional[str] = None,
+    ) -> List[dict]:
+        """
+        Creates several students (all or nothing)
+
+        Args:
+            student_ids: Unique student IDs
+            names: Student names
+            inputs: Academic data
+            predictions: Predictions (items may be None)
+            model_version: Version of the models that made the predictions
+
+        Returns:
+            List of dicts with student data
+
+        Raises:
+            ValueError: If any student_id already exists or is repeated
+        """
+        if len(set(student_ids)) != len(student_ids):
+            raise ValueError("Repeated student IDs in bulk creation")
+
+        existing = self._find_many(student_ids)
+        if existing:
+            raise ValueError(f"Students with IDs {existing[:10]} already exist")
+
+        rows = self._append(student_ids, names, inputs, predictions, model_version)
+        logger.info(f"{len(rows)} students created in bulk")
+        return self._to_dicts(rows)
+
+    def get_by_id(self, student_id: str) -> Optional[dict]:
+        """
+        Gets a student by ID
+
+        Args:
+            student_id: ID of the student
+
+        Returns:
+            dict with student data or None if not found
+        """
+        row = self._find(student_id)
+        if row is None:
+            return None
+        return self._to_dicts(np.array([row]))[0]
+
+    def _alive_rows(self) -> np.ndarray:
+        """Positions of the rows that are not tombstones"""
+        return np.flatnonzero(self._columns["alive"][: self._size])
+
+    def get_all(self) -> List[dict]:
+        """
+        Gets all students
+
+        Returns:
+            List of students
+        """
+        return self._to_dicts(self._alive_rows())
+
+    def filter_rows(
+        self,
+        risk_level: Optional[str] = None,
+        low_performance_predicted: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Gets the rows matching the filters with one vectorized mask
+
+        Args:
+            risk_level: Filter on risk level (optional)
+            low_performance_predicted: Filter on low performance (optional)
+
+        Returns:
+            Row positions, in insertion order
+        """
+        columns = self._columns
+        mask = columns["alive"][: self._size].copy()
+        if risk_level is not None:
+            code = self._risk_codes.get(risk_level)
+            if code is None:
+                return np.empty(0, dtype=np.int64)
+            mask &= columns["risk_level"][: self._size] == code
+        if low_performance_predicted is not None:
+            mask &= columns["risk_level"][: self._size] >= 0
+            mask &= (
+                columns["low_performance_predicted"][: self._size]
+                == low_performance_predicted
+            )
+        return np.flatnonzero(mask)
+
+    def _sort_values(self, rows: np.ndarray, sort_by: str) -> np.ndarray:
+        """Gets the values rows are sorted by (created_at as integer us)"""
+        columns = self._columns
+        if sort_by == "created_at":
+            return columns["created_at"][rows].view(np.int64)
+        return np.where(
+            columns["risk_level"][rows] >= 0,
+            columns["performance_index_predicted"][rows],
+            NO_PERFORMANCE,
+        )
+
+    def list_page(
+        self,
+        limit: int,
+        sort_by: str = "created_at",
+        descending: bool = False,
+        cursor: Optional[tuple] = None,
+        risk_level: Optional[str] = None,
+        low_performance_predicted: Optional[int] = None,
+    ) -> List[Tuple[tuple, dict]]:
+        """
+        Gets a page of students with vectorized filters and a partial sort
+
+        Args:
+            limit: Maximum number of students
+            sort_by: Sort field (created_at or performance_index_predicted)
+            descending: Sort direction
+            cursor: Sort key (sort_value, student_id) of the last seen student
+            risk_level: Filter on risk level (optional)
+            low_performance_predicted: Filter on low performance (optional)
+
+        Returns:
+            List of (sort_key, student dict)
+        """
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Unknown sort field: {sort_by}")
+
+        rows = self.filter_rows(risk_level, low_performance_predicted)
+        values = self._sort_values(rows, sort_by)
+
+        if cursor is not None:
+            cursor_value, cursor_id = cursor
+            if sort_by == "created_at":
+                cursor_value = np.datetime64(cursor_value, "us").astype(np.int64)
+            after = values < cursor_value if descending else values > cursor_value
+            ties = np.flatnonzero(values == cursor_value)
+            tie_ids = self._id_keys(rows[ties])
+            cursor_key = cursor_id.encode("utf-8", "surrogatepass")
+            after[ties] = tie_ids < cursor_key if descending else tie_ids > cursor_key
+            rows = rows[after]
+            values = values[after]
+
+        if len(rows) > limit:
+            # Keeps the rows before the limit-th value and, among the rows
+            # tied with it, the ones with the first student IDs
+            keys = -values if descending else values
+            boundary = np.partition(keys, limit - 1)[limit - 1]
+            before = np.flatnonzero(keys < boundary)
+            ties = np.flatnonzero(keys == boundary)
+            tie_order = np.argsort(self._id_keys(rows[ties]), kind="stable")
+            if descending:
+                tie_order = tie_order[::-1]
+            keep = np.concatenate([before, ties[tie_order[: limit - len(before)]]])
+            rows = rows[keep]
+            values = values[keep]
+
+        entries = sorted(
+            zip(
+                values.tolist(),
+                self._read_strings("student_id", rows),
+                rows.tolist(),
+            ),
+            reverse=descending,
+        )[:limit]
+        if not entries:
+            return []
+
+        students = self._to_dicts(np.array([row for _, _, row in entries]))
+        if sort_by == "created_at":
+            return [
+                ((student["created_at"], student["student_id"]), student)
+                for student in students
+            ]
+        return [
+            ((value, student_id), student)
+            for (value, student_id, _), student in zip(entries, students)
+        ]
+
+    def update(
+        self,
+        student_id: str,
+        name: Optional[str] = None,
+        input_data: Optional[StudentInput] = None,
+        prediction: Optional[PredictionResponse] = None,
+        model_version: Optional[str] = None,
+    ) -> Optional[dict]:
+        """
+        Updates an existing student
+
+        Args:
+            student_id: ID of the student
+            name: New name (optional)
+            input_data: New academic data (optional)
+            prediction: New prediction (optional)
+            model_version: Version of the models that made the new prediction
+
+        Returns:
+            dict with updated data or None if not found
+        """
+        row = self._find(student_id)
+        if row is None:
+            return None
+
+        rows = np.array([row])
+        if name is not None:
+            self._heap_garbage["name"] += int(self._columns["name_length"][row])
+            self._write_strings("name", rows, [name])
+            garbage = self._heap_garbage["name"]
+            if garbage > HEAP_COMPACT_MIN_BYTES and garbage * 2 > len(
+                self._heaps["name"]
+            ):
+                self._compact_heap("name")
+        if input_data is not None:
+            self._write_inputs(rows, [input_data])
+        if prediction is not None:
+            self._aggregates.remove(self._prediction(row))
+            self._write_predictions(rows, [prediction], model_version)
+            self._aggregates.add(self._prediction(row))
+        self._columns["updated_at"][row] = np.datetime64(datetime.now(), "us")
+
+        logger.info(f"Student {student_id} updated")
+        return self._to_dicts(rows)[0]
+
+    def update_predictions(
+        self,
+        student_ids: Sequence[str],
+        predictions: Sequence[PredictionResponse],
+        model_version: str,
+    ) -> int:
+        """
+        Replaces the predictions of students not yet scored by model_version
+
+        Args:
+            student_ids: IDs of the students
+            predictions: New predictions (same order as student_ids)
+            model_version: Version of the models that made the predictions
+
+        Returns:
+            Number of students updated (missing or current ones are skipped)
+        """
+        version_code = self._code(model_version, self._versions, self._version_codes)
+        current = self._columns["model_version"]
+
+        rows = []
+        selected = []
+        for student_id, prediction in zip(student_ids, predictions):
+            row = self._find(student_id)
+            if row is not None and current[row] != version_code:
+                rows.append(row)
+                selected.append(prediction)
+
+        if rows:
+            rows = np.array(rows)
+            self._aggregates.merge(self._rows_aggregates(rows), sign=-1)
+            self._write_predictions(rows, selected, model_version)
+            self._aggregates.merge(self._rows_aggregates(rows))
+        return len(rows)
+
+    def delete(self, student_id: str) -> bool:
+        """
+        Deletes a student, leaving a tombstone in its row
+
+        Args:
+            student_id: ID of the student
+
+        Returns:
+            True if deleted, False if not found
+        """
+        row = self._find(student_id)
+        if row is None:
+            return False
+
+        self._pending_ids.pop(student_id, None)
+        self._columns["alive"][row] = False
+        for field in STRING_FIELDS:
+            self._heap_garbage[field] += int(self._columns[f"{field}_length"][row])
+        self._dead += 1
+        self._aggregates.remove(self._prediction(row))
+        if self._dead > COMPACT_MIN_ROWS and self._dead * 2 > self._size:
+            self._compact()
+
+        logger.info(f"Student {student_id} deleted")
+        return True
+
+    def _compact(self):
+        """Drops the tombstones, keeping the insertion order of the rows"""
+        self._flush_pending_ids()
+        for field in STRING_FIELDS:
+            self._compact_heap(field)
+
+        alive_mask = self._columns["alive"][: self._size]
+        new_rows = np.cumsum(alive_mask) - 1
+        indexed = alive_mask[self._id_rows]
+        self._id_hashes = self._id_hashes[indexed]
+        self._id_rows = new_rows[self._id_rows[indexed]]
+
+        alive = self._alive_rows()
+        n = len(alive)
+        for column in self._columns.values():
+            column[:n] = column[alive]
+            column[n : self._size] = 0
+        logger.info(f"Compacted {self._dead} deleted students")
+        self._size = n
+        self._dead = 0
+
+    def exists(self, student_id: str) -> bool:
+        """
+        Verifies if a student exists
+
+        Args:
+            student_id: ID of the student
+
+        Returns:
+            True if exists, False if not
+        """
+        return self._find(student_id) is not None
+
+    def count(self) -> int:
+        """
+        Counts the total number of students
+
+        Returns:
+            Total number of students
+        """
+        return self._size - self._dead
+
+    def get_aggregates(self) -> StudentAggregates:
+        """
+        Gets the running aggregates
+
+        Returns:
+            StudentAggregates of the stored students
+        """
+        return self._aggregates
@@ -0,0 +1,133 @@
+"""
+Sorted secondary indexes for keyset pagination
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SORT_FIELDS = ("created_at", "performance_index_predicted")
+
+# Sort value of students without prediction (sorted first, as NULLs in SQLite)
+NO_PERFORMANCE = -1e308
+
+PartitionKey = Tuple[Optional[str], Optional[int]]
+
+
+def partition_key(student: dict) -> PartitionKey:
+    """Gets the (risk_level, low_performance_predicted) pair of a student"""
+    prediction = student.get("prediction")
+    if not prediction:
+        return (None, None)
+    return (prediction["risk_level"], prediction["low_performance_predicted"])
+
+
+def sort_value(student: dict, sort_by: str):
+    """Gets the value a student is sorted by"""
+    if sort_by == "created_at":
+        return student["created_at"]
+    prediction = student.get("prediction")
+    if not prediction:
+        return NO_PERFORMANCE
+    return prediction["performance_index_predicted"]
+
+
+class StudentSortIndex:
+    """
+    Sorted lists of (sort_value, student_id) per sort field and partition
+
+    Students are partitioned by (risk_level, low_performance_predicted), so a
+    filtered page only visits the matching partitions: each one is positioned
+    on the cursor with a binary search and the partitions are merged lazily,
+    reading only limit entries.
+    """
+
+    def __init__(self):
+        """Initializes empty indexes"""
+        self._lists: Dict[Tuple[str, PartitionKey], List[tuple]] = {}
+
+    def add(self, student: dict):
+        """Adds a student to every index"""
+        partition = partition_key(student)
+        for sort_by in SORT_FIELDS:
+            entries = self._lists.setdefault((sort_by, partition), [])
+            insort(entries, (sort_value(student, sort_by), student["student_id"]))
+
+    def add_many(self, students: List[dict]):
+        """Adds several students, sorting each touched list once"""
+        touched = set()
+        for student in students:
+            partition = partition_key(student)
+            for sort_by in SORT_FIELDS:
+                key = (sort_by, partition)
+                self._lists.setdefault(key, []).append(
+                    (sort_value(student, sort_by), student["student_id"])
+                )
+                touched.add(key)
+        for key in touched:
+            self._lists[key].sort()
+
+    def remove(self, student: dict):
+        """Removes a student from every index"""
+        partition = partition_key(student)
+        for sort_by in SORT_FIELDS:
+            entries = self._lists.get((sort_by, partition))
+            if not entries:
+                continue
+            entry = (sort_value(student, sort_by), student["student_id"])
+            position = bisect_left(entries, entry)
+            if position < len(entries) and entries[position] == entry:
+                del entries[position]
+
+    def _partitions(
+        self, sort_by: str, risk_level: Optional[str], low_performance: Optional[int]
+    ) -> List[List[tuple]]:
+        """Gets the lists of the partitions matching the filters"""
+        return [
+            entries
+            for (field, (risk, low)), entries in self._lists.items()
+            if field == sort_by
+            and (risk_level is None or risk == risk_level)
+            and (low_performance is None or low == low_performance)
+        ]
+
+    @staticmethod
+    def _iter_from(
+        entries: List[tuple], cursor: Optional[tuple], descending: bool
+    ) -> Iterator[tuple]:
+        """Iterates a sorted list starting right after the cursor"""
+        if descending:
+            end = len(entries) if cursor is None else bisect_left(entries, cursor)
+            return (entries[i] for i in range(end - 1, -1, -1))
+        start = 0 if cursor is None else bisect_right(entries, cursor)
+        return (entries[i] for i in range(start, len(entries)))
+
+    def page(
+        self,
+        sort_by: str,
+        descending: bool,
+        limit: int,
+        cursor: Optional[tuple] = None,
+        risk_level: Optional[str] = None,
+        low_performance: Optional[int] = None,
+    ) -> List[tuple]:
+        """
+        Gets up to limit entries after the cursor
+
+        Args:
+            sort_by: Sort field (one of SORT_FIELDS)
+            descending: Sort direction
+            limit: Maximum number of entries
+            cursor: (sort_value, student_id) of the last entry already returned
+            risk_level: Filter on risk level (optional)
+            low_performance: Filter on low_performance_predicted (optional)
+
+        Returns:
+            List of (sort_value, student_id)
+        """
+        iterators = [
+            self._iter_from(entries, cursor, descending)
+            for entries in self._partitions(sort_by, risk_level, low_performance)
+        ]
+        return list(islice(heapq.merge(*iterators, reverse=descending), limit))
@@ -0,0 +1,750 @@
+"""
+Students Repository on SQLite
+"""
+
+import logging
+import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.models.schemas import PredictionResponse, StudentInput
+from app.repositories.aggregates import StudentAggregates
+from app.repositories.base import IStudentRepository
+from app.repositories.sorted_index import NO_PERFORMANCE, sort_value
+
+logger = logging.getLogger(__name__)
+
+INPUT_COLUMNS = [
+    "hours_studied",
+    "previous_scores",
+    "extracurricular_activities",
+    "sleep_hours",
+    "sample_questions_practiced",
+]
+
+PREDICTION_COLUMNS = [
+    "performance_index_predicted",
+    "low_performance_predicted",
+    "low_performance_probability",
+    "risk_level",
+]
+
+COLUMNS = (
+    ["student_id", "name"]
+    + INPUT_COLUMNS
+    + PREDICTION_COLUMNS
+    + ["created_at", "updated_at", "model_version"]
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    student_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    hours_studied REAL NOT NULL,
+    previous_scores REAL NOT NULL,
+    extracurricular_activities INTEGER NOT NULL,
+    sleep_hours REAL NOT NULL,
+    sample_questions_practiced INTEGER NOT NULL,
+    performance_index_predicted REAL,
+    low_performance_predicted INTEGER,
+    low_performance_probability REAL,
+    risk_level TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    model_version TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_students_risk_level ON students (risk_level);
+CREATE INDEX IF NOT EXISTS idx_students_low_performance
+    ON students (low_performance_predicted);
+CREATE INDEX IF NOT EXISTS idx_students_performance
+    ON students (performance_index_predicted);
+CREATE INDEX IF NOT EXISTS idx_students_performance_key
+    ON students (IFNULL(performance_index_predicted, {no_performance}), student_id);
+CREATE INDEX IF NOT EXISTS idx_students_created_key
+    ON students (created_at, student_id);
+CREATE INDEX IF NOT EXISTS idx_students_risk_performance_key
+    ON students (
+        risk_level, IFNULL(performance_index_predicted, {no_performance}), student_id
+    );
+CREATE INDEX IF NOT EXISTS idx_students_risk_created_key
+    ON students (risk_level, created_at, student_id);
+CREATE TABLE IF NOT EXISTS student_aggregates (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    count INTEGER NOT NULL,
+    with_prediction INTEGER NOT NULL,
+    at_risk INTEGER NOT NULL,
+    performance_sum_cents INTEGER NOT NULL,
+    performance_sumsq_cents INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS student_risk_level_counts (
+    risk_level TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS student_performance_bins (
+    bin INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+""".format(no_performance=NO_PERFORMANCE)
+
+AGGREGATE_COLUMNS = [
+    "count",
+    "with_prediction",
+    "at_risk",
+    "performance_sum_cents",
+    "performance_sumsq_cents",
+]
+UPDATE_AGGREGATES_SQL = (
+    "UPDATE student_aggregates SET "
+    + ", ".join(f"{column} = {column} + ?" for column in AGGREGATE_COLUMNS)
+    + " WHERE id = 0"
+)
+UPSERT_RISK_LEVEL_SQL = (
+    "INSERT INTO student_risk_level_counts (risk_level, count) VALUES (?, ?) "
+    "ON CONFLICT (risk_level) DO UPDATE SET count = count + excluded.count"
+)
+UPSERT_BIN_SQL = (
+    "INSERT INTO student_performance_bins (bin, count) VALUES (?, ?) "
+    "ON CONFLICT (bin) DO UPDATE SET count = count + excluded.count"
+)
+
+SORT_EXPRESSIONS = {
+    "created_at": "created_at",
+    "performance_index_predicted": (
+        f"IFNULL(performance_index_predicted, {NO_PERFORMANCE})"
+    ),
+}
+
+SELECT_SQL = f"SELECT {', '.join(COLUMNS)} FROM students"
+INSERT_SQL = (
+    f"INSERT INTO students ({', '.join(COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in COLUMNS)})"
+)
+# Stays below SQLITE_MAX_VARIABLE_NUMBER on older builds
+EXISTING_IDS_CHUNK = 900
+
+
+class SQLiteStudentRepository(IStudentRepository):
+    """
+    Repository for managing students persisted on SQLite
+
+    Uses WAL journaling, a primary key on student_id and indexes on the risk
+    and performance columns. Statements are constant strings so sqlite3
+    reuses its prepared statement cache. A single connection is shared and
+    guarded by a lock.
+
+    Several API worker processes may open the same file. Writes take the
+    write lock up front (BEGIN IMMEDIATE) and wait on busy_timeout, so the
+    row they read is the row they change. The aggregates are stored in
+    their own tables, updated in the transaction of each write. The copy in
+    memory is reloaded from those tables (a few rows per risk level and
+    performance bin, not a scan of the students) when PRAGMA data_version
+    shows that another connection committed.
+    """
+
+    def __init__(self, path: str, busy_timeout_seconds: float = 5.0):
+        """
+        Initializes the repository
+
+        Args:
+            path: Path of the SQLite database file
+            busy_timeout_seconds: Time to wait for a lock held by another process
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            path,
+            timeout=busy_timeout_seconds,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=64,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        with self._lock:
+            # Serialized so concurrent workers do not migrate twice
+            with self._write_transaction():
+                self._migrate()
+            self._data_version = self._get_data_version()
+            self._aggregates = self._read_aggregates()
+        logger.info(f"SQLiteStudentRepository initialized at {path}")
+
+    @contextmanager
+    def _write_transaction(self):
+        """Runs a block in a transaction that takes the write lock up front"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _migrate(self):
+        """Adds what is missing in databases created by older versions"""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(students)")}
+        if "model_version" not in columns:
+            self._conn.execute("ALTER TABLE students ADD COLUMN model_version TEXT")
+            logger.info("Added model_version column to students")
+
+        stored = self._conn.execute("SELECT 1 FROM student_aggregates").fetchone()
+        if stored is None:
+            self._conn.execute(
+                f"INSERT INTO student_aggregates (id, {', '.join(AGGREGATE_COLUMNS)}) "
+                "VALUES (0, 0, 0, 0, 0, 0)"
+            )
+            self._store_aggregates(added=self._scan_aggregates())
+            logger.info("Stored the aggregates of the existing students")
+
+    @staticmethod
+    def _to_row(
+        student_id: str,
+        name: str,
+        input_data: StudentInput,
+        prediction: Optional[PredictionResponse],
+        created_at: datetime,
+        updated_at: datetime,
+        model_version: Optional[str] = None,
+    ) -> tuple:
+        """Flattens a student into a row of COLUMNS"""
+        if prediction is not None:
+            prediction_values = (
+                prediction.performance_index_predicted,
+                prediction.low_performance_predicted,
+                prediction.low_performance_probability,
+                prediction.risk_level,
+            )
+        else:
+            prediction_values = (None, None, None, None)
+
+        return (
+            student_id,
+            name,
+            input_data.hours_studied,
+            input_data.previous_scores,
+            input_data.extracurricular_activities,
+            input_data.sleep_hours,
+            input_data.sample_questions_practiced,
+            *prediction_values,
+            created_at.isoformat(),
+            updated_at.isoformat(),
+            model_version if prediction is not None else None,
+        )
+
+    @staticmethod
+    def _to_dict(row: tuple) -> dict:
+        """Builds the student dict of a row of COLUMNS"""
+        prediction = None
+        if row[7] is not None:
+            prediction = dict(zip(PREDICTION_COLUMNS, row[7:11]))
+
+        return {
+            "student_id": row[0],
+            "name": row[1],
+            "input_data": dict(zip(INPUT_COLUMNS, row[2:7])),
+            "prediction": prediction,
+            "model_version": row[13],
+            "created_at": datetime.fromisoformat(row[11]),
+            "updated_at": datetime.fromisoformat(row[12]),
+        }
+
+    def create(
+        self,
+        student_id: str,
+        name: str,
+        input_data: StudentInput,
+        prediction: Optional[PredictionResponse] = None,
+        model_version: Optional[str] = None,
+    ) -> dict:
+        """
+        Creates a new student
+
+        Args:
+            student_id: Unique student ID
+            name: Student name
+            input_data: Academic data
+            prediction: Prediction (optional)
+            model_version: Version of the models that made the prediction
+
+        Returns:
+            dict with student data
+
+        Raises:
+            ValueError: If student_id already exists
+        """
+        now = datetime.now()
+        row = self._to_row(
+            student_id, name, input_data, prediction, now, now, model_version
+        )
+
+        student = self._to_dict(row)
+
+        added = _aggregates_of([student["prediction"]])
+        with self._lock:
+            try:
+                with self._write_transaction():
+                    self._conn.execute(INSERT_SQL, row)
+                    self._store_aggregates(added=added)
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Student with ID {student_id} already exists")
+            self._aggregates.merge(added)
+
+        logger.info(f"Student {student_id} created successfully")
+        return student
+
+    def create_many(
+        self,
+        student_ids: Sequence[str],
+        names: Sequence[str],
+        inputs: Sequence[StudentInput],
+        predictions: Sequence[Optional[PredictionResponse]],
+        model_version: Optional[str] = None,
+    ) -> List[dict]:
+        """
+        Creates several students in one transaction (all or nothing)
+
+        Args:
+            student_ids: Unique student IDs
+            names: Student names
+            inputs: Academic data
+            predictions: Predictions (items may be None)
+            model_version: Version of the models that made the predictions
+
+        Returns:
+            List of dicts with student data
+
+        Raises:
+            ValueError: If any student_id already exists or is repeated
+        """
+        now = datetime.now()
+        rows = [
+            self._to_row(
+                student_id, name, input_data, prediction, now, now, model_version
+            )
+            for student_id, name, input_data, prediction in zip(
+                student_ids, names, inputs, predictions
+            )
+        ]
+
+        students = [self._to_dict(row) for row in rows]
+        added = _aggregates_of(student["prediction"] for student in students)
+        with self._lock:
+            try:
+                with self._write_transaction():
+                    self._conn.executemany(INSERT_SQL, rows)
+                    self._store_aggregates(added=added)
+            except sqlite3.IntegrityError as e:
+                raise ValueError(f"Bulk creation rejected: {str(e)}")
+            self._aggregates.merge(added)
+
+        logger.info(f"{len(rows)} students created in bulk")
+        return students
+
+    def get_by_id(self, student_id: str) -> Optional[dict]:
+        """
+        Gets a student by ID
+
+        Args:
+            student_id: ID of the student
+
+        Returns:
+            dict with student data or None if not found
+        """
+        with self._lock:
+            row = self._conn.execute(
+                SELECT_SQL + " WHERE student_id = ?", (student_id,)
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def get_all(self) -> List[dict]:
+        """
+        Gets all students
+
+        Returns:
+            List of students
+        """
+        with self._lock:
+            rows = self._conn.execute(SELECT_SQL + " ORDER BY rowid").fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def list_page(
+        self,
+        limit: int,
+        sort_by: str = "created_at",
+        descending: bool = False,
+        cursor: Optional[tuple] = None,
+        risk_level: Optional[str] = None,
+        low_performance_predicted: Optional[int] = None,
+    ) -> List[Tuple[tuple, dict]]:
+        """
+        Gets a page of students with an indexed keyset query
+
+        Args:
+            limit: Maximum number of students
+            sort_by: Sort field (created_at or performance_index_predicted)
+            descending: Sort direction
+            cursor: Sort key (sort_value, student_id) of the last seen student
+            risk_level: Filter on risk level (optional)
+            low_performance_predicted: Filter on low performance (optional)
+
+        Returns:
+            List of (sort_key, student dict)
+        """
+        sort_expression = SORT_EXPRESSIONS[sort_by]
+        direction = "DESC" if descending else "ASC"
+        conditions = []
+        params: list = []
+
+        if risk_level is not None:
+            conditions.append("risk_level = ?")
+            params.append(risk_level)
+
+        if low_performance_predicted is not None:
+            conditions.append("low_performance_predicted = ?")
+            params.append(low_performance_predicted)
+
+        if cursor is not None:
+            value, student_id = cursor
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            # Expanded keyset condition so SQLite can seek the index range
+            operator = "<" if descending else ">"
+            conditions.append(
+                f"{sort_expression} {operator}= ? AND "
+                f"({sort_expression} {operator} ? OR student_id {operator} ?)"
+            )
+            params.extend([value, value, student_id])
+
+        sql = SELECT_SQL
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += (
+            f" ORDER BY {sort_expression} {direction}, student_id {direction} LIMIT ?"
+        )
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        students = [self._to_dict(row) for row in rows]
+        return [
+            ((sort_value(student, sort_by), student["student_id"]), student)
+            for student in students
+        ]
+
+    def update(
+        self,
+        student_id: str,
+        name: Optional[str] = None,
+        input_data: Optional[StudentInput] = None,
+        prediction: Optional[PredictionResponse] = None,
+        model_version: Optional[str] = None,
+    ) -> Optional[dict]:
+        """
+        Updates an existing student
+
+        Args:
+            student_id: ID of the student
+            name: New name (optional)
+            input_data: New academic data (optional)
+            prediction: New prediction (optional)
+            model_version: Version of the models that made the new prediction
+
+        Returns:
+            dict with updated data or None if not found
+        """
+        assignments = ["updated_at = ?"]
+        params: list = [datetime.now().isoformat()]
+
+        if name is not None:
+            assignments.append("name = ?")
+            params.append(name)
+
+        if input_data is not None:
+            for column in INPUT_COLUMNS:
+                assignments.append(f"{column} = ?")
+                params.append(getattr(input_data, column))
+
+        if prediction is not None:
+            for column in PREDICTION_COLUMNS:
+                assignments.append(f"{column} = ?")
+                params.append(getattr(prediction, column))
+            assignments.append("model_version = ?")
+            params.append(model_version)
+
+        with self._lock:
+            with self._write_transaction():
+                previous = self.get_by_id(student_id)
+                if previous is None:
+                    return None
+                cursor = self._conn.execute(
+                    f"UPDATE students SET {', '.join(assignments)} "
+                    "WHERE student_id = ?",
+                    (*params, student_id),
+                )
+                if cursor.rowcount == 0:
+                    return None
+                student = self.get_by_id(student_id)
+                added = _aggregates_of([student["prediction"]])
+                removed = _aggregates_of([previous["prediction"]])
+                self._store_aggregates(added, removed)
+            self._aggregates.merge(added)
+            self._aggregates.merge(removed, sign=-1)
+
+        logger.info(f"Student {student_id} updated")
+        return student
+
+    def update_predictions(
+        self,
+        student_ids: Sequence[str],
+        predictions: Sequence[PredictionResponse],
+        model_version: str,
+    ) -> int:
+        """
+        Replaces the predictions of students not yet scored by model_version
+
+        Args:
+            student_ids: IDs of the students
+            predictions: New predictions (same order as student_ids)
+            model_version: Version of the models that made the predictions
+
+        Returns:
+            Number of students updated (missing or current ones are skipped)
+        """
+        new_predictions = {
+            student_id: prediction
+            for student_id, prediction in zip(student_ids, predictions)
+        }
+        assignments = ", ".join(f"{column} = ?" for column in PREDICTION_COLUMNS)
+
+        with self._lock:
+            with self._write_transaction():
+                previous = {}
+                ids = list(new_predictions)
+                for start in range(0, len(ids), EXISTING_IDS_CHUNK):
+                    chunk = ids[start : start + EXISTING_IDS_CHUNK]
+                    rows = self._conn.execute(
+                        f"SELECT student_id, {', '.join(PREDICTION_COLUMNS)} "
+                        "FROM students "
+                        f"WHERE student_id IN ({','.join('?' * len(chunk))}) "
+                        "AND model_version IS NOT ?",
+                        (*chunk, model_version),
+                    ).fetchall()
+                    for row in rows:
+                        previous[row[0]] = (
+                            dict(zip(PREDICTION_COLUMNS, row[1:]))
+                            if row[1] is not None
+                            else None
+                        )
+
+                params = [
+                    (
+                        *(
+                            getattr(new_predictions[student_id], column)
+                            for column in PREDICTION_COLUMNS
+                        ),
+                        model_version,
+                        student_id,
+                    )
+                    for student_id in previous
+                ]
+                self._conn.executemany(
+                    f"UPDATE students SET {assignments}, model_version = ? "
+                    "WHERE student_id = ?",
+                    params,
+                )
+                added = _aggregates_of(
+                    new_predictions[student_id].model_dump() for student_id in previous
+                )
+                removed = _aggregates_of(previous.values())
+                self._store_aggregates(added, removed)
+            self._aggregates.merge(added)
+            self._aggregates.merge(removed, sign=-1)
+
+        return len(previous)
+
+    def delete(self, student_id: str) -> bool:
+        """
+        Deletes a student
+
+        Args:
+            student_id: ID of the student
+
+        Returns:
+            True if deleted, False if not found
+        """
+        with self._lock:
+            with self._write_transaction():
+                previous = self.get_by_id(student_id)
+                if previous is None:
+                    return False
+                cursor = self._conn.execute(
+                    "DELETE FROM students WHERE student_id = ?", (student_id,)
+                )
+                if cursor.rowcount != 1:
+                    return False
+                removed = _aggregates_of([previous["prediction"]])
+                self._store_aggregates(removed=removed)
+            self._aggregates.merge(removed, sign=-1)
+
+        logger.info(f"Student {student_id} deleted")
+        return True
+
+    def existing_ids(self, student_ids: Iterable[str]) -> Set[str]:
+        """
+        Gets the subset of student_ids that are already stored
+
+        Args:
+            student_ids: IDs to look up
+
+        Returns:
+            Set of IDs present in the table
+        """
+        student_ids = list(student_ids)
+        found = set()
+        with self._lock:
+            for start in range(0, len(student_ids), EXISTING_IDS_CHUNK):
+                chunk = student_ids[start : start + EXISTING_IDS_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT student_id FROM students "
+                    f"WHERE student_id IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                found.update(row[0] for row in rows)
+        return found
+
+    def exists(self, student_id: str) -> bool:
+        """
+        Verifies if a student exists
+
+        Args:
+            student_id: ID of the student
+
+        Returns:
+            True if exists, False if not
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM students WHERE student_id = ?", (student_id,)
+            ).fetchone()
+        return row is not None
+
+    def count(self) -> int:
+        """
+        Counts the total number of students
+
+        Returns:
+            Total number of students
+        """
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+
+    def _scan_aggregates(self) -> StudentAggregates:
+        """Builds the aggregates with a full scan of the students"""
+        rows = self._conn.execute(
+            f"SELECT {', '.join(PREDICTION_COLUMNS)} FROM students"
+        )
+        return _aggregates_of(
+            dict(zip(PREDICTION_COLUMNS, row)) if row[0] is not None else None
+            for row in rows
+        )
+
+    def _store_aggregates(
+        self,
+        added: Optional[StudentAggregates] = None,
+        removed: Optional[StudentAggregates] = None,
+    ):
+        """
+        Applies the students added and removed by a write to the aggregate
+        tables (inside the transaction of the write)
+        """
+        added = added or StudentAggregates()
+        removed = removed or StudentAggregates()
+        self._conn.execute(
+            UPDATE_AGGREGATES_SQL,
+            [
+                getattr(added, column) - getattr(removed, column)
+                for column in AGGREGATE_COLUMNS
+            ],
+        )
+        for table, upsert, counts, removed_counts in (
+            (
+                "student_risk_level_counts",
+                UPSERT_RISK_LEVEL_SQL,
+                added.risk_levels,
+                removed.risk_levels,
+            ),
+            (
+                "student_performance_bins",
+                UPSERT_BIN_SQL,
+                added.sketch.bins,
+                removed.sketch.bins,
+            ),
+        ):
+            delta = Counter(counts)
+            delta.subtract(removed_counts)
+            self._conn.executemany(
+                upsert, [(key, count) for key, count in delta.items() if count]
+            )
+            if removed_counts:
+                self._conn.execute(f"DELETE FROM {table} WHERE count <= 0")
+
+    def _read_aggregates(self) -> StudentAggregates:
+        """Loads the aggregates from their tables, in one read transaction"""
+        aggregates = StudentAggregates()
+        self._conn.execute("BEGIN")
+        try:
+            totals = self._conn.execute(
+                f"SELECT {', '.join(AGGREGATE_COLUMNS)} FROM student_aggregates"
+            ).fetchone()
+            risk_levels = self._conn.execute(
+                "SELECT risk_level, count FROM student_risk_level_counts"
+            ).fetchall()
+            bins = self._conn.execute(
+                "SELECT bin, count FROM student_performance_bins"
+            ).fetchall()
+        finally:
+            self._conn.execute("COMMIT")
+
+        for column, value in zip(AGGREGATE_COLUMNS, totals):
+            setattr(aggregates, column, value)
+        aggregates.risk_levels = dict(risk_levels)
+        aggregates.sketch.bins = dict(bins)
+        aggregates.sketch.count = aggregates.with_prediction
+        return aggregates
+
+    def _get_data_version(self) -> int:
+        """Gets the counter SQLite bumps when other connections commit"""
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def get_aggregates(self) -> StudentAggregates:
+        """
+        Gets the running aggregates
+
+        Returns:
+            StudentAggregates kept up to date on every write of this process,
+            reloaded from the aggregate tables after writes of other processes
+        """
+        with self._lock:
+            data_version = self._get_data_version()
+            if data_version != self._data_version:
+                self._aggregates = self._read_aggregates()
+                self._data_version = data_version
+            return self._aggregates
+
+    def close(self):
+        """Closes the database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+def _aggregates_of(predictions: Iterable[Optional[dict]]) -> StudentAggregates:
+    """Aggregates of the students with the given stored predictions"""
+    aggregates = StudentAggregates()
+    for prediction in predictions:
+        aggregates.add(prediction)
+    return aggregates
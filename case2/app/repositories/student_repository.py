@@ -4,22 +4,27 @@ Students Repository
 
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from app.models.schemas import PredictionResponse, StudentInput
+from app.repositories.aggregates import StudentAggregates
+from app.repositories.base import IStudentRepository
+from app.repositories.sorted_index import StudentSortIndex
 
 logger = logging.getLogger(__name__)
 
 
-class StudentRepository:
+class StudentRepository(IStudentRepository):
     """
     Repository for managing students in memory (simulates DB)
-    Principle: Dependency Inversion - Could implement an IRepository interface
+    Principle: Dependency Inversion - Implements IStudentRepository
     """
 
     def __init__(self):
         """Initialize the repository on memory"""
         self._students: Dict[str, dict] = {}
+        self._index = StudentSortIndex()
+        self._aggregates = StudentAggregates()
         logger.info("StudentRepository initialized")
 
     def create(
@@ -28,6 +33,7 @@ class StudentRepository:
         name: str,
         input_data: StudentInput,
         prediction: Optional[PredictionResponse] = None,
+        model_version: Optional[str] = None,
     ) -> dict:
         """
         Creates a new student
@@ -37,6 +43,7 @@ class StudentRepository:
             name: Student name
             input_data: Academic data
             prediction: Prediction (optional)
+            model_version: Version of the models that made the prediction
 
         Returns:
             dict with student data
@@ -52,15 +59,71 @@ class StudentRepository:
             "name": name,
             "input_data": input_data.model_dump(),
             "prediction": prediction.model_dump() if prediction else None,
+            "model_version": model_version if prediction else None,
             "created_at": datetime.now(),
             "updated_at": datetime.now(),
         }
 
         self._students[student_id] = student_data
+        self._index.add(student_data)
+        self._aggregates.add(student_data["prediction"])
         logger.info(f"Student {student_id} created successfully")
 
         return student_data
 
+    def create_many(
+        self,
+        student_ids: Sequence[str],
+        names: Sequence[str],
+        inputs: Sequence[StudentInput],
+        predictions: Sequence[Optional[PredictionResponse]],
+        model_version: Optional[str] = None,
+    ) -> List[dict]:
+        """
+        Creates several students (all or nothing)
+
+        Args:
+            student_ids: Unique student IDs
+            names: Student names
+            inputs: Academic data
+            predictions: Predictions (items may be None)
+            model_version: Version of the models that made the predictions
+
+        Returns:
+            List of dicts with student data
+
+        Raises:
+            ValueError: If any student_id already exists or is repeated
+        """
+        if len(set(student_ids)) != len(student_ids):
+            raise ValueError("Repeated student IDs in bulk creation")
+
+        existing = [sid for sid in student_ids if sid in self._students]
+        if existing:
+            raise ValueError(f"Students with IDs {existing[:10]} already exist")
+
+        now = datetime.now()
+        created = []
+        for student_id, name, input_data, prediction in zip(
+            student_ids, names, inputs, predictions
+        ):
+            student_data = {
+                "student_id": student_id,
+                "name": name,
+                "input_data": input_data.model_dump(),
+                "prediction": prediction.model_dump() if prediction else None,
+                "model_version": model_version if prediction else None,
+                "created_at": now,
+                "updated_at": now,
+            }
+            self._students[student_id] = student_data
+            self._aggregates.add(student_data["prediction"])
+            created.append(student_data)
+        self._index.add_many(created)
+
+        logger.info(f"{len(created)} students created in bulk")
+        return created
+
     def get_by_id(self, student_id: str) -> Optional[dict]:
         """
         Gets a student by ID
@@ -82,12 +145,46 @@ class StudentRepository:
         """
         return list(self._students.values())
 
+    def list_page(
+        self,
+        limit: int,
+        sort_by: str = "created_at",
+        descending: bool = False,
+        cursor: Optional[tuple] = None,
+        risk_level: Optional[str] = None,
+        low_performance_predicted: Optional[int] = None,
+    ) -> List[Tuple[tuple, dict]]:
+        """
+        Gets a page of students using the sorted indexes (no full scan)
+
+        Args:
+            limit: Maximum number of students
+            sort_by: Sort field (created_at or performance_index_predicted)
+            descending: Sort direction
+            cursor: Sort key (sort_value, student_id) of the last seen student
+            risk_level: Filter on risk level (optional)
+            low_performance_predicted: Filter on low performance (optional)
+
+        Returns:
+            List of (sort_key, student dict)
+        """
+        entries = self._index.page(
+            sort_by,
+            descending,
+            limit,
+            cursor,
+            risk_level,
+            low_performance_predicted,
+        )
+        return [(entry, self._students[entry[1]]) for entry in entries]
+
     def update(
         self,
         student_id: str,
         name: Optional[str] = None,
         input_data: Optional[StudentInput] = None,
         prediction: Optional[PredictionResponse] = None,
+        model_version: Optional[str] = None,
     ) -> Optional[dict]:
         """
         Updates an existing student
@@ -97,6 +194,7 @@ class StudentRepository:
             name: New name (optional)
             input_data: New academic data (optional)
             prediction: New prediction (optional)
+            model_version: Version of the models that made the new prediction
 
         Returns:
             dict with updated data or None if not found
@@ -105,6 +203,8 @@ class StudentRepository:
             return None
 
         student = self._students[student_id]
+        self._index.remove(student)
+        self._aggregates.remove(student["prediction"])
 
         if name is not None:
             student["name"] = name
@@ -114,12 +214,48 @@ class StudentRepository:
 
         if prediction is not None:
             student["prediction"] = prediction.model_dump()
+            student["model_version"] = model_version
 
         student["updated_at"] = datetime.now()
+        self._index.add(student)
+        self._aggregates.add(student["prediction"])
 
         logger.info(f"Student {student_id} updated")
         return student
 
+    def update_predictions(
+        self,
+        student_ids: Sequence[str],
+        predictions: Sequence[PredictionResponse],
+        model_version: str,
+    ) -> int:
+        """
+        Replaces the predictions of students not yet scored by model_version
+
+        Args:
+            student_ids: IDs of the students
+            predictions: New predictions (same order as student_ids)
+            model_version: Version of the models that made the predictions
+
+        Returns:
+            Number of students updated (missing or current ones are skipped)
+        """
+        updated = 0
+        for student_id, prediction in zip(student_ids, predictions):
+            student = self._students.get(student_id)
+            if student is None or student.get("model_version") == model_version:
+                continue
+
+            self._index.remove(student)
+            self._aggregates.remove(student["prediction"])
+            student["prediction"] = prediction.model_dump()
+            student["model_version"] = model_version
+            self._index.add(student)
+            self._aggregates.add(student["prediction"])
+            updated += 1
+
+        return updated
+
     def delete(self, student_id: str) -> bool:
         """
         Deletes a student
@@ -131,7 +267,9 @@ class StudentRepository:
             True if deleted, False if not found
         """
         if student_id in self._students:
-            del self._students[student_id]
+            student = self._students.pop(student_id)
+            self._index.remove(student)
+            self._aggregates.remove(student["prediction"])
             logger.info(f"Student {student_id} deleted")
             return True
         return False
@@ -156,3 +294,12 @@ class StudentRepository:
             Total number of students
         """
         return len(self._students)
+
+    def get_aggregates(self) -> StudentAggregates:
+        """
+        Gets the running aggregates
+
+        Returns:
+            StudentAggregates kept up to date on every write
+        """
+        return self._aggregates
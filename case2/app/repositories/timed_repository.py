@@ -0,0 +1,128 @@
+"""
+Students Repository decorator that times the backend calls
+"""
+
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.metrics import stage_timer
+from app.models.schemas import PredictionResponse, StudentInput
+from app.repositories.aggregates import StudentAggregates
+from app.repositories.base import IStudentRepository
+
+
+class TimedStudentRepository(IStudentRepository):
+    """
+    Wraps a repository backend and records the duration of every call
+
+    Each method is observed as the stage "repository.<method>" of
+    app_stage_duration_seconds, whatever the backend.
+    """
+
+    def __init__(self, repository: IStudentRepository):
+        """
+        Initializes the decorator
+
+        Args:
+            repository: Backend to delegate to
+        """
+        self.repository = repository
+
+    def create(
+        self,
+        student_id: str,
+        name: str,
+        input_data: StudentInput,
+        prediction: Optional[PredictionResponse] = None,
+        model_version: Optional[str] = None,
+    ) -> dict:
+        with stage_timer("repository.create"):
+            return self.repository.create(
+                student_id, name, input_data, prediction, model_version
+            )
+
+    def create_many(
+        self,
+        student_ids: Sequence[str],
+        names: Sequence[str],
+        inputs: Sequence[StudentInput],
+        predictions: Sequence[Optional[PredictionResponse]],
+        model_version: Optional[str] = None,
+    ) -> List[dict]:
+        with stage_timer("repository.create_many"):
+            return self.repository.create_many(
+                student_ids, names, inputs, predictions, model_version
+            )
+
+    def get_by_id(self, student_id: str) -> Optional[dict]:
+        with stage_timer("repository.get_by_id"):
+            return self.repository.get_by_id(student_id)
+
+    def get_all(self) -> List[dict]:
+        with stage_timer("repository.get_all"):
+            return self.repository.get_all()
+
+    def list_page(
+        self,
+        limit: int,
+        sort_by: str = "created_at",
+        descending: bool = False,
+        cursor: Optional[tuple] = None,
+        risk_level: Optional[str] = None,
+        low_performance_predicted: Optional[int] = None,
+    ) -> List[Tuple[tuple, dict]]:
+        with stage_timer("repository.list_page"):
+            return self.repository.list_page(
+                limit,
+                sort_by=sort_by,
+                descending=descending,
+                cursor=cursor,
+                risk_level=risk_level,
+                low_performance_predicted=low_performance_predicted,
+            )
+
+    def update(
+        self,
+        student_id: str,
+        name: Optional[str] = None,
+        input_data: Optional[StudentInput] = None,
+        prediction: Optional[PredictionResponse] = None,
+        model_version: Optional[str] = None,
+    ) -> Optional[dict]:
+        with stage_timer("repository.update"):
+            return self.repository.update(
+                student_id, name, input_data, prediction, model_version
+            )
+
+    def update_predictions(
+        self,
+        student_ids: Sequence[str],
+        predictions: Sequence[PredictionResponse],
+        model_version: str,
+    ) -> int:
+        with stage_timer("repository.update_predictions"):
+            return self.repository.update_predictions(
+                student_ids, predictions, model_version
+            )
+
+    def delete(self, student_id: str) -> bool:
+        with stage_timer("repository.delete"):
+            return self.repository.delete(student_id)
+
+    def exists(self, student_id: str) -> bool:
+        with stage_timer("repository.exists"):
+            return self.repository.exists(student_id)
+
+    def count(self) -> int:
+        with stage_timer("repository.count"):
+            return self.repository.count()
+
+    def get_aggregates(self) -> StudentAggregates:
+        with stage_timer("repository.get_aggregates"):
+            return self.repository.get_aggregates()
+
+    def existing_ids(self, student_ids: Iterable[str]) -> Set[str]:
+        with stage_timer("repository.existing_ids"):
+            return self.repository.existing_ids(student_ids)
+
+    def close(self):
+        self.repository.close()
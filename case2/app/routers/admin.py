@@ -0,0 +1,214 @@
+"""
+Admin Router
+Endpoints to run maintenance jobs
+"""
+
+import logging
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response
+
+from app.profiling import (
+    FORMAT_COLLAPSED,
+    FORMAT_PSTATS,
+    MODE_SAMPLING,
+    PROFILER,
+)
+from app.routers.dependencies import get_container
+from app.services.container import ServiceContainer
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+)
+
+
+@router.post(
+    "/rescore",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Re-score stored predictions",
+    description="Starts a background job that recomputes every stored prediction "
+    "made by another version of the models",
+)
+async def start_rescore(
+    container: ServiceContainer = Depends(get_container),
+) -> dict:
+    """
+    Starts the re-scoring job
+
+    - Students are processed in vectorized chunks of RESCORE_CHUNK_SIZE
+    - Progress is reported by GET /admin/rescore
+    """
+    job = container.rescore_job
+    if not job.start():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A re-scoring job is already running",
+        )
+    return job.progress()
+
+
+@router.get(
+    "/rescore",
+    summary="Re-scoring progress",
+    description="Gets the progress of the current or last re-scoring job",
+)
+async def get_rescore_progress(
+    container: ServiceContainer = Depends(get_container),
+) -> dict:
+    """
+    Gets the re-scoring progress
+    """
+    return container.rescore_job.progress()
+
+
+@router.post(
+    "/models/reload",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Hot reload the models",
+    description="Loads the model files in the background, validates and warms "
+    "them up, and swaps them in without interrupting the requests in flight",
+)
+async def start_model_reload(
+    container: ServiceContainer = Depends(get_container),
+) -> dict:
+    """
+    Starts a model reload
+
+    - The new models are validated on a canary batch before the swap
+    - Requests already running finish on the old models
+    - Progress and metrics are reported by GET /admin/models/reload
+    """
+    reloader = container.model_reloader
+    if not reloader.start(trigger="admin"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A model reload is already running",
+        )
+    return reloader.progress()
+
+
+@router.get(
+    "/models/reload",
+    summary="Model reload status",
+    description="Gets the state, step durations and old/new latency of the "
+    "current or last model reload",
+)
+async def get_model_reload_progress(
+    container: ServiceContainer = Depends(get_container),
+) -> dict:
+    """
+    Gets the model reload status and metrics
+    """
+    return container.model_reloader.progress()
+
+
+def _check_profiling_enabled(container: ServiceContainer):
+    """Profiling endpoints are only available with PROFILING_ENABLED"""
+    if not container.settings.PROFILING_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profiling is disabled (PROFILING_ENABLED=false)",
+        )
+
+
+@router.post(
+    "/profiling",
+    summary="Start profiling",
+    description="Starts profiling a sample of the live requests, discarding the "
+    "results of the previous session",
+)
+async def start_profiling(
+    mode: Literal["cprofile", "sampling"] = Query(
+        MODE_SAMPLING, description="cprofile or stack sampling"
+    ),
+    sample_rate: float = Query(
+        0.1, gt=0, le=1, description="Fraction of the requests profiled"
+    ),
+    interval_ms: float = Query(
+        5.0, gt=0, le=1000, description="Time between stack samples (sampling)"
+    ),
+    container: ServiceContainer = Depends(get_container),
+) -> dict:
+    """
+    Starts a profiling session
+
+    - Requests with the header X-Profile: 1 are always profiled
+    - Results are aggregated by route template
+    """
+    _check_profiling_enabled(container)
+    return PROFILER.start(mode, sample_rate, interval_ms)
+
+
+@router.delete(
+    "/profiling",
+    summary="Stop profiling",
+    description="Stops the profiling session, keeping its results for download",
+)
+async def stop_profiling(
+    container: ServiceContainer = Depends(get_container),
+) -> dict:
+    """
+    Stops the profiling session
+    """
+    _check_profiling_enabled(container)
+    return PROFILER.stop()
+
+
+@router.get(
+    "/profiling",
+    summary="Profiling status",
+    description="Gets the settings of the current or last profiling session and "
+    "the requests profiled by route",
+)
+async def get_profiling_status(
+    container: ServiceContainer = Depends(get_container),
+) -> dict:
+    """
+    Gets the profiling status
+    """
+    _check_profiling_enabled(container)
+    return PROFILER.status()
+
+
+@router.get(
+    "/profiling/download",
+    summary="Download profile",
+    description="Downloads the profile of a route (or of all routes): a pstats "
+    "file or a text report for cprofile sessions, collapsed stacks for flame "
+    "graphs for sampling sessions",
+    response_class=Response,
+)
+async def download_profile(
+    export_format: Literal["pstats", "text", "collapsed"] = Query(
+        FORMAT_COLLAPSED, alias="format", description="pstats, text or collapsed"
+    ),
+    route: Optional[str] = Query(
+        None, description="Route template, e.g. /api/v1/predictions/"
+    ),
+    container: ServiceContainer = Depends(get_container),
+) -> Response:
+    """
+    Downloads the profiling results
+
+    - pstats: load with pstats.Stats or snakeviz
+    - collapsed: feed to flamegraph.pl or speedscope
+    """
+    _check_profiling_enabled(container)
+    try:
+        content = PROFILER.export(export_format, route)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if export_format == FORMAT_PSTATS:
+        return Response(
+            content=content,
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": 'attachment; filename="profile.pstats"'},
+        )
+    return Response(content=content, media_type="text/plain; charset=utf-8")
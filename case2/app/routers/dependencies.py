@@ -0,0 +1,32 @@
+"""
+Shared router dependencies
+"""
+
+from fastapi import HTTPException, Request
+
+from app.services.container import ServiceContainer
+from app.services.prediction_executor import PredictionExecutor
+
+
+def get_container(request: Request) -> ServiceContainer:
+    """Dependency injection for the application ServiceContainer"""
+    container: ServiceContainer = request.app.state.container
+    if not container.is_ready():
+        raise HTTPException(
+            status_code=503, detail="ML models are not loaded. Service unavailable."
+        )
+    return container
+
+
+def get_prediction_executor(request: Request) -> PredictionExecutor:
+    """Dependency injection for PredictionExecutor"""
+    return get_container(request).prediction_executor
+
+
+def saturated_exception(executor: PredictionExecutor) -> HTTPException:
+    """Builds the 503 response returned when the prediction queue is full"""
+    return HTTPException(
+        status_code=503,
+        detail="Prediction queue is full. Retry later.",
+        headers={"Retry-After": str(executor.retry_after_seconds)},
+    )
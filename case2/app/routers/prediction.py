@@ -6,10 +6,19 @@ Endpoint for making academic performance predictions
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response
 
 from app.models.schemas import PredictionResponse, StudentInput
-from app.services.model_loader import ModelLoader
-from app.services.prediction_service import PredictionService
+from app.routers.dependencies import (
+    get_container,
+    get_prediction_executor,
+    saturated_exception,
+)
+from app.services.container import ServiceContainer
+from app.services.prediction_executor import (
+    ExecutorSaturatedError,
+    PredictionExecutor,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -19,16 +28,6 @@ router = APIRouter(
 )
 
 
-def get_prediction_service() -> PredictionService:
-    """Dependency injection for PredictionService"""
-    model_loader = ModelLoader()
-    if not model_loader.is_loaded():
-        raise HTTPException(
-            status_code=503, detail="ML models are not loaded. Service unavailable."
-        )
-    return PredictionService(model_loader)
-
-
 @router.post(
     "/",
     response_model=PredictionResponse,
@@ -37,7 +36,8 @@ def get_prediction_service() -> PredictionService:
 )
 async def predict_performance(
     student_input: StudentInput,
-    prediction_service: PredictionService = Depends(get_prediction_service),
+    container: ServiceContainer = Depends(get_container),
+    executor: PredictionExecutor = Depends(get_prediction_executor),
 ) -> PredictionResponse:
     """
     Makes academic performance prediction
@@ -55,10 +55,17 @@ async def predict_performance(
     """
     try:
         logger.info("Prediction request received")
-        prediction = prediction_service.predict(student_input)
+        if container.prediction_batcher is not None:
+            prediction = await container.prediction_batcher.predict(student_input)
+        else:
+            prediction = await executor.predict(student_input)
         logger.info(f"Prediction successful: Risk={prediction.risk_level}")
         return prediction
 
+    except ExecutorSaturatedError as e:
+        logger.warning(f"Prediction rejected: {str(e)}")
+        raise saturated_exception(executor)
+
     except Exception as e:
         logger.error(f"Prediction error: {str(e)}")
         raise HTTPException(
@@ -74,22 +81,99 @@ async def predict_performance(
 )
 async def predict_batch(
     students: list[StudentInput],
-    prediction_service: PredictionService = Depends(get_prediction_service),
+    container: ServiceContainer = Depends(get_container),
+    executor: PredictionExecutor = Depends(get_prediction_executor),
 ) -> list[PredictionResponse]:
     """
     Make predictions for multiple students
+
+    With FAST_SERIALIZATION the response is encoded straight from the output
+    arrays of the models.
     """
     try:
         logger.info(f"Batch prediction request received: {len(students)} students")
 
-        predictions = []
-        for student in students:
-            prediction = prediction_service.predict(student)
-            predictions.append(prediction)
+        if container.settings.FAST_SERIALIZATION:
+            content = await executor.predict_many_json(students)
+            logger.info(f"Batch prediction successful: {len(students)} results")
+            return Response(content=content, media_type="application/json")
+
+        predictions = await executor.predict_many(students)
 
         logger.info(f"Batch prediction successful: {len(predictions)} results")
         return predictions
 
+    except ExecutorSaturatedError as e:
+        logger.warning(f"Batch prediction rejected: {str(e)}")
+        raise saturated_exception(executor)
+
     except Exception as e:
         logger.error(f"Batch prediction error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Batch prediction error: {str(e)}")
+
+
+@router.get(
+    "/cache/stats",
+    summary="Prediction cache statistics",
+    description="Gets size and hit/miss/eviction counters of the prediction cache",
+)
+async def get_cache_stats(
+    container: ServiceContainer = Depends(get_container),
+) -> dict:
+    """
+    Gets prediction cache statistics
+    """
+    cache = container.prediction_cache
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get(
+    "/table/stats",
+    summary="Prediction table statistics",
+    description="Gets memory footprint, build time and lookup counters of the "
+    "precomputed prediction table",
+)
+async def get_table_stats(
+    container: ServiceContainer = Depends(get_container),
+) -> dict:
+    """
+    Gets prediction table statistics
+    """
+    table = container.prediction_table
+    if table is None:
+        return {"enabled": False}
+    return {"enabled": True, **table.stats()}
+
+
+@router.get(
+    "/executor/stats",
+    summary="Prediction executor statistics",
+    description="Gets queue depth, wait time and rejection counters of the "
+    "prediction execution backend",
+)
+async def get_executor_stats(
+    executor: PredictionExecutor = Depends(get_prediction_executor),
+) -> dict:
+    """
+    Gets prediction executor statistics
+    """
+    return executor.stats()
+
+
+@router.get(
+    "/batcher/stats",
+    summary="Prediction batcher statistics",
+    description="Gets the batch size histogram of the single prediction batcher",
+)
+async def get_batcher_stats(
+    container: ServiceContainer = Depends(get_container),
+) -> dict:
+    """
+    Gets prediction batcher statistics
+    """
+    batcher = container.prediction_batcher
+    if batcher is None:
+        return {"enabled": False}
+    return {"enabled": True, **batcher.stats()}
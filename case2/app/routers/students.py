@@ -4,15 +4,30 @@ Endpoint to manage students
 """
 
 import logging
-from functools import lru_cache
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, status
-
-from app.models.schemas import StudentCreate, StudentResponse, StudentUpdate
-from app.repositories.student_repository import StudentRepository
-from app.services.model_loader import ModelLoader
-from app.services.prediction_service import PredictionService
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
+
+from app.metrics import stage_timer
+from app.models.schemas import (
+    BulkImportResponse,
+    StudentCreate,
+    StudentPage,
+    StudentResponse,
+    StudentUpdate,
+)
+from app.routers.dependencies import (
+    get_container,
+    get_prediction_executor,
+    saturated_exception,
+)
+from app.services.bulk_import import detect_format, parse_rows, deferred_full_gc
+from app.services.container import ServiceContainer
+from app.services.prediction_executor import (
+    ExecutorSaturatedError,
+    PredictionExecutor,
+)
 from app.services.student_service import StudentService
 
 logger = logging.getLogger(__name__)
@@ -23,24 +38,11 @@ router = APIRouter(
 )
 
 
-@lru_cache()
-def get_repository() -> StudentRepository:
-    """Dependency injection for StudentRepository"""
-    logger.info("Initializing StudentRepository")
-    return StudentRepository()
-
-
 def get_student_service(
-    repository: StudentRepository = Depends(get_repository),
+    container: ServiceContainer = Depends(get_container),
 ) -> StudentService:
     """Dependency injection for StudentService"""
-    model_loader = ModelLoader()
-    if not model_loader.is_loaded():
-        raise HTTPException(
-            status_code=503, detail="ML models not loaded. Service unavailable."
-        )
-    prediction_service = PredictionService(model_loader)
-    return StudentService(repository, prediction_service)
+    return container.student_service
 
 
 @router.post(
@@ -51,7 +53,9 @@ def get_student_service(
     description="Creates a new student and generates prediction automatically",
 )
 async def create_student(
-    student: StudentCreate, service: StudentService = Depends(get_student_service)
+    student: StudentCreate,
+    service: StudentService = Depends(get_student_service),
+    executor: PredictionExecutor = Depends(get_prediction_executor),
 ) -> StudentResponse:
     """
     Creates a new student with automatic prediction
@@ -61,7 +65,8 @@ async def create_student(
     """
     try:
         logger.info(f"Creating student: {student.student_id}")
-        result = service.create_student(student)
+        model_version, prediction = await executor.predict_versioned(student.input_data)
+        result = service.create_student(student, prediction, model_version)
         logger.info(f"Student {student.student_id} created successfully")
         return result
 
@@ -69,6 +74,10 @@ async def create_student(
         logger.warning(f"Conflict creating student: {str(e)}")
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
+    except ExecutorSaturatedError as e:
+        logger.warning(f"Student creation rejected: {str(e)}")
+        raise saturated_exception(executor)
+
     except Exception as e:
         logger.error(f"Error creating student: {str(e)}")
         raise HTTPException(
@@ -77,6 +86,154 @@ async def create_student(
         )
 
 
+@router.post(
+    "/bulk",
+    response_model=BulkImportResponse,
+    summary="Bulk import students",
+    description=(
+        "Creates many students from a JSON array, NDJSON or CSV body, "
+        "or from a multipart upload in the 'file' field"
+    ),
+)
+async def bulk_import_students(
+    request: Request,
+    format: Optional[Literal["json", "ndjson", "csv"]] = Query(
+        None, description="Upload format (detected from content type if omitted)"
+    ),
+    container: ServiceContainer = Depends(get_container),
+    service: StudentService = Depends(get_student_service),
+    executor: PredictionExecutor = Depends(get_prediction_executor),
+) -> Response:
+    """
+    Bulk import students
+
+    - Rows are validated in one pass; invalid rows, IDs repeated in the upload
+      and IDs that already exist are reported and skipped
+    - Accepted rows are scored in a single matrix call and inserted in one
+      repository transaction
+    - CSV columns: student_id, name and the fields of input_data
+    - Returns the status of every row
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Multipart upload must contain a 'file' field",
+            )
+        payload = await upload.read()
+        upload_format = format or detect_format(upload.content_type, upload.filename)
+    else:
+        payload = await request.body()
+        upload_format = format or detect_format(content_type)
+
+    if upload_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Upload must be JSON, NDJSON or CSV",
+        )
+
+    try:
+        with deferred_full_gc():
+            rows = parse_rows(payload, upload_format)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    max_rows = container.settings.BULK_IMPORT_MAX_ROWS
+    if len(rows) > max_rows:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Bulk import is limited to {max_rows} rows",
+        )
+
+    try:
+        logger.info(f"Bulk importing {len(rows)} rows as {upload_format}")
+        # Full collections are only deferred around synchronous steps, never
+        # across an await, so they still run while the batch is scored
+        with deferred_full_gc():
+            students, results = service.validate_bulk(rows)
+
+        # Scored into plain columns: they don't trigger collections while the
+        # collector runs, the predictions are built once they are deferred again
+        model_version, columns = None, ([], [], [], [])
+        if students:
+            model_version, columns = await executor.score_many_versioned(
+                [student.input_data for student in students]
+            )
+
+        with deferred_full_gc():
+            predictions = service.prediction_service.responses(columns)
+            created = service.create_students_bulk(students, predictions, model_version)
+            response = BulkImportResponse(
+                total=len(rows),
+                created=created,
+                rejected=len(rows) - created,
+                results=results,
+            )
+            # Serialized by pydantic-core directly: response_model revalidation
+            # and jsonable_encoder dominate the cost for large uploads
+            with stage_timer("response.serialization"):
+                content = response.model_dump_json()
+        return Response(content=content, media_type="application/json")
+
+    except ValueError as e:
+        logger.warning(f"Conflict in bulk import: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+    except ExecutorSaturatedError as e:
+        logger.warning(f"Bulk import rejected: {str(e)}")
+        raise saturated_exception(executor)
+
+    except Exception as e:
+        logger.error(f"Error in bulk import: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error in bulk import: {str(e)}",
+        )
+
+
+@router.get(
+    "/export",
+    summary="Export students",
+    description="Streams every student with its prediction as NDJSON or CSV",
+    response_class=StreamingResponse,
+)
+async def export_students(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    chunk_size: int = Query(1000, ge=1, le=50000, description="Rows per flush"),
+    sort_by: Literal["created_at", "performance_index_predicted"] = "created_at",
+    order: Literal["asc", "desc"] = "asc",
+    risk_level: Optional[str] = Query(None, description="Filter on risk level"),
+    low_performance_predicted: Optional[int] = Query(
+        None, ge=0, le=1, description="Filter on low performance prediction"
+    ),
+    service: StudentService = Depends(get_student_service),
+) -> StreamingResponse:
+    """
+    Export students
+
+    - **format**: ndjson (one JSON object per line) or csv
+    - Rows are streamed in chunks of **chunk_size**, in constant memory
+    - Same filters and sorting as the list endpoint
+    """
+    logger.info(f"Exporting students as {format}")
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        service.export_students(
+            export_format=format,
+            chunk_size=chunk_size,
+            sort_by=sort_by,
+            order=order,
+            risk_level=risk_level,
+            low_performance_predicted=low_performance_predicted,
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=students.{format}"},
+    )
+
+
 @router.get(
     "/{student_id}",
     response_model=StudentResponse,
@@ -90,7 +247,10 @@ async def get_student(
     Get a student by ID
     """
     logger.info(f"Getting student: {student_id}")
-    student = service.get_student(student_id)
+    if service.fast_serialization:
+        student = await service.get_student_json(student_id)
+    else:
+        student = await service.get_student(student_id)
 
     if student is None:
         logger.warning(f"Student {student_id} not found")
@@ -99,25 +259,63 @@ async def get_student(
             detail=f"Student {student_id} not found",
         )
 
+    if isinstance(student, bytes):
+        return Response(content=student, media_type="application/json")
     return student
 
 
 @router.get(
     "/",
-    response_model=List[StudentResponse],
+    response_model=StudentPage,
     summary="List students",
-    description="Get all students",
+    description="Get a page of students, optionally filtered and sorted",
 )
 async def list_students(
+    limit: int = Query(100, ge=1, le=1000, description="Students per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the last page"),
+    sort_by: Literal["created_at", "performance_index_predicted"] = "created_at",
+    order: Literal["asc", "desc"] = "asc",
+    risk_level: Optional[str] = Query(None, description="Filter on risk level"),
+    low_performance_predicted: Optional[int] = Query(
+        None, ge=0, le=1, description="Filter on low performance prediction"
+    ),
+    fields: Optional[str] = Query(
+        None, description="Comma separated fields to include (all by default)"
+    ),
     service: StudentService = Depends(get_student_service),
-) -> List[StudentResponse]:
+) -> StudentPage:
     """
-    List all students
+    List students with keyset pagination
+
+    - Follow **next_cursor** to get the next page (null on the last page)
+    - Filters: **risk_level**, **low_performance_predicted**
+    - Sorting: **sort_by** created_at or performance_index_predicted, **order**
+    - Projection: **fields**, e.g. `student_id,prediction`
     """
-    logger.info("Listing all students")
-    students = service.get_all_students()
-    logger.info(f"Total of students: {len(students)}")
-    return students
+    logger.info("Listing students")
+    list_page = (
+        service.list_students_json
+        if service.fast_serialization
+        else service.list_students
+    )
+    try:
+        page = await list_page(
+            limit=limit,
+            cursor=cursor,
+            sort_by=sort_by,
+            order=order,
+            risk_level=risk_level,
+            low_performance_predicted=low_performance_predicted,
+            fields=set(fields.split(",")) if fields else None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if isinstance(page, bytes):
+        return Response(content=page, media_type="application/json")
+
+    logger.info(f"Page of {len(page.items)} students")
+    return page
 
 
 @router.put(
@@ -130,6 +328,7 @@ async def update_student(
     student_id: str,
     update_data: StudentUpdate,
     service: StudentService = Depends(get_student_service),
+    executor: PredictionExecutor = Depends(get_prediction_executor),
 ) -> StudentResponse:
     """
     Update an existing student
@@ -138,7 +337,19 @@ async def update_student(
     - Fields not sent are kept unchanged
     """
     logger.info(f"Updating student {student_id}")
-    student = service.update_student(student_id, update_data)
+
+    prediction = None
+    model_version = None
+    if update_data.input_data is not None:
+        try:
+            model_version, prediction = await executor.predict_versioned(
+                update_data.input_data
+            )
+        except ExecutorSaturatedError as e:
+            logger.warning(f"Student update rejected: {str(e)}")
+            raise saturated_exception(executor)
+
+    student = service.update_student(student_id, update_data, prediction, model_version)
 
     if student is None:
         logger.warning(f"Student {student_id} not found")
@@ -183,6 +394,9 @@ async def delete_student(
     description="Gets system statistics",
 )
 async def get_statistics(
+    detailed: bool = Query(
+        False, description="Include std, risk level counts and percentiles"
+    ),
     service: StudentService = Depends(get_student_service),
 ) -> dict:
     """
@@ -191,7 +405,24 @@ async def get_statistics(
     - Total of students
     - Students at risk
     - Average performance
+    - With **detailed**: performance std, counts per risk level and approximate
+      percentiles
     """
     logger.info("Obteniendo estadísticas")
-    stats = service.get_statistics()
+    stats = service.get_statistics(detailed=detailed)
     return stats
+
+
+@router.get(
+    "/stats/consistency",
+    summary="Check statistics consistency",
+    description="Compares the running aggregates against a full recompute",
+)
+async def check_statistics_consistency(
+    service: StudentService = Depends(get_student_service),
+) -> dict:
+    """
+    Checks the running aggregates against a full scan of the repository
+    """
+    logger.info("Checking statistics consistency")
+    return service.check_statistics_consistency()
@@ -0,0 +1,252 @@
+"""
+Application service container
+"""
+
+import functools
+import logging
+import os
+from typing import Optional
+
+from app.config import Settings
+from app.metrics import REGISTRY
+from app.repositories.base import IStudentRepository
+from app.repositories.columnar_student_repository import ColumnarStudentRepository
+from app.repositories.sqlite_student_repository import SQLiteStudentRepository
+from app.repositories.student_repository import StudentRepository
+from app.repositories.timed_repository import TimedStudentRepository
+from app.services.model_loader import ModelBundle, ModelLoader
+from app.services.model_reloader import ModelReloader
+from app.services.prediction_batcher import PredictionBatcher
+from app.services.prediction_cache import PredictionCache
+from app.services.prediction_executor import PredictionExecutor
+from app.services.prediction_service import PredictionService
+from app.services.prediction_table import PredictionTable
+from app.services.rescore_job import RescoreJob
+from app.services.student_service import StudentService
+
+logger = logging.getLogger(__name__)
+
+COMPONENT_STATS = REGISTRY.gauge(
+    "app_component_stats",
+    "Counters kept by the components (cache, executor, batcher, reloader)",
+    ("component", "stat"),
+)
+MODEL_INFO = REGISTRY.gauge(
+    "app_model_info", "Version of the models being served", ("version",)
+)
+
+
+class ServiceContainer:
+    """
+    Application-scoped holder of the services
+
+    Created once in the lifespan of the app and stored on app.state, so the
+    routers resolve already built services instead of constructing them on
+    every request. It also owns the readiness state of the API.
+    """
+
+    def __init__(self, settings: Settings):
+        """
+        Initializes the container
+
+        Args:
+            settings: App configuration
+        """
+        self.settings = settings
+        self.model_loader = ModelLoader()
+        self.repository = self._create_repository(settings)
+        if settings.METRICS_ENABLED:
+            self.repository = TimedStudentRepository(self.repository)
+        self.prediction_cache: Optional[PredictionCache] = None
+        self.prediction_service: Optional[PredictionService] = None
+        self.prediction_executor: Optional[PredictionExecutor] = None
+        self.prediction_batcher: Optional[PredictionBatcher] = None
+        self.student_service: Optional[StudentService] = None
+        self.rescore_job: Optional[RescoreJob] = None
+        self.model_reloader: Optional[ModelReloader] = None
+        self._ready = False
+
+    @staticmethod
+    def _create_repository(settings: Settings) -> IStudentRepository:
+        """
+        Creates the student repository selected in the settings
+
+        Args:
+            settings: App configuration
+
+        Returns:
+            Student repository backend
+        """
+        if settings.REPOSITORY_BACKEND in ("memory", "columnar"):
+            if settings.WORKERS > 1:
+                raise ValueError(
+                    f"The {settings.REPOSITORY_BACKEND} repository is private to "
+                    "each process; use REPOSITORY_BACKEND=sqlite with WORKERS > 1"
+                )
+            if settings.REPOSITORY_BACKEND == "columnar":
+                return ColumnarStudentRepository()
+            return StudentRepository()
+        if settings.REPOSITORY_BACKEND == "sqlite":
+            directory = os.path.dirname(settings.SQLITE_PATH)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            return SQLiteStudentRepository(
+                settings.SQLITE_PATH, settings.SQLITE_BUSY_TIMEOUT_SECONDS
+            )
+        raise ValueError(f"Unknown repository backend: {settings.REPOSITORY_BACKEND}")
+
+    def start(self) -> bool:
+        """
+        Loads the models and builds the services
+
+        Returns:
+            bool: True if the container is ready to serve requests
+        """
+        settings = self.settings
+
+        success = self.model_loader.load_models(
+            models_path=settings.MODELS_PATH,
+            classification_name=settings.CLASSIFICATION_MODEL,
+            regression_name=settings.REGRESSION_MODEL,
+            scaler_name=settings.SCALER_MODEL,
+            enable_fast_path=settings.LINEAR_FAST_PATH,
+            compact_name=settings.MODEL_BUNDLE,
+            mmap=settings.MODEL_MMAP,
+        )
+        if not success:
+            return False
+
+        if settings.PREDICTION_CACHE_ENABLED:
+            self.prediction_cache = PredictionCache(
+                max_entries=settings.PREDICTION_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.PREDICTION_CACHE_TTL_SECONDS,
+                key_decimals=settings.PREDICTION_CACHE_KEY_DECIMALS,
+            )
+
+        table = None
+        if settings.PREDICTION_TABLE_ENABLED:
+            table = self._build_prediction_table(self.model_loader.get_bundle())
+
+        self.prediction_service = PredictionService(
+            self.model_loader, self.prediction_cache, table
+        )
+        self.prediction_executor = PredictionExecutor(self.prediction_service, settings)
+        if settings.WORKERS > 1 and settings.PREDICTION_EXECUTOR == "process":
+            logger.warning(
+                f"Each of the {settings.WORKERS} API workers starts its own pool of "
+                f"{settings.PREDICTION_WORKERS} prediction processes"
+            )
+        if settings.PREDICTION_BATCHER_ENABLED:
+            self.prediction_batcher = PredictionBatcher(
+                self.prediction_executor,
+                self.prediction_service,
+                max_wait_ms=settings.PREDICTION_BATCHER_MAX_WAIT_MS,
+                max_batch_size=settings.PREDICTION_BATCHER_MAX_BATCH_SIZE,
+            )
+        self.student_service = StudentService(
+            self.repository,
+            self.prediction_service,
+            rescore_on_read=settings.RESCORE_ON_READ,
+            fast_serialization=settings.FAST_SERIALIZATION,
+            executor=self.prediction_executor,
+        )
+        self.rescore_job = RescoreJob(
+            self.repository,
+            self.prediction_service,
+            self.prediction_executor,
+            chunk_size=settings.RESCORE_CHUNK_SIZE,
+        )
+        self.model_reloader = ModelReloader(
+            settings,
+            self.model_loader,
+            self.prediction_service,
+            self.prediction_executor,
+            table_builder=(
+                self._build_prediction_table
+                if settings.PREDICTION_TABLE_ENABLED
+                else None
+            ),
+            rescore_job=self.rescore_job,
+        )
+
+        self._ready = True
+        return True
+
+    @property
+    def prediction_table(self) -> Optional[PredictionTable]:
+        """Prediction table of the served models (replaced on reload)"""
+        if self.prediction_service is None:
+            return None
+        return self.prediction_service.table
+
+    def _build_prediction_table(self, bundle: ModelBundle) -> PredictionTable:
+        """
+        Builds (or loads from disk) the prediction table of a model bundle
+
+        Args:
+            bundle: Models the table is computed with
+
+        Returns:
+            PredictionTable for the bundle version
+        """
+        settings = self.settings
+        logger.info(f"Building prediction table for model version {bundle.version}")
+        table = PredictionTable.build(
+            score_fn=functools.partial(
+                PredictionService(self.model_loader).score_features, bundle=bundle
+            ),
+            model_version=bundle.version,
+            float_step=settings.PREDICTION_TABLE_FLOAT_STEP,
+            max_cells=settings.PREDICTION_TABLE_MAX_CELLS,
+            off_grid=settings.PREDICTION_TABLE_OFF_GRID,
+            path=settings.PREDICTION_TABLE_PATH,
+        )
+        stats = table.stats()
+        logger.info(
+            f"Prediction table {stats['source']}: {stats['cells']} cells, "
+            f"{stats['bytes'] / 1e6:.1f} MB in {stats['build_seconds']}s"
+        )
+        return table
+
+    def collect_metrics(self):
+        """Copies the stats of the components into gauges (registry collector)"""
+        components = {
+            "cache": self.prediction_cache,
+            "executor": self.prediction_executor,
+            "batcher": self.prediction_batcher,
+        }
+        for component, service in components.items():
+            if service is not None:
+                _set_stats(component, service.stats())
+
+        if self.model_reloader is not None:
+            reloader = self.model_reloader
+            _set_stats("reloader", {"reloads": reloader.reloads, **reloader.durations})
+            for bundle, latency in reloader.latency.items():
+                _set_stats(f"reloader_{bundle}", latency)
+
+        if self.model_loader.is_loaded():
+            MODEL_INFO.clear()
+            MODEL_INFO.set(1, self.model_loader.get_model_version())
+
+    def is_ready(self) -> bool:
+        """Verify if the services are built and the models loaded"""
+        return self._ready and self.model_loader.is_loaded()
+
+    def shutdown(self):
+        """Marks the container as not ready and stops the worker pools"""
+        self._ready = False
+        if self.model_reloader is not None:
+            self.model_reloader.cancel()
+        if self.rescore_job is not None:
+            self.rescore_job.cancel()
+        if self.prediction_executor is not None:
+            self.prediction_executor.shutdown()
+        self.repository.close()
+
+
+def _set_stats(component: str, stats: dict):
+    """Sets the numeric entries of a stats dict as gauges"""
+    for stat, value in stats.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            COMPONENT_STATS.set(value, component, stat)
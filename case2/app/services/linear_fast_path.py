@@ -0,0 +1,233 @@
+"""
+Linear fast path for inference
+
+When the scaler is a StandardScaler and both models are linear, the whole
+pipeline is an affine map per head. The scaler is folded into the model
+coefficients so scoring is a single matrix product, with no pandas or
+sklearn dispatch involved. The folded weights can be saved to a compact
+.npz file that is loaded without unpickling (nor importing) sklearn.
+"""
+
+import logging
+import math
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+COMPACT_FORMAT_VERSION = 1
+
+
+def _linear_types() -> Tuple[type, tuple, tuple]:
+    """
+    Gets the sklearn types the fast path can fold
+
+    Imported on demand: sklearn takes more than a second to import and is not
+    needed when the models come from a compact bundle.
+
+    Returns:
+        Tuple (scaler type, regressor types, classifier types)
+    """
+    from sklearn.linear_model import (
+        ElasticNet,
+        ElasticNetCV,
+        Lasso,
+        LassoCV,
+        LinearRegression,
+        LogisticRegression,
+        LogisticRegressionCV,
+        Ridge,
+        RidgeCV,
+        SGDRegressor,
+    )
+    from sklearn.preprocessing import StandardScaler
+
+    return (
+        StandardScaler,
+        (
+            LinearRegression,
+            Ridge,
+            RidgeCV,
+            Lasso,
+            LassoCV,
+            ElasticNet,
+            ElasticNetCV,
+            SGDRegressor,
+        ),
+        (LogisticRegression, LogisticRegressionCV),
+    )
+
+
+class LinearFastPath:
+    """
+    Precomputed weights for the regression and classification heads
+
+    Column 0 of the weight matrix is the regression output and column 1 is
+    the classification logit, both expressed over the raw (unscaled) features.
+    """
+
+    def __init__(self, weights: np.ndarray, bias: np.ndarray, classes: np.ndarray):
+        """
+        Initializes the fast path
+
+        Args:
+            weights: Matrix of shape (n_features, 2)
+            bias: Vector of shape (2,)
+            classes: Classes of the classifier (negative, positive)
+        """
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.bias = np.ascontiguousarray(bias, dtype=np.float64)
+        self.classes = classes
+        self.n_features = self.weights.shape[0]
+        self._local = threading.local()
+
+    @classmethod
+    def from_models(
+        cls, scaler, regression_model, classification_model
+    ) -> Optional["LinearFastPath"]:
+        """
+        Folds the scaler and the linear models into one weight matrix
+
+        Args:
+            scaler: Fitted scaler
+            regression_model: Fitted regression model
+            classification_model: Fitted classification model
+
+        Returns:
+            LinearFastPath, or None if the models are not all affine
+        """
+        scaler_type, linear_regressors, linear_classifiers = _linear_types()
+        if not isinstance(scaler, scaler_type):
+            return None
+        if not isinstance(regression_model, linear_regressors):
+            return None
+        if not isinstance(classification_model, linear_classifiers):
+            return None
+        if len(classification_model.classes_) != 2:
+            return None
+
+        # mean_ is still fitted with with_mean=False (to compute the variance),
+        # so the flags decide what transform actually applies
+        n_features = scaler.n_features_in_
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(n_features)
+        scale = scaler.scale_ if scaler.with_std else np.ones(n_features)
+
+        regression_coef = np.ravel(regression_model.coef_)
+        classification_coef = np.ravel(classification_model.coef_)
+        if regression_coef.shape != (n_features,) or classification_coef.shape != (
+            n_features,
+        ):
+            return None
+
+        coef = np.column_stack([regression_coef, classification_coef])
+        intercept = np.array(
+            [
+                float(np.ravel(regression_model.intercept_)[0]),
+                float(np.ravel(classification_model.intercept_)[0]),
+            ]
+        )
+
+        weights = coef / scale[:, np.newaxis]
+        bias = intercept - mean @ weights
+
+        return cls(weights, bias, classification_model.classes_)
+
+    def save(self, path: str, model_version: str):
+        """
+        Saves the folded weights as a compact bundle
+
+        The file is an uncompressed .npz with plain numeric arrays, so loading
+        it needs neither pickle nor sklearn.
+
+        Args:
+            path: Destination file
+            model_version: Version of the models the weights were folded from
+        """
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                format_version=np.array(COMPACT_FORMAT_VERSION),
+                model_version=np.array(model_version),
+                weights=self.weights,
+                bias=self.bias,
+                classes=np.asarray(self.classes),
+            )
+
+    @classmethod
+    def load(cls, path: str) -> Tuple["LinearFastPath", str]:
+        """
+        Loads a compact bundle saved with save
+
+        Args:
+            path: Bundle file
+
+        Returns:
+            Tuple (fast path, version of the models it was folded from)
+
+        Raises:
+            ValueError: If the file has an unknown format version
+        """
+        with np.load(path, allow_pickle=False) as data:
+            format_version = int(data["format_version"])
+            if format_version != COMPACT_FORMAT_VERSION:
+                raise ValueError(
+                    f"Unknown compact bundle format version {format_version}"
+                )
+            return (
+                cls(data["weights"], data["bias"], data["classes"]),
+                str(data["model_version"]),
+            )
+
+    def _buffers(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the per-thread preallocated buffers for single-row scoring"""
+        buffers = getattr(self._local, "buffers", None)
+        if buffers is None:
+            buffers = (np.empty((1, self.n_features)), np.empty((1, 2)))
+            self._local.buffers = buffers
+        return buffers
+
+    def score_one(self, values) -> Tuple[float, int, float]:
+        """
+        Scores a single row of raw features
+
+        Args:
+            values: Sequence with the raw feature values
+
+        Returns:
+            Tuple (performance, low_performance_predicted, probability)
+        """
+        row, out = self._buffers()
+        row[0] = values
+        np.matmul(row, self.weights, out=out)
+        performance = float(out[0, 0] + self.bias[0])
+        logit = float(out[0, 1] + self.bias[1])
+
+        if logit >= 0:
+            probability = 1.0 / (1.0 + math.exp(-logit))
+        else:
+            exp_logit = math.exp(logit)
+            probability = exp_logit / (1.0 + exp_logit)
+
+        predicted = int(self.classes[1] if logit > 0 else self.classes[0])
+        return performance, predicted, probability
+
+    def score(self, features: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Scores a matrix of raw features
+
+        Args:
+            features: Matrix of shape (n_rows, n_features)
+
+        Returns:
+            Tuple of arrays (performance, low_performance_predicted, probability)
+        """
+        out = features @ self.weights
+        out += self.bias
+        logits = out[:, 1]
+        probability = np.exp(-np.logaddexp(0.0, -logits))
+        predicted = np.where(logits > 0, self.classes[1], self.classes[0]).astype(
+            np.int64
+        )
+        return out[:, 0], predicted, probability
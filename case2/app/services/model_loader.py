@@ -2,34 +2,89 @@
 Service for loading ML models
 """
 
+import hashlib
 import logging
 import os
-from typing import Optional
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
 
-import joblib
+from app.services.linear_fast_path import LinearFastPath
 
 logger = logging.getLogger(__name__)
 
 
+class ModelBundle:
+    """
+    Immutable set of models that produce one model version
+
+    The loader publishes a new bundle with a single reference assignment, so
+    a request that read the bundle once keeps scoring with the same models
+    even if a reload swaps them meanwhile.
+    """
+
+    def __init__(
+        self,
+        classification_model,
+        regression_model,
+        scaler,
+        fast_path: Optional[LinearFastPath],
+        version: str,
+        load_profile: Optional[dict] = None,
+    ):
+        """
+        Initializes the bundle
+
+        Args:
+            classification_model: Classification model
+            regression_model: Regression model
+            scaler: Scaler of the raw features
+            fast_path: Linear fast path, or None if the models are not linear
+            version: Fingerprint of the model files
+            load_profile: Seconds spent in each load step
+        """
+        self.classification_model = classification_model
+        self.regression_model = regression_model
+        self.scaler = scaler
+        self.fast_path = fast_path
+        self.version = version
+        self.load_profile = load_profile or {}
+        self.loaded_at = datetime.now()
+
+
 class ModelLoader:
     """
     Singleton for loading and managing ML models
+
+    Thread safety: instance creation uses double-checked locking and the
+    attributes are initialized only once. Loads are serialized by a lock and
+    the models are published as one ModelBundle only after all of them were
+    loaded; getters are lock-free reads of the current bundle.
     """
 
     _instance: Optional["ModelLoader"] = None
+    _instance_lock = threading.Lock()
+    _initialized: bool = False
     _models_loaded: bool = False
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(ModelLoader, cls).__new__(cls)
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = super(ModelLoader, cls).__new__(cls)
         return cls._instance
 
     def __init__(self):
-        if not self._models_loaded:
-            self.classification_model = None
-            self.regression_model = None
-            self.scaler = None
+        if self._initialized:
+            return
+        with self._instance_lock:
+            if self._initialized:
+                return
+            self.bundle: Optional[ModelBundle] = None
             self._models_loaded = False
+            self._load_lock = threading.Lock()
+            self._initialized = True
 
     def load_models(
         self,
@@ -37,54 +92,268 @@ class ModelLoader:
         classification_name: str,
         regression_name: str,
         scaler_name: str,
+        enable_fast_path: bool = True,
+        compact_name: Optional[str] = None,
+        mmap: bool = False,
     ) -> bool:
         """
-        Loads all necessary models
+        Loads all necessary models and publishes them
+
+        Args:
+            models_path: Directory containing the model files
+            classification_name: File name of the classification model
+            regression_name: File name of the regression model
+            scaler_name: File name of the scaler
+            enable_fast_path: Fold linear models into a single affine map
+            compact_name: File name of the compact bundle (optional)
+            mmap: Map the arrays of the pickles read-only instead of copying
 
         Returns:
             bool: True if all models were loaded successfully
         """
         try:
-            classification_path = os.path.join(models_path, classification_name)
-            regression_path = os.path.join(models_path, regression_name)
-            scaler_path = os.path.join(models_path, scaler_name)
+            bundle = self.build_bundle(
+                models_path,
+                classification_name,
+                regression_name,
+                scaler_name,
+                enable_fast_path,
+                compact_name,
+                mmap,
+            )
+        except Exception as e:
+            logger.error(f"Error loading models: {str(e)}")
+            self._models_loaded = self.bundle is not None
+            return False
 
-            logger.info(f"Loading classification model from {classification_path}")
-            self.classification_model = joblib.load(classification_path)
+        self.swap(bundle)
+        logger.info("All models loaded successfully")
+        return True
 
-            logger.info(f"Loading regression model from {regression_path}")
-            self.regression_model = joblib.load(regression_path)
+    def build_bundle(
+        self,
+        models_path: str,
+        classification_name: str,
+        regression_name: str,
+        scaler_name: str,
+        enable_fast_path: bool = True,
+        compact_name: Optional[str] = None,
+        mmap: bool = False,
+    ) -> ModelBundle:
+        """
+        Loads the model files into a new bundle without publishing it
 
-            logger.info(f"Loading scaler from {scaler_path}")
-            self.scaler = joblib.load(scaler_path)
+        If a compact bundle is configured, exists and was folded from the
+        current pickles (same fingerprint), only that file is read. Otherwise
+        the pickles are loaded. With mmap, the numpy arrays stored in the
+        pickles are memory-mapped read-only, so worker processes serving the
+        same files share one copy through the page cache.
 
-            self._models_loaded = True
-            logger.info("All models loaded successfully")
-            return True
+        Args:
+            models_path: Directory containing the model files
+            classification_name: File name of the classification model
+            regression_name: File name of the regression model
+            scaler_name: File name of the scaler
+            enable_fast_path: Fold linear models into a single affine map
+            compact_name: File name of the compact bundle (optional)
+            mmap: Map the arrays of the pickles read-only instead of copying
 
-        except Exception as e:
-            logger.error(f"Error loading models: {str(e)}")
-            self._models_loaded = False
-            return False
+        Returns:
+            ModelBundle with the loaded models
+
+        Raises:
+            Exception: If any of the files cannot be loaded
+        """
+        with self._load_lock:
+            profile = {}
+            paths = [
+                os.path.join(models_path, name)
+                for name in (classification_name, regression_name, scaler_name)
+            ]
+
+            step = time.perf_counter()
+            model_version = (
+                self._fingerprint(paths)
+                if all(os.path.exists(path) for path in paths)
+                else None
+            )
+            profile["fingerprint_seconds"] = time.perf_counter() - step
+
+            if compact_name and enable_fast_path:
+                bundle = self._load_compact(
+                    os.path.join(models_path, compact_name), model_version, profile
+                )
+                if bundle is not None:
+                    return bundle
+
+            if model_version is None:
+                raise FileNotFoundError(f"Model files missing in {models_path}")
+            logger.info(f"Model version: {model_version}")
+
+            import joblib
+
+            loaded = []
+            for key, path in zip(("classification", "regression", "scaler"), paths):
+                logger.info(f"Loading {key} model from {path}")
+                step = time.perf_counter()
+                loaded.append(joblib.load(path, mmap_mode="r" if mmap else None))
+                profile[f"{key}_seconds"] = time.perf_counter() - step
+            classification_model, regression_model, scaler = loaded
+
+            fast_path = None
+            if enable_fast_path:
+                step = time.perf_counter()
+                fast_path = LinearFastPath.from_models(
+                    scaler, regression_model, classification_model
+                )
+                profile["fast_path_seconds"] = time.perf_counter() - step
+            if fast_path is not None:
+                logger.info("Linear models detected, fast path enabled")
+            else:
+                logger.info("Using generic inference path")
+
+            return ModelBundle(
+                classification_model,
+                regression_model,
+                scaler,
+                fast_path,
+                model_version,
+                self._round_profile(profile),
+            )
+
+    def _load_compact(
+        self, path: str, model_version: Optional[str], profile: dict
+    ) -> Optional[ModelBundle]:
+        """
+        Loads a compact bundle if it matches the pickles
+
+        Args:
+            path: Path of the compact bundle
+            model_version: Fingerprint of the pickles (None if missing)
+            profile: Load timings, updated in place
+
+        Returns:
+            ModelBundle with only the fast path, or None to load the pickles
+        """
+        if not os.path.exists(path):
+            logger.warning(f"Compact bundle {path} not found, loading pickles")
+            return None
+
+        step = time.perf_counter()
+        fast_path, bundle_version = LinearFastPath.load(path)
+        profile["compact_seconds"] = time.perf_counter() - step
+
+        if model_version is not None and bundle_version != model_version:
+            logger.warning(
+                f"Compact bundle {path} was built from version {bundle_version}, "
+                f"model files are {model_version}; loading pickles"
+            )
+            return None
+
+        logger.info(f"Loaded compact bundle {path}, model version: {bundle_version}")
+        return ModelBundle(
+            None, None, None, fast_path, bundle_version, self._round_profile(profile)
+        )
+
+    @staticmethod
+    def _round_profile(profile: dict) -> dict:
+        """Rounds the load timings for reporting"""
+        return {key: round(seconds, 4) for key, seconds in profile.items()}
+
+    def swap(self, bundle: ModelBundle) -> Optional[ModelBundle]:
+        """
+        Atomically publishes a bundle
+
+        Args:
+            bundle: Bundle to serve from now on
+
+        Returns:
+            The bundle that was being served (None on the first load)
+        """
+        previous = self.bundle
+        self.bundle = bundle
+        self._models_loaded = True
+        return previous
+
+    @staticmethod
+    def _fingerprint(paths: List[str]) -> str:
+        """
+        Computes a content fingerprint of the model files
+
+        Args:
+            paths: Paths of the model files
+
+        Returns:
+            Short hex digest identifying the model version
+        """
+        digest = hashlib.sha256()
+        for path in paths:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        return digest.hexdigest()[:12]
 
     def is_loaded(self) -> bool:
         """Verify if models are loaded"""
         return self._models_loaded
 
+    def get_bundle(self) -> ModelBundle:
+        """Return the bundle currently served"""
+        bundle = self.bundle
+        if bundle is None:
+            raise RuntimeError("Models not loaded. Call load_models() first.")
+        return bundle
+
     def get_classification_model(self):
         """Return classification model"""
-        if not self._models_loaded:
-            raise RuntimeError("Models not loaded. Call load_models() first.")
-        return self.classification_model
+        return self.get_bundle().classification_model
 
     def get_regression_model(self):
         """Return regression model"""
-        if not self._models_loaded:
-            raise RuntimeError("Models not loaded. Call load_models() first.")
-        return self.regression_model
+        return self.get_bundle().regression_model
 
     def get_scaler(self):
         """Return scaler"""
-        if not self._models_loaded:
-            raise RuntimeError("Models not loaded. Call load_models() first.")
-        return self.scaler
+        return self.get_bundle().scaler
+
+    def get_model_version(self) -> str:
+        """Return the fingerprint of the loaded models"""
+        return self.get_bundle().version
+
+    def get_fast_path(self) -> Optional[LinearFastPath]:
+        """Return the linear fast path, or None if the models are not linear"""
+        return self.get_bundle().fast_path
+
+    def export_compact(self, path: str):
+        """
+        Saves the served linear models as a compact bundle
+
+        Args:
+            path: Destination file
+
+        Raises:
+            ValueError: If the models are not linear
+        """
+        bundle = self.get_bundle()
+        if bundle.fast_path is None:
+            raise ValueError("Only linear models can be exported as a compact bundle")
+        bundle.fast_path.save(path, bundle.version)
+        logger.info(f"Compact bundle of version {bundle.version} saved to {path}")
+
+
+if __name__ == "__main__":
+    from app.config import get_settings
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    settings = get_settings()
+    compact_name = settings.MODEL_BUNDLE or "model_bundle.npz"
+
+    loader = ModelLoader()
+    if not loader.load_models(
+        models_path=settings.MODELS_PATH,
+        classification_name=settings.CLASSIFICATION_MODEL,
+        regression_name=settings.REGRESSION_MODEL,
+        scaler_name=settings.SCALER_MODEL,
+    ):
+        raise SystemExit(1)
+    loader.export_compact(os.path.join(settings.MODELS_PATH, compact_name))
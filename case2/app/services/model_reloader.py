@@ -0,0 +1,406 @@
+"""
+Hot reload of the ML models
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import Settings
+from app.models.schemas import StudentInput
+from app.services.model_loader import ModelBundle, ModelLoader
+from app.services.prediction_executor import PredictionExecutor
+from app.services.prediction_service import PredictionService
+from app.services.prediction_table import FIELDS, PredictionTable
+from app.services.rescore_job import (
+    STATUS_COMPLETED,
+    STATUS_FAILED,
+    STATUS_IDLE,
+    STATUS_RUNNING,
+    RescoreJob,
+)
+
+logger = logging.getLogger(__name__)
+
+TableBuilder = Callable[[ModelBundle], PredictionTable]
+
+SINGLE_ROW_SAMPLES = 64
+
+
+class ModelReloader:
+    """
+    Loads new model files in the background and swaps them in atomically
+
+    A reload runs off the event loop: the files are loaded into a new
+    ModelBundle, which is validated on a canary batch, warmed up and timed
+    against the bundle being served. Only then it is published with one
+    reference swap, so requests that already read the old bundle finish on
+    it. Reloads of files with the same fingerprint do not swap anything.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        model_loader: ModelLoader,
+        prediction_service: PredictionService,
+        executor: PredictionExecutor,
+        table_builder: Optional[TableBuilder] = None,
+        rescore_job: Optional[RescoreJob] = None,
+    ):
+        """
+        Initializes the reloader
+
+        Args:
+            settings: App configuration (model paths and reload options)
+            model_loader: Loader that serves the current bundle
+            prediction_service: Prediction service (scores the canary batch)
+            executor: Prediction executor (its worker processes are recycled)
+            table_builder: Builds the prediction table of a bundle (optional)
+            rescore_job: Job started after a swap if MODEL_RELOAD_RESCORE
+        """
+        self.settings = settings
+        self.model_loader = model_loader
+        self.prediction_service = prediction_service
+        self.executor = executor
+        self.table_builder = table_builder
+        self.rescore_job = rescore_job
+        self.warmup_rounds = max(settings.MODEL_RELOAD_WARMUP_ROUNDS, 1)
+        self.canary = self._build_canary(settings.MODEL_RELOAD_CANARY_SIZE)
+        self.canary_inputs = [
+            StudentInput(**dict(zip(FIELDS, row)))
+            for row in self.canary[:SINGLE_ROW_SAMPLES].tolist()
+        ]
+
+        self.status = STATUS_IDLE
+        self.trigger: Optional[str] = None
+        self.swapped = False
+        self.reloads = 0
+        self.previous_version: Optional[str] = None
+        self.new_version: Optional[str] = None
+        self.durations: dict = {}
+        self.latency: dict = {}
+        self.canary_report: dict = {}
+        self.error: Optional[str] = None
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watch_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _build_canary(size: int) -> np.ndarray:
+        """
+        Draws a fixed sample of points of the StudentInput space
+
+        Args:
+            size: Number of rows
+
+        Returns:
+            Raw feature matrix of shape (size, n_features)
+        """
+        lowers, steps, shape = PredictionTable.grid_spec(1.0)
+        rng = np.random.default_rng(0)
+        indices = rng.integers(0, shape, size=(max(size, 1), len(shape)))
+        return np.asarray(lowers) + indices * np.asarray(steps)
+
+    def is_running(self) -> bool:
+        """Verify if a reload is in progress"""
+        return self.status == STATUS_RUNNING
+
+    def start(self, trigger: str = "admin") -> bool:
+        """
+        Starts a reload in the background (must be called from the event loop)
+
+        Args:
+            trigger: What requested the reload ("admin" or "watcher")
+
+        Returns:
+            False if a reload is already in progress
+        """
+        if self.is_running():
+            return False
+
+        self.status = STATUS_RUNNING
+        self.trigger = trigger
+        self.swapped = False
+        self.previous_version = self.model_loader.get_model_version()
+        self.new_version = None
+        self.durations = {}
+        self.latency = {}
+        self.canary_report = {}
+        self.error = None
+        self.started_at = datetime.now()
+        self.finished_at = None
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+        logger.info(f"Model reload started ({trigger})")
+        return True
+
+    async def _run(self):
+        """Prepares the new bundle on a thread and swaps it on the event loop"""
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            bundle, table = await loop.run_in_executor(None, self._prepare)
+            if bundle is not None:
+                self._swap(bundle, table)
+            self.status = STATUS_COMPLETED
+        except asyncio.CancelledError:
+            self.status = STATUS_FAILED
+            self.error = "Cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Model reload failed: {str(e)}")
+            self.status = STATUS_FAILED
+            self.error = str(e)
+        finally:
+            self.finished_at = datetime.now()
+            self.durations["total_seconds"] = round(time.perf_counter() - start, 4)
+            logger.info(
+                f"Model reload {self.status} in {self.durations['total_seconds']}s: "
+                f"{self.previous_version} -> {self.new_version} "
+                f"(swapped={self.swapped})"
+            )
+
+    def _prepare(self) -> Tuple[Optional[ModelBundle], Optional[PredictionTable]]:
+        """
+        Loads, validates and warms up the new bundle
+
+        Returns:
+            Tuple (bundle, table), bundle is None if the files did not change
+
+        Raises:
+            ValueError: If the bundle fails the canary validation
+        """
+        settings = self.settings
+
+        step = time.perf_counter()
+        bundle = self.model_loader.build_bundle(
+            models_path=settings.MODELS_PATH,
+            classification_name=settings.CLASSIFICATION_MODEL,
+            regression_name=settings.REGRESSION_MODEL,
+            scaler_name=settings.SCALER_MODEL,
+            enable_fast_path=settings.LINEAR_FAST_PATH,
+            compact_name=settings.MODEL_BUNDLE,
+            mmap=settings.MODEL_MMAP,
+        )
+        self.new_version = bundle.version
+        self.durations["load_seconds"] = round(time.perf_counter() - step, 4)
+
+        current = self.model_loader.get_bundle()
+        if bundle.version == current.version:
+            logger.info(f"Model files unchanged ({bundle.version}), nothing to swap")
+            return None, None
+
+        step = time.perf_counter()
+        self.canary_report = self._validate(bundle, current)
+        self.durations["validate_seconds"] = round(time.perf_counter() - step, 4)
+
+        step = time.perf_counter()
+        self.latency = {
+            "old": self._measure(current),
+            "new": self._measure(bundle),
+        }
+        self.durations["warmup_seconds"] = round(time.perf_counter() - step, 4)
+
+        table = None
+        if self.table_builder is not None:
+            step = time.perf_counter()
+            table = self.table_builder(bundle)
+            self.durations["table_seconds"] = round(time.perf_counter() - step, 4)
+
+        return bundle, table
+
+    def _validate(self, bundle: ModelBundle, current: ModelBundle) -> dict:
+        """
+        Scores the canary batch with the new bundle and checks the outputs
+
+        Args:
+            bundle: Bundle to validate
+            current: Bundle being served, used to report the drift
+
+        Returns:
+            Dict with the canary size and the drift against the current bundle
+
+        Raises:
+            ValueError: If the outputs are malformed or out of range
+        """
+        n_rows = len(self.canary)
+        performance, predicted, probability = self.prediction_service.score_features(
+            self.canary, bundle
+        )
+        performance = np.asarray(performance)
+        predicted = np.asarray(predicted)
+        probability = np.asarray(probability)
+
+        for name, values in (
+            ("performance", performance),
+            ("low_performance_predicted", predicted),
+            ("low_performance_probability", probability),
+        ):
+            if values.shape != (n_rows,):
+                raise ValueError(
+                    f"Canary {name} has shape {values.shape}, expected ({n_rows},)"
+                )
+        if not np.isfinite(performance).all():
+            raise ValueError("Canary performance has non-finite values")
+        if not ((probability >= 0) & (probability <= 1)).all():
+            raise ValueError("Canary probability is outside [0, 1]")
+        if not np.isin(predicted, (0, 1)).all():
+            raise ValueError("Canary classes are not 0/1")
+
+        # Exercises the response building path as well
+        self.prediction_service.predict_many(self.canary_inputs, bundle)
+
+        old_performance, old_predicted, _ = self.prediction_service.score_features(
+            self.canary, current
+        )
+        return {
+            "rows": n_rows,
+            "performance_mean_abs_diff": round(
+                float(np.mean(np.abs(performance - old_performance))), 4
+            ),
+            "classification_agreement": round(
+                float(np.mean(predicted == old_predicted)), 4
+            ),
+        }
+
+    def _measure(self, bundle: ModelBundle) -> dict:
+        """
+        Warms up a bundle and times it on the canary batch
+
+        Args:
+            bundle: Bundle to time
+
+        Returns:
+            Dict with the best batch time and the mean single row time
+        """
+        service = self.prediction_service
+
+        for _ in range(self.warmup_rounds):
+            service.score_features(self.canary, bundle)
+            for student_input in self.canary_inputs:
+                service.predict_with(bundle, student_input)
+
+        batch_seconds: List[float] = []
+        for _ in range(self.warmup_rounds):
+            step = time.perf_counter()
+            service.score_features(self.canary, bundle)
+            batch_seconds.append(time.perf_counter() - step)
+
+        step = time.perf_counter()
+        for student_input in self.canary_inputs:
+            service.predict_with(bundle, student_input)
+        single_seconds = (time.perf_counter() - step) / len(self.canary_inputs)
+
+        return {
+            "batch_rows": len(self.canary),
+            "batch_ms": round(min(batch_seconds) * 1000, 4),
+            "single_us": round(single_seconds * 1e6, 2),
+        }
+
+    def _swap(self, bundle: ModelBundle, table: Optional[PredictionTable]):
+        """
+        Publishes the new bundle (runs on the event loop)
+
+        Args:
+            bundle: Validated bundle
+            table: Prediction table of the bundle (optional)
+        """
+        self.executor.recycle_workers()
+        self.model_loader.swap(bundle)
+        if table is not None:
+            self.prediction_service.table = table
+
+        self.swapped = True
+        self.reloads += 1
+        logger.info(f"Models swapped: {self.previous_version} -> {bundle.version}")
+
+        if self.settings.MODEL_RELOAD_RESCORE and self.rescore_job is not None:
+            self.rescore_job.start()
+
+    def _file_signature(self) -> tuple:
+        """Modification time and size of the model files"""
+        settings = self.settings
+        signature = []
+        for name in (
+            settings.CLASSIFICATION_MODEL,
+            settings.REGRESSION_MODEL,
+            settings.SCALER_MODEL,
+            settings.MODEL_BUNDLE,
+        ):
+            if not name:
+                continue
+            try:
+                stat = os.stat(os.path.join(settings.MODELS_PATH, name))
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def start_watching(self, interval_seconds: float):
+        """
+        Polls the model files and reloads when they change
+
+        A change must be seen unchanged on two consecutive polls before the
+        reload starts, so files still being copied are not picked up.
+
+        Args:
+            interval_seconds: Seconds between polls
+        """
+        if self._watch_task is None:
+            self._watch_task = asyncio.get_running_loop().create_task(
+                self._watch(interval_seconds)
+            )
+            logger.info(f"Watching {self.settings.MODELS_PATH} for model changes")
+
+    async def _watch(self, interval_seconds: float):
+        """Watcher loop"""
+        loaded = self._file_signature()
+        pending = None
+        while True:
+            await asyncio.sleep(interval_seconds)
+            signature = self._file_signature()
+            if signature == loaded or None in signature:
+                pending = None
+                continue
+            if signature != pending:
+                pending = signature
+                continue
+            if self.start(trigger="watcher"):
+                loaded = signature
+                pending = None
+
+    def cancel(self):
+        """Cancels the reload in progress and the watcher, if any"""
+        for task in (self._task, self._watch_task):
+            if task is not None and not task.done():
+                task.cancel()
+
+    def progress(self) -> dict:
+        """
+        Gets the state and metrics of the current or last reload
+
+        Returns:
+            Dict with status, versions, step durations and old/new latency
+        """
+        return {
+            "status": self.status,
+            "trigger": self.trigger,
+            "current_version": self.model_loader.get_model_version(),
+            "load_profile": self.model_loader.get_bundle().load_profile,
+            "previous_version": self.previous_version,
+            "new_version": self.new_version,
+            "swapped": self.swapped,
+            "reloads": self.reloads,
+            "durations": self.durations,
+            "latency": self.latency,
+            "canary": self.canary_report,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
@@ -0,0 +1,167 @@
+"""
+Micro-batching of single prediction requests
+"""
+
+import asyncio
+import logging
+from typing import List, Optional, Set, Tuple
+
+from app.models.schemas import PredictionResponse, StudentInput
+from app.services.prediction_executor import PredictionExecutor
+from app.services.prediction_service import PredictionService
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionBatcher:
+    """
+    Coalesces concurrent single predictions into one matrix call
+
+    Requests answered by the prediction table or the cache are served right
+    away. The misses are gathered until max_batch_size items are pending or
+    max_wait_ms elapsed since the first one, then scored together with
+    predict_many on the prediction executor. Results are cached and fanned
+    back out to the awaiting requests.
+    """
+
+    def __init__(
+        self,
+        executor: PredictionExecutor,
+        prediction_service: PredictionService,
+        max_wait_ms: float,
+        max_batch_size: int,
+    ):
+        """
+        Initializes the batcher
+
+        Args:
+            executor: Executor used to score the batches
+            prediction_service: Service whose table and cache are looked up
+            max_wait_ms: Maximum time the first request of a batch waits
+            max_batch_size: Maximum number of requests per batch
+        """
+        self.executor = executor
+        self.prediction_service = prediction_service
+        self.max_wait_seconds = max_wait_ms / 1000
+        self.max_batch_size = max_batch_size
+
+        self._pending: List[Tuple[StudentInput, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.histogram_bounds = self._histogram_bounds(max_batch_size)
+        self.histogram_counts = [0] * len(self.histogram_bounds)
+        self.hits = 0
+        self.batches = 0
+        self.items = 0
+        self.flushes_full = 0
+        self.flushes_timeout = 0
+
+    @staticmethod
+    def _histogram_bounds(max_batch_size: int) -> List[int]:
+        """Powers of two up to max_batch_size, used as histogram buckets"""
+        bounds = [1]
+        while bounds[-1] < max_batch_size:
+            bounds.append(min(bounds[-1] * 2, max_batch_size))
+        return bounds
+
+    async def predict(self, student_input: StudentInput) -> PredictionResponse:
+        """
+        Make predictions for a student, as part of the next batch on a miss
+
+        Args:
+            student_input: Student input data
+
+        Returns:
+            PredictionResponse with predictions
+        """
+        service = self.prediction_service
+        prediction = service.lookup(student_input, service.get_model_version())
+        if prediction is not None:
+            self.hits += 1
+            return prediction
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((student_input, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self.flushes_full += 1
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_seconds, self._on_timeout)
+
+        return await future
+
+    def _on_timeout(self):
+        """Flushes the pending requests when max_wait_ms elapsed"""
+        self._timer = None
+        if self._pending:
+            self.flushes_timeout += 1
+            self._flush()
+
+    def _flush(self):
+        """Schedules scoring of the pending requests"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        self._record(len(batch))
+
+        task = asyncio.create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _record(self, batch_size: int):
+        """Adds a batch to the size histogram"""
+        self.batches += 1
+        self.items += batch_size
+        for i, bound in enumerate(self.histogram_bounds):
+            if batch_size <= bound:
+                self.histogram_counts[i] += 1
+                break
+
+    async def _run_batch(self, batch: List[Tuple[StudentInput, asyncio.Future]]):
+        """Scores a batch, caches it and resolves the futures of its requests"""
+        try:
+            model_version, predictions = await self.executor.predict_many_versioned(
+                [s for s, _ in batch]
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        cache = self.prediction_service.cache
+        for (student_input, future), prediction in zip(batch, predictions):
+            if cache is not None:
+                cache.put(student_input, model_version, prediction)
+            if not future.done():
+                future.set_result(prediction)
+
+    def stats(self) -> dict:
+        """
+        Gets the batch size histogram and counters
+
+        Returns:
+            Dict with batcher statistics
+        """
+        return {
+            "max_wait_ms": self.max_wait_seconds * 1000,
+            "max_batch_size": self.max_batch_size,
+            "hits": self.hits,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": (
+                round(self.items / self.batches, 2) if self.batches else 0.0
+            ),
+            "flushes_full": self.flushes_full,
+            "flushes_timeout": self.flushes_timeout,
+            "pending": len(self._pending),
+            "batch_size_histogram": {
+                f"le_{bound}": count
+                for bound, count in zip(self.histogram_bounds, self.histogram_counts)
+            },
+        }
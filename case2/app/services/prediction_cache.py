@@ -0,0 +1,167 @@
+"""
+Prediction result cache
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.models.schemas import PredictionResponse, StudentInput
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionCache:
+    """
+    Bounded in-process LRU cache with TTL for predictions
+
+    Entries are keyed on the canonical (quantized) feature vector of a
+    StudentInput and tagged with the model version that produced them. When a
+    different model version is seen, the whole cache is dropped.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, key_decimals: int = 6):
+        """
+        Initializes the cache
+
+        Args:
+            max_entries: Maximum number of entries kept
+            ttl_seconds: Time to live of each entry (0 disables expiration)
+            key_decimals: Decimals used to quantize float features in the key
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.key_decimals = key_decimals
+
+        self._entries: "OrderedDict[tuple, Tuple[float, PredictionResponse]]" = (
+            OrderedDict()
+        )
+        self._model_version: Optional[str] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def make_key(self, student_input: StudentInput) -> tuple:
+        """
+        Builds the canonical key of an input
+
+        Args:
+            student_input: Student input data
+
+        Returns:
+            Hashable tuple with the quantized features
+        """
+        return (
+            round(float(student_input.hours_studied), self.key_decimals),
+            round(float(student_input.previous_scores), self.key_decimals),
+            int(student_input.extracurricular_activities),
+            round(float(student_input.sleep_hours), self.key_decimals),
+            int(student_input.sample_questions_practiced),
+        )
+
+    def _check_version(self, model_version: Optional[str]):
+        """Drops every entry if the model version changed (lock must be held)"""
+        if model_version != self._model_version:
+            if self._entries:
+                logger.info(
+                    f"Model version changed, invalidating {len(self._entries)} "
+                    "cached predictions"
+                )
+                self.invalidations += 1
+            self._entries.clear()
+            self._model_version = model_version
+
+    def get(
+        self, student_input: StudentInput, model_version: Optional[str]
+    ) -> Optional[PredictionResponse]:
+        """
+        Gets a cached prediction
+
+        Args:
+            student_input: Student input data
+            model_version: Version of the currently loaded models
+
+        Returns:
+            PredictionResponse or None if not cached
+        """
+        key = self.make_key(student_input)
+
+        with self._lock:
+            self._check_version(model_version)
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, prediction = entry
+            if self.ttl_seconds > 0 and expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return prediction
+
+    def put(
+        self,
+        student_input: StudentInput,
+        model_version: Optional[str],
+        prediction: PredictionResponse,
+    ):
+        """
+        Stores a prediction
+
+        Args:
+            student_input: Student input data
+            model_version: Version of the models that produced the prediction
+            prediction: Prediction to store
+        """
+        if self.max_entries <= 0:
+            return
+
+        key = self.make_key(student_input)
+
+        with self._lock:
+            self._check_version(model_version)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, prediction)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Removes every entry"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Gets the cache counters
+
+        Returns:
+            Dict with size and hit/miss/eviction counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "model_version": self._model_version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
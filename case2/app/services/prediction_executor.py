@@ -0,0 +1,382 @@
+"""
+Execution backends for CPU-bound prediction work
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Callable, List, Optional, Tuple
+
+from app.config import Settings
+from app.models.schemas import PredictionResponse, StudentInput
+from app.profiling import PROFILER
+from app.services.model_loader import ModelLoader
+from app.services.prediction_cache import PredictionCache
+from app.services.prediction_service import PredictionService
+
+logger = logging.getLogger(__name__)
+
+BACKEND_INLINE = "inline"
+BACKEND_THREAD = "thread"
+BACKEND_PROCESS = "process"
+
+_worker_service: Optional[PredictionService] = None
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when the prediction queue is full"""
+
+
+def _init_process_worker(settings: Settings):
+    """
+    Initializer of process pool workers: loads the models once per worker
+
+    Args:
+        settings: App configuration
+    """
+    global _worker_service
+
+    model_loader = ModelLoader()
+    if not model_loader.load_models(
+        models_path=settings.MODELS_PATH,
+        classification_name=settings.CLASSIFICATION_MODEL,
+        regression_name=settings.REGRESSION_MODEL,
+        scaler_name=settings.SCALER_MODEL,
+        enable_fast_path=settings.LINEAR_FAST_PATH,
+        compact_name=settings.MODEL_BUNDLE,
+        mmap=settings.MODEL_MMAP,
+    ):
+        raise RuntimeError("Could not load ML models in worker process")
+
+    cache = None
+    if settings.PREDICTION_CACHE_ENABLED:
+        cache = PredictionCache(
+            max_entries=settings.PREDICTION_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.PREDICTION_CACHE_TTL_SECONDS,
+            key_decimals=settings.PREDICTION_CACHE_KEY_DECIMALS,
+        )
+    _worker_service = PredictionService(model_loader, cache)
+
+
+def _process_predict(student_input: StudentInput) -> PredictionResponse:
+    """Scores one student in a process pool worker"""
+    return _worker_service.predict(student_input)
+
+
+def _process_predict_versioned(
+    student_input: StudentInput,
+) -> Tuple[str, PredictionResponse]:
+    """Scores one student in a process pool worker, with the model version"""
+    return _worker_service.predict_versioned(student_input)
+
+
+def _process_predict_many(students: List[StudentInput]) -> List[PredictionResponse]:
+    """Scores several students in a process pool worker"""
+    return _worker_service.predict_many(students)
+
+
+def _process_predict_many_versioned(
+    students: List[StudentInput],
+) -> Tuple[str, List[PredictionResponse]]:
+    """Scores several students in a process pool worker, with the model version"""
+    return _worker_service.predict_many_versioned(students)
+
+
+def _process_score_many_versioned(
+    students: List[StudentInput],
+) -> Tuple[str, Tuple[list, list, list, list]]:
+    """Scores several students in a process pool worker, into output columns"""
+    return _worker_service.score_many_versioned(students)
+
+
+def _process_predict_many_json(students: List[StudentInput]) -> bytes:
+    """Scores several students in a process pool worker, as JSON"""
+    return _worker_service.predict_many_json(students)
+
+
+def _timed_call(fn: Callable, *args):
+    """Runs fn and returns the monotonic time it started at with its result"""
+    started_at = time.monotonic()
+    return started_at, fn(*args)
+
+
+class PredictionExecutor:
+    """
+    Runs predictions inline, in a thread pool or in a process pool
+
+    The number of submitted but unfinished jobs is bounded by queue_size;
+    once reached, new jobs are rejected with ExecutorSaturatedError so the
+    API can answer 503 instead of piling work on the event loop.
+    """
+
+    def __init__(
+        self,
+        prediction_service: PredictionService,
+        settings: Settings,
+    ):
+        """
+        Initializes the executor
+
+        Args:
+            prediction_service: Service used by the inline and thread backends
+            settings: App configuration
+        """
+        self.settings = settings
+        self.backend = settings.PREDICTION_EXECUTOR
+        self.workers = settings.PREDICTION_WORKERS
+        self.queue_size = settings.PREDICTION_QUEUE_SIZE
+        self.retry_after_seconds = settings.PREDICTION_RETRY_AFTER_SECONDS
+
+        self._pool: Optional[Executor] = None
+
+        if self.backend == BACKEND_INLINE:
+            self._predict = prediction_service.predict
+            self._predict_versioned = prediction_service.predict_versioned
+            self._predict_many = prediction_service.predict_many
+            self._predict_many_versioned = prediction_service.predict_many_versioned
+            self._score_many_versioned = prediction_service.score_many_versioned
+            self._predict_many_json = prediction_service.predict_many_json
+        elif self.backend == BACKEND_THREAD:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="prediction"
+            )
+            self._predict = prediction_service.predict
+            self._predict_versioned = prediction_service.predict_versioned
+            self._predict_many = prediction_service.predict_many
+            self._predict_many_versioned = prediction_service.predict_many_versioned
+            self._score_many_versioned = prediction_service.score_many_versioned
+            self._predict_many_json = prediction_service.predict_many_json
+        elif self.backend == BACKEND_PROCESS:
+            self._pool = self._create_process_pool()
+            self._predict = _process_predict
+            self._predict_versioned = _process_predict_versioned
+            self._predict_many = _process_predict_many
+            self._predict_many_versioned = _process_predict_many_versioned
+            self._score_many_versioned = _process_score_many_versioned
+            self._predict_many_json = _process_predict_many_json
+        else:
+            raise ValueError(f"Unknown prediction executor backend: {self.backend}")
+
+        self._lock = threading.Lock()
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+        logger.info(
+            f"PredictionExecutor initialized: backend={self.backend}, "
+            f"workers={self.workers}, queue_size={self.queue_size}"
+        )
+
+    def _create_process_pool(self) -> ProcessPoolExecutor:
+        """Creates a process pool whose workers load the models on startup"""
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_process_worker,
+            initargs=(self.settings,),
+        )
+
+    def recycle_workers(self):
+        """
+        Replaces the process pool so the workers load the current model files
+
+        New jobs go to the new pool; jobs already submitted finish on the old
+        workers, which exit once they are done. No-op for the other backends,
+        which share the ModelLoader of the API process.
+        """
+        if self.backend != BACKEND_PROCESS or self._pool is None:
+            return
+        old_pool = self._pool
+        self._pool = self._create_process_pool()
+        old_pool.shutdown(wait=False)
+        logger.info("Prediction worker processes recycled")
+
+    async def predict(self, student_input: StudentInput) -> PredictionResponse:
+        """
+        Make predictions for a student on the configured backend
+
+        Args:
+            student_input: Student input data
+
+        Returns:
+            PredictionResponse with predictions
+
+        Raises:
+            ExecutorSaturatedError: If the queue is full
+        """
+        return await self._submit(self._predict, student_input)
+
+    async def predict_versioned(
+        self, student_input: StudentInput
+    ) -> Tuple[str, PredictionResponse]:
+        """
+        Make predictions for a student, with the version of the models
+
+        Args:
+            student_input: Student input data
+
+        Returns:
+            Tuple (model version, PredictionResponse)
+
+        Raises:
+            ExecutorSaturatedError: If the queue is full
+        """
+        return await self._submit(self._predict_versioned, student_input)
+
+    async def predict_many(
+        self, students: List[StudentInput]
+    ) -> List[PredictionResponse]:
+        """
+        Make predictions for several students on the configured backend
+
+        Args:
+            students: List of student input data
+
+        Returns:
+            List of PredictionResponse
+
+        Raises:
+            ExecutorSaturatedError: If the queue is full
+        """
+        return await self._submit(self._predict_many, students)
+
+    async def predict_many_versioned(
+        self, students: List[StudentInput]
+    ) -> Tuple[str, List[PredictionResponse]]:
+        """
+        Make predictions for several students, with the version of the models
+
+        Args:
+            students: List of student input data
+
+        Returns:
+            Tuple (model version, list of PredictionResponse)
+
+        Raises:
+            ExecutorSaturatedError: If the queue is full
+        """
+        return await self._submit(self._predict_many_versioned, students)
+
+    async def score_many_versioned(
+        self, students: List[StudentInput]
+    ) -> Tuple[str, Tuple[list, list, list, list]]:
+        """
+        Scores several students into output columns, with the model version
+
+        Args:
+            students: List of student input data
+
+        Returns:
+            Tuple (model version, output columns)
+
+        Raises:
+            ExecutorSaturatedError: If the queue is full
+        """
+        return await self._submit(self._score_many_versioned, students)
+
+    async def predict_many_json(self, students: List[StudentInput]) -> bytes:
+        """
+        Make predictions for several students, serialized as a JSON array
+
+        Args:
+            students: List of student input data
+
+        Returns:
+            JSON array of predictions
+
+        Raises:
+            ExecutorSaturatedError: If the queue is full
+        """
+        return await self._submit(self._predict_many_json, students)
+
+    async def _submit(self, fn: Callable, *args):
+        """Submits a job to the backend, applying backpressure"""
+        if self._pool is None:
+            with self._lock:
+                self.submitted += 1
+                self.completed += 1
+            return fn(*args)
+
+        with self._lock:
+            if self.queue_depth >= self.queue_size:
+                self.rejected += 1
+                raise ExecutorSaturatedError(
+                    f"Prediction queue is full ({self.queue_size} jobs)"
+                )
+            self.queue_depth += 1
+            self.submitted += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+        if self.backend == BACKEND_THREAD:
+            fn = PROFILER.bind(fn)
+
+        submitted_at = time.monotonic()
+        try:
+            future = self._pool.submit(_timed_call, fn, *args)
+        except BaseException:
+            with self._lock:
+                self.queue_depth -= 1
+            raise
+        # The job holds its slot until the pool is done with it, even if the
+        # request awaiting it is cancelled first
+        future.add_done_callback(
+            functools.partial(self._job_done, submitted_at=submitted_at)
+        )
+
+        _, result = await asyncio.wrap_future(future)
+        return result
+
+    def _job_done(self, future: Future, submitted_at: float):
+        """Releases the queue slot of a finished job and records its wait"""
+        with self._lock:
+            self.queue_depth -= 1
+            if future.cancelled() or future.exception() is not None:
+                return
+            wait_seconds = max(future.result()[0] - submitted_at, 0.0)
+            self.completed += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+    def stats(self) -> dict:
+        """
+        Gets the queue and wait time metrics
+
+        Returns:
+            Dict with executor statistics
+        """
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "workers": self.workers if self._pool is not None else 0,
+                "queue_size": self.queue_size,
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_seconds_avg": (
+                    round(self.wait_seconds_total / self.completed, 6)
+                    if self.completed
+                    else 0.0
+                ),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+    def shutdown(self):
+        """Stops the worker pool"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
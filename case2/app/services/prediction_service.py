@@ -3,108 +3,476 @@ Prediction Service
 """
 
 import logging
-from typing import List
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 import numpy as np
-import pandas as pd
+from pydantic_core import to_json
 
+from app.metrics import stage_timer
 from app.models.schemas import PredictionResponse, StudentInput
-from app.services.model_loader import ModelLoader
+from app.services.model_loader import ModelBundle, ModelLoader
+from app.services.prediction_cache import PredictionCache
+
+if TYPE_CHECKING:
+    from app.services.prediction_table import PredictionTable
 
 logger = logging.getLogger(__name__)
 
+FEATURE_NAMES = [
+    "Hours Studied",
+    "Previous Scores",
+    "Extracurricular Activities",
+    "Sleep Hours",
+    "Sample Question Papers Practiced",
+]
+
+INPUT_FIELDS = tuple(StudentInput.model_fields)
+PREDICTION_FIELDS = tuple(PredictionResponse.model_fields)
+
+HIGH_RISK_THRESHOLD = 0.8
+MEDIUM_RISK_THRESHOLD = 0.6
+
+PERFORMANCE_DECIMALS = 2
+PROBABILITY_DECIMALS = 4
+
+
+def _round_scaled(values, scale: int):
+    """
+    Rounds half to even after scaling, as np.round does
+
+    Floats and arrays go through the same arithmetic, so a value is served
+    with the same decimals by predict and predict_many.
+    """
+    if isinstance(values, np.ndarray):
+        return np.rint(values * scale) / scale
+    return round(values * scale) / scale
+
+
+def round_performance(performance):
+    """Rounds predicted performance indexes (a float or an array) as served"""
+    return _round_scaled(performance, 10**PERFORMANCE_DECIMALS)
+
+
+def round_probability(probability):
+    """Rounds probabilities of low performance (a float or an array) as served"""
+    return _round_scaled(probability, 10**PROBABILITY_DECIMALS)
+
 
 class PredictionService:
     """
     Service for making predictions using ML models
     """
 
-    def __init__(self, model_loader: ModelLoader):
+    def __init__(
+        self,
+        model_loader: ModelLoader,
+        cache: Optional[PredictionCache] = None,
+        table: Optional["PredictionTable"] = None,
+    ):
         """
         Initializes the service with the model loader
 
         Args:
             model_loader: Instance of ModelLoader
+            cache: Prediction cache used by predict (optional)
+            table: Precomputed prediction table used by predict (optional)
         """
         self.model_loader = model_loader
+        self.cache = cache
+        self.table = table
+
+    def get_model_version(self) -> str:
+        """Gets the version of the models that make the predictions"""
+        return self.model_loader.get_model_version()
 
-    def _prepare_features(self, student_input: StudentInput) -> np.ndarray:
+    @staticmethod
+    def _build_feature_matrix(students: List[StudentInput]) -> np.ndarray:
+        """
+        Builds the raw (unscaled) feature matrix
+
+        Args:
+            students: List of student input data
+
+        Returns:
+            Array numpy of shape (n_students, n_features)
+        """
+        # One column at a time: a tuple per student would be tracked by the
+        # garbage collector and trigger collections on large batches
+        n = len(students)
+        return np.column_stack(
+            [
+                np.fromiter(
+                    (getattr(s, field) for s in students), dtype=np.float64, count=n
+                )
+                for field in INPUT_FIELDS
+            ]
+        ).reshape(-1, len(FEATURE_NAMES))
+
+    @staticmethod
+    def _prepare_features(features: np.ndarray, bundle: ModelBundle) -> np.ndarray:
         """
         Prepares the features for the model
 
         Args:
-            student_input: Data of the student
+            features: Raw feature matrix
+            bundle: Models that score the features
 
         Returns:
             Array numpy with scaled features
         """
-        feature_names = [
-            "Hours Studied",
-            "Previous Scores",
-            "Extracurricular Activities",
-            "Sleep Hours",
-            "Sample Question Papers Practiced",
-        ]
+        import pandas as pd
 
-        features_dict = {
-            "Hours Studied": student_input.hours_studied,
-            "Previous Scores": student_input.previous_scores,
-            "Extracurricular Activities": student_input.extracurricular_activities,
-            "Sleep Hours": student_input.sleep_hours,
-            "Sample Question Papers Practiced": student_input.sample_questions_practiced,
-        }
+        with stage_timer("inference.feature_prep"):
+            features_df = pd.DataFrame(features, columns=FEATURE_NAMES, copy=False)
 
-        features_df = pd.DataFrame([features_dict], columns=feature_names)
-
-        scaler = self.model_loader.get_scaler()
-        features_scaled = scaler.transform(features_df)
+        with stage_timer("inference.scaler_transform"):
+            features_scaled = bundle.scaler.transform(features_df)
 
         return features_scaled
 
+    @staticmethod
+    def _risk_level(low_performance_predicted: int, probability: float) -> str:
+        """
+        Buckets the classification output of one student into a risk level
+
+        Args:
+            low_performance_predicted: Predicted class (0/1)
+            probability: Probability of low performance
+
+        Returns:
+            Risk level
+        """
+        if low_performance_predicted != 1:
+            return "LOW"
+        if probability >= HIGH_RISK_THRESHOLD:
+            return "HIGH"
+        if probability >= MEDIUM_RISK_THRESHOLD:
+            return "MEDIUM-HIGH"
+        return "MEDIUM-LOW"
+
+    @staticmethod
+    def _risk_levels(
+        low_performance_predicted: np.ndarray, low_performance_probability: np.ndarray
+    ) -> np.ndarray:
+        """
+        Buckets the classification output into risk levels
+
+        Args:
+            low_performance_predicted: Predicted classes (0/1)
+            low_performance_probability: Probabilities of low performance
+
+        Returns:
+            Array with the risk level of each student
+        """
+        at_risk_level = np.select(
+            [
+                low_performance_probability >= HIGH_RISK_THRESHOLD,
+                low_performance_probability >= MEDIUM_RISK_THRESHOLD,
+            ],
+            ["HIGH", "MEDIUM-HIGH"],
+            default="MEDIUM-LOW",
+        )
+        return np.where(low_performance_predicted == 1, at_risk_level, "LOW")
+
+    def score_features(
+        self, features: np.ndarray, bundle: Optional[ModelBundle] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Scores a raw feature matrix with the loaded models
+
+        Uses the linear fast path when available, otherwise the scaler and
+        the sklearn models.
+
+        Args:
+            features: Raw feature matrix
+            bundle: Models to score with (defaults to the bundle served)
+
+        Returns:
+            Tuple of arrays (performance, low_performance_predicted, probability)
+        """
+        if bundle is None:
+            bundle = self.model_loader.get_bundle()
+
+        if bundle.fast_path is not None:
+            with stage_timer("inference.fast_path"):
+                return bundle.fast_path.score(features)
+
+        features_scaled = self._prepare_features(features, bundle)
+
+        with stage_timer("inference.regression"):
+            performance_predicted = bundle.regression_model.predict(features_scaled)
+
+        classification_model = bundle.classification_model
+        with stage_timer("inference.classification"):
+            low_performance_predicted = np.asarray(
+                classification_model.predict(features_scaled)
+            ).astype(np.int64)
+
+            if hasattr(classification_model, "predict_proba"):
+                low_performance_probability = classification_model.predict_proba(
+                    features_scaled
+                )[:, 1]
+            else:
+                low_performance_probability = low_performance_predicted
+
+        return (
+            np.asarray(performance_predicted, dtype=np.float64),
+            low_performance_predicted,
+            np.asarray(low_performance_probability, dtype=np.float64),
+        )
+
     def predict(self, student_input: StudentInput) -> PredictionResponse:
         """
-        Make predictions for a student
+        Make predictions for a student, going through the table and the cache
+        if configured
+
+        Args:
+            student_input: Student input data
+
+        Returns:
+            PredictionResponse with predictions
+        """
+        return self.predict_versioned(student_input)[1]
+
+    def predict_versioned(
+        self, student_input: StudentInput
+    ) -> Tuple[str, PredictionResponse]:
+        """
+        Make predictions for a student as predict does
+
+        Also returns the version of the models that made the prediction, so
+        the caller can store it without racing a reload.
+
+        Args:
+            student_input: Student input data
+
+        Returns:
+            Tuple (model version, PredictionResponse)
+        """
+        bundle = self.model_loader.get_bundle()
+
+        prediction = self.lookup(student_input, bundle.version)
+        if prediction is None:
+            prediction = self.predict_with(bundle, student_input)
+            if self.cache is not None:
+                self.cache.put(student_input, bundle.version, prediction)
+        return bundle.version, prediction
+
+    def lookup(
+        self, student_input: StudentInput, model_version: str
+    ) -> Optional[PredictionResponse]:
+        """
+        Gets the prediction of a student from the table or the cache
+
+        Args:
+            student_input: Student input data
+            model_version: Version of the models served
+
+        Returns:
+            PredictionResponse, or None if the student must be scored
+        """
+        table = self.table
+        if table is not None:
+            prediction = table.lookup(student_input, model_version)
+            if prediction is not None:
+                return prediction
+
+        if self.cache is None:
+            return None
+        return self.cache.get(student_input, model_version)
+
+    def predict_with(
+        self, bundle: ModelBundle, student_input: StudentInput
+    ) -> PredictionResponse:
+        """
+        Make predictions for a student with the given models
+
+        Skips the table and the cache, so it can score with a bundle that is
+        not served yet (e.g. to time it before a reload).
 
         Args:
+            bundle: Models to score with
             student_input: Student input data
 
         Returns:
             PredictionResponse with predictions
         """
+        fast_path = bundle.fast_path
+        if fast_path is None:
+            return self.predict_many([student_input], bundle)[0]
+
         try:
-            features_scaled = self._prepare_features(student_input)
+            with stage_timer("inference.fast_path"):
+                performance, low_performance, probability = fast_path.score_one(
+                    (
+                        student_input.hours_studied,
+                        student_input.previous_scores,
+                        student_input.extracurricular_activities,
+                        student_input.sleep_hours,
+                        student_input.sample_questions_practiced,
+                    )
+                )
 
-            regression_model = self.model_loader.get_regression_model()
-            performance_predicted = float(regression_model.predict(features_scaled)[0])
+            with stage_timer("inference.risk_bucketing"):
+                risk_level = self._risk_level(low_performance, probability)
 
-            classification_model = self.model_loader.get_classification_model()
-            low_performance_predicted = int(
-                classification_model.predict(features_scaled)[0]
+            return PredictionResponse(
+                performance_index_predicted=round_performance(performance),
+                low_performance_predicted=low_performance,
+                low_performance_probability=round_probability(probability),
+                risk_level=risk_level,
             )
 
-            if hasattr(classification_model, "predict_proba"):
-                proba = classification_model.predict_proba(features_scaled)[0]
-                low_performance_probability = float(proba[1])
-            else:
-                low_performance_probability = float(low_performance_predicted)
-
-            if low_performance_predicted == 1:
-                if low_performance_probability >= 0.8:
-                    risk_level = "HIGH"
-                elif low_performance_probability >= 0.6:
-                    risk_level = "MEDIUM-HIGH"
-                else:
-                    risk_level = "MEDIUM-LOW"
-            else:
-                risk_level = "LOW"
+        except Exception as e:
+            logger.error(f"Prediction error: {str(e)}")
+            raise RuntimeError(f"Prediction error: {str(e)}")
 
-            return PredictionResponse(
-                performance_index_predicted=round(performance_predicted, 2),
-                low_performance_predicted=low_performance_predicted,
-                low_performance_probability=round(low_performance_probability, 4),
+    def predict_many(
+        self, students: List[StudentInput], bundle: Optional[ModelBundle] = None
+    ) -> List[PredictionResponse]:
+        """
+        Make predictions for several students with one call per model
+
+        Args:
+            students: List of student input data
+            bundle: Models to score with (defaults to the bundle served)
+
+        Returns:
+            List of PredictionResponse, in the same order as the input
+        """
+        if not students:
+            return []
+
+        try:
+            return self.responses(self._score_students(students, bundle))
+
+        except Exception as e:
+            logger.error(f"Prediction error: {str(e)}")
+            raise RuntimeError(f"Prediction error: {str(e)}")
+
+    @staticmethod
+    def responses(columns: Tuple[list, list, list, list]) -> List[PredictionResponse]:
+        """
+        Builds a PredictionResponse per row of the output columns
+
+        Args:
+            columns: Lists (performance, low_performance_predicted, probability,
+                risk_level) as returned by score_many_versioned
+
+        Returns:
+            List of PredictionResponse
+        """
+        return [
+            PredictionResponse(
+                performance_index_predicted=performance,
+                low_performance_predicted=low_performance,
+                low_performance_probability=probability,
                 risk_level=risk_level,
             )
+            for performance, low_performance, probability, risk_level in zip(*columns)
+        ]
+
+    def score_many_versioned(
+        self, students: List[StudentInput]
+    ) -> Tuple[str, Tuple[list, list, list, list]]:
+        """
+        Scores several students with the bundle served into output columns
+
+        The columns only hold floats, ints and strings, which the garbage
+        collector does not track, so large batches can be scored without
+        triggering full collections; build the predictions with responses.
 
+        Args:
+            students: List of student input data
+
+        Returns:
+            Tuple (model version, lists (performance, low_performance_predicted,
+            probability, risk_level))
+        """
+        bundle = self.model_loader.get_bundle()
+        try:
+            return bundle.version, self._score_students(students, bundle)
+        except Exception as e:
+            logger.error(f"Prediction error: {str(e)}")
+            raise RuntimeError(f"Prediction error: {str(e)}")
+
+    def predict_many_versioned(
+        self, students: List[StudentInput]
+    ) -> Tuple[str, List[PredictionResponse]]:
+        """
+        Make predictions for several students with the bundle served
+
+        Same as predict_many, also returning the version of the models that
+        scored, so the caller can cache the predictions under that version.
+
+        Args:
+            students: List of student input data
+
+        Returns:
+            Tuple (model version, list of PredictionResponse)
+        """
+        bundle = self.model_loader.get_bundle()
+        return bundle.version, self.predict_many(students, bundle)
+
+    def predict_many_json(
+        self, students: List[StudentInput], bundle: Optional[ModelBundle] = None
+    ) -> bytes:
+        """
+        Make predictions for several students, serialized as a JSON array
+
+        Same output as predict_many, but the rows are encoded by pydantic-core
+        straight from the output columns, without building and revalidating
+        a PredictionResponse per student.
+
+        Args:
+            students: List of student input data
+            bundle: Models to score with (defaults to the bundle served)
+
+        Returns:
+            JSON array of predictions, in the same order as the input
+        """
+        if not students:
+            return b"[]"
+
+        try:
+            columns = self._score_students(students, bundle)
         except Exception as e:
             logger.error(f"Prediction error: {str(e)}")
             raise RuntimeError(f"Prediction error: {str(e)}")
+
+        with stage_timer("response.serialization"):
+            return to_json([dict(zip(PREDICTION_FIELDS, row)) for row in zip(*columns)])
+
+    def _score_students(
+        self, students: List[StudentInput], bundle: Optional[ModelBundle]
+    ) -> Tuple[list, list, list, list]:
+        """
+        Scores students and rounds the outputs as in PredictionResponse
+
+        Args:
+            students: List of student input data
+            bundle: Models to score with (defaults to the bundle served)
+
+        Returns:
+            Lists (performance, low_performance_predicted, probability, risk_level)
+        """
+        with stage_timer("inference.feature_prep"):
+            features = self._build_feature_matrix(students)
+
+        (
+            performance_predicted,
+            low_performance_predicted,
+            low_performance_probability,
+        ) = self.score_features(features, bundle)
+
+        with stage_timer("inference.risk_bucketing"):
+            risk_levels = self._risk_levels(
+                low_performance_predicted, low_performance_probability
+            )
+
+        return (
+            round_performance(performance_predicted).tolist(),
+            low_performance_predicted.tolist(),
+            round_probability(low_performance_probability).tolist(),
+            risk_levels.tolist(),
+        )
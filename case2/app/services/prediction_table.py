@@ -0,0 +1,365 @@
+"""
+Precomputed prediction table over the bounded input space
+"""
+
+import logging
+import os
+import time
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.schemas import PredictionResponse, StudentInput
+from app.services.prediction_service import (
+    HIGH_RISK_THRESHOLD,
+    MEDIUM_RISK_THRESHOLD,
+    round_performance,
+    round_probability,
+)
+
+logger = logging.getLogger(__name__)
+
+FIELDS = [
+    "hours_studied",
+    "previous_scores",
+    "extracurricular_activities",
+    "sleep_hours",
+    "sample_questions_practiced",
+]
+
+RISK_LEVELS = ["LOW", "MEDIUM-LOW", "MEDIUM-HIGH", "HIGH"]
+
+TABLE_DTYPE = np.dtype(
+    [
+        ("performance", "<i4"),
+        ("probability", "<u2"),
+        ("predicted", "u1"),
+        ("risk", "u1"),
+    ]
+)
+
+OFF_GRID_MODEL = "model"
+OFF_GRID_INTERPOLATE = "interpolate"
+
+ON_GRID_TOLERANCE = 1e-6
+
+ScoreFn = Callable[[np.ndarray], Tuple[np.ndarray, np.ndarray, np.ndarray]]
+
+
+def _field_bounds(field: str) -> Tuple[float, float]:
+    """Gets the ge/le bounds declared on a StudentInput field"""
+    lower = upper = None
+    for constraint in StudentInput.model_fields[field].metadata:
+        lower = getattr(constraint, "ge", lower)
+        upper = getattr(constraint, "le", upper)
+    return float(lower), float(upper)
+
+
+class PredictionTable:
+    """
+    Lookup table with the predictions of every point of a quantization grid
+
+    Integer fields use a step of 1 and float fields a configurable step. Each
+    cell stores the rounded outputs as fixed point integers (8 bytes per cell),
+    so answers are identical to the live models at grid points. The table may
+    be memory-mapped from disk.
+    """
+
+    def __init__(
+        self,
+        cells: np.ndarray,
+        lowers: List[float],
+        steps: List[float],
+        shape: Tuple[int, ...],
+        model_version: str,
+        off_grid: str = OFF_GRID_MODEL,
+        build_seconds: float = 0.0,
+        source: str = "built",
+    ):
+        """
+        Initializes the table
+
+        Args:
+            cells: Flat structured array with TABLE_DTYPE
+            lowers: Lower bound of each field
+            steps: Grid step of each field
+            shape: Number of grid points of each field
+            model_version: Version of the models used to build the table
+            off_grid: Off-grid strategy ("model" or "interpolate")
+            build_seconds: Time spent building or loading the table
+            source: "built" or "loaded"
+        """
+        self.cells = cells
+        self.lowers = lowers
+        self.steps = steps
+        self.shape = shape
+        self.model_version = model_version
+        self.off_grid = off_grid
+        self.build_seconds = build_seconds
+        self.source = source
+
+        self.strides = [int(np.prod(shape[i + 1 :])) for i in range(len(shape))]
+
+        self.hits = 0
+        self.interpolations = 0
+        self.fallbacks = 0
+
+    @staticmethod
+    def grid_spec(
+        float_step: float,
+    ) -> Tuple[List[float], List[float], Tuple[int, ...]]:
+        """
+        Computes the grid of the StudentInput space
+
+        Args:
+            float_step: Step used for float fields
+
+        Returns:
+            Tuple (lowers, steps, shape)
+        """
+        lowers, steps, shape = [], [], []
+        for field in FIELDS:
+            lower, upper = _field_bounds(field)
+            is_int = StudentInput.model_fields[field].annotation is int
+            step = 1.0 if is_int else float_step
+            lowers.append(lower)
+            steps.append(step)
+            shape.append(int(round((upper - lower) / step)) + 1)
+        return lowers, steps, tuple(shape)
+
+    @classmethod
+    def build(
+        cls,
+        score_fn: ScoreFn,
+        model_version: str,
+        float_step: float,
+        max_cells: int,
+        off_grid: str = OFF_GRID_MODEL,
+        path: Optional[str] = None,
+        chunk_size: int = 1_000_000,
+    ) -> "PredictionTable":
+        """
+        Builds the table, or loads it from disk if a matching file exists
+
+        Args:
+            score_fn: Function scoring a raw feature matrix
+            model_version: Version of the loaded models
+            float_step: Step used for float fields
+            max_cells: Maximum number of cells allowed
+            off_grid: Off-grid strategy ("model" or "interpolate")
+            path: Directory where the table is persisted and memory-mapped
+            chunk_size: Number of grid points scored per call
+
+        Returns:
+            PredictionTable
+
+        Raises:
+            ValueError: If the grid exceeds max_cells
+        """
+        start = time.perf_counter()
+        lowers, steps, shape = cls.grid_spec(float_step)
+        n_cells = int(np.prod(shape))
+
+        if n_cells > max_cells:
+            raise ValueError(
+                f"Prediction table needs {n_cells} cells, limit is {max_cells}"
+            )
+
+        file_path = None
+        if path:
+            os.makedirs(path, exist_ok=True)
+            file_path = os.path.join(
+                path, f"prediction_table_{model_version}_{float_step:g}.npy"
+            )
+            if os.path.exists(file_path):
+                cells = np.load(file_path, mmap_mode="r")
+                if cells.dtype == TABLE_DTYPE and cells.shape == (n_cells,):
+                    return cls(
+                        cells,
+                        lowers,
+                        steps,
+                        shape,
+                        model_version,
+                        off_grid,
+                        time.perf_counter() - start,
+                        "loaded",
+                    )
+
+        cells = np.empty(n_cells, dtype=TABLE_DTYPE)
+        lowers_arr = np.asarray(lowers)
+        steps_arr = np.asarray(steps)
+
+        for chunk_start in range(0, n_cells, chunk_size):
+            chunk_stop = min(chunk_start + chunk_size, n_cells)
+            indices = np.unravel_index(np.arange(chunk_start, chunk_stop), shape)
+            features = lowers_arr + np.column_stack(indices) * steps_arr
+
+            performance, predicted, probability = score_fn(features)
+
+            chunk = cells[chunk_start:chunk_stop]
+            chunk["performance"] = np.round(np.round(performance, 2) * 100)
+            chunk["probability"] = np.round(np.round(probability, 4) * 10000)
+            chunk["predicted"] = predicted
+            chunk["risk"] = cls._risk_codes(predicted, probability)
+
+        if file_path:
+            np.save(file_path, cells)
+            cells = np.load(file_path, mmap_mode="r")
+
+        return cls(
+            cells,
+            lowers,
+            steps,
+            shape,
+            model_version,
+            off_grid,
+            time.perf_counter() - start,
+            "built",
+        )
+
+    @staticmethod
+    def _risk_codes(predicted: np.ndarray, probability: np.ndarray) -> np.ndarray:
+        """Encodes risk levels as indexes of RISK_LEVELS"""
+        at_risk = np.select(
+            [probability >= HIGH_RISK_THRESHOLD, probability >= MEDIUM_RISK_THRESHOLD],
+            [3, 2],
+            default=1,
+        )
+        return np.where(predicted == 1, at_risk, 0)
+
+    def _response(self, cell) -> PredictionResponse:
+        """Builds the response of a table cell"""
+        performance, probability, predicted, risk = cell.item()
+        return PredictionResponse(
+            performance_index_predicted=performance / 100,
+            low_performance_predicted=predicted,
+            low_performance_probability=probability / 10000,
+            risk_level=RISK_LEVELS[risk],
+        )
+
+    def lookup(
+        self, student_input: StudentInput, model_version: str
+    ) -> Optional[PredictionResponse]:
+        """
+        Looks up the prediction of an input
+
+        Args:
+            student_input: Student input data
+            model_version: Version of the currently loaded models
+
+        Returns:
+            PredictionResponse, or None if the input must be scored by the models
+        """
+        if model_version != self.model_version:
+            self.fallbacks += 1
+            return None
+
+        flat_index = 0
+        off_grid_dims = []
+        positions = []
+
+        for dim, field in enumerate(FIELDS):
+            position = (getattr(student_input, field) - self.lowers[dim]) / self.steps[
+                dim
+            ]
+            index = int(round(position))
+            positions.append(position)
+            if abs(position - index) > ON_GRID_TOLERANCE:
+                off_grid_dims.append(dim)
+            flat_index += index * self.strides[dim]
+
+        if not off_grid_dims:
+            self.hits += 1
+            return self._response(self.cells[flat_index])
+
+        if self.off_grid == OFF_GRID_INTERPOLATE:
+            response = self._interpolate(positions, off_grid_dims)
+            if response is not None:
+                self.interpolations += 1
+                return response
+
+        self.fallbacks += 1
+        return None
+
+    def _interpolate(
+        self, positions: List[float], off_grid_dims: List[int]
+    ) -> Optional[PredictionResponse]:
+        """
+        Multilinear interpolation between the grid points around an input
+
+        The performance and probability are interpolated; the class is the
+        one of the surrounding grid points, which must agree on it.
+
+        Args:
+            positions: Fractional grid position of each field
+            off_grid_dims: Dimensions that fall between grid points
+
+        Returns:
+            Interpolated PredictionResponse, or None if the surrounding grid
+            points predict different classes
+        """
+        base_index = 0
+        weights = []
+        for dim, position in enumerate(positions):
+            if dim in off_grid_dims:
+                lower = min(int(position), self.shape[dim] - 2)
+                weights.append((dim, position - lower))
+            else:
+                lower = int(round(position))
+            base_index += lower * self.strides[dim]
+
+        performance = 0.0
+        probability = 0.0
+        classes = set()
+        for corner in range(1 << len(weights)):
+            index = base_index
+            weight = 1.0
+            for bit, (dim, t) in enumerate(weights):
+                if corner >> bit & 1:
+                    index += self.strides[dim]
+                    weight *= t
+                else:
+                    weight *= 1.0 - t
+            if weight == 0.0:
+                continue
+            cell = self.cells[index]
+            performance += weight * int(cell["performance"])
+            probability += weight * int(cell["probability"])
+            classes.add(int(cell["predicted"]))
+
+        if len(classes) != 1:
+            return None
+        (predicted,) = classes
+        performance /= 100
+        probability /= 10000
+
+        return PredictionResponse(
+            performance_index_predicted=round_performance(performance),
+            low_performance_predicted=predicted,
+            low_performance_probability=round_probability(probability),
+            risk_level=RISK_LEVELS[
+                int(self._risk_codes(np.array(predicted), np.array(probability)))
+            ],
+        )
+
+    def stats(self) -> dict:
+        """
+        Gets the memory footprint, build time and lookup counters
+
+        Returns:
+            Dict with table statistics
+        """
+        return {
+            "model_version": self.model_version,
+            "shape": list(self.shape),
+            "steps": self.steps,
+            "cells": int(self.cells.shape[0]),
+            "bytes": int(self.cells.nbytes),
+            "memory_mapped": isinstance(self.cells, np.memmap),
+            "source": self.source,
+            "build_seconds": round(self.build_seconds, 4),
+            "off_grid": self.off_grid,
+            "hits": self.hits,
+            "interpolations": self.interpolations,
+            "fallbacks": self.fallbacks,
+        }
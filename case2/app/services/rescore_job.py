@@ -0,0 +1,200 @@
+"""
+Background re-scoring of stored predictions
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Optional
+
+from app.models.schemas import StudentInput
+from app.repositories.base import IStudentRepository
+from app.services.prediction_executor import ExecutorSaturatedError, PredictionExecutor
+from app.services.prediction_service import PredictionService
+
+logger = logging.getLogger(__name__)
+
+STATUS_IDLE = "idle"
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+
+
+class RescoreJob:
+    """
+    Re-scores every stored prediction made by another version of the models
+
+    Runs as a task on the event loop: the repository is walked in keyset
+    order, chunk_size students at a time, and the stale students of each
+    chunk are scored with one predict_many call on the prediction executor.
+    Each chunk is stored with the version of the bundle that scored it; if a
+    reload swapped the models meanwhile, the job targets the new version from
+    then on. Students already scored by the target version (new writes, or
+    reads that recomputed them lazily) are skipped.
+    """
+
+    def __init__(
+        self,
+        repository: IStudentRepository,
+        prediction_service: PredictionService,
+        executor: PredictionExecutor,
+        chunk_size: int = 10_000,
+    ):
+        """
+        Initializes the job
+
+        Args:
+            repository: Student repository
+            prediction_service: Prediction service (gives the model version)
+            executor: Executor that runs the vectorized predictions
+            chunk_size: Students read per chunk
+        """
+        self.repository = repository
+        self.prediction_service = prediction_service
+        self.executor = executor
+        self.chunk_size = chunk_size
+
+        self.status = STATUS_IDLE
+        self.model_version: Optional[str] = None
+        self.total = 0
+        self.processed = 0
+        self.rescored = 0
+        self.error: Optional[str] = None
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._start_time = 0.0
+        self._elapsed = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def is_running(self) -> bool:
+        """Verify if a run is in progress"""
+        return self.status == STATUS_RUNNING
+
+    def start(self) -> bool:
+        """
+        Starts a run in the background (must be called from the event loop)
+
+        Returns:
+            False if a run is already in progress
+        """
+        if self.is_running():
+            return False
+
+        self.status = STATUS_RUNNING
+        self.model_version = self.prediction_service.get_model_version()
+        self.total = self.repository.count()
+        self.processed = 0
+        self.rescored = 0
+        self.error = None
+        self.started_at = datetime.now()
+        self.finished_at = None
+        self._start_time = time.perf_counter()
+        self._elapsed = 0.0
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+        logger.info(
+            f"Re-scoring {self.total} students with model version {self.model_version}"
+        )
+        return True
+
+    async def _run(self):
+        """Walks the repository and re-scores the stale chunks"""
+        cursor = None
+        try:
+            while True:
+                rows = self.repository.list_page(
+                    limit=self.chunk_size, sort_by="created_at", cursor=cursor
+                )
+                if not rows:
+                    break
+                cursor = rows[-1][0]
+
+                stale = [
+                    student
+                    for _, student in rows
+                    if student.get("prediction") is not None
+                    and student.get("model_version") != self.model_version
+                ]
+                if stale:
+                    model_version, predictions = await self._predict(
+                        [StudentInput(**student["input_data"]) for student in stale]
+                    )
+                    self.model_version = model_version
+                    self.rescored += self.repository.update_predictions(
+                        [student["student_id"] for student in stale],
+                        predictions,
+                        model_version,
+                    )
+
+                self.processed += len(rows)
+                if len(rows) < self.chunk_size:
+                    break
+
+                # Let other requests run between chunks
+                await asyncio.sleep(0)
+
+            self.status = STATUS_COMPLETED
+        except asyncio.CancelledError:
+            self.status = STATUS_FAILED
+            self.error = "Cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Re-scoring failed: {str(e)}")
+            self.status = STATUS_FAILED
+            self.error = str(e)
+        finally:
+            self.finished_at = datetime.now()
+            self._elapsed = time.perf_counter() - self._start_time
+            logger.info(
+                f"Re-scoring {self.status}: {self.rescored} of {self.processed} "
+                f"students re-scored in {self._elapsed:.2f}s"
+            )
+
+    async def _predict(self, students):
+        """
+        Runs predict_many on the executor, waiting while it is saturated
+
+        Returns:
+            Tuple (version of the models that scored, predictions)
+        """
+        while True:
+            try:
+                return await self.executor.predict_many_versioned(students)
+            except ExecutorSaturatedError:
+                await asyncio.sleep(self.executor.retry_after_seconds)
+
+    def cancel(self):
+        """Cancels the run in progress, if any"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    def progress(self) -> dict:
+        """
+        Gets the progress of the current or last run
+
+        Returns:
+            Dict with status, counters, percentage and throughput
+        """
+        elapsed = (
+            time.perf_counter() - self._start_time
+            if self.is_running()
+            else self._elapsed
+        )
+        return {
+            "status": self.status,
+            "model_version": self.model_version,
+            "total": self.total,
+            "processed": self.processed,
+            "rescored": self.rescored,
+            "progress_percentage": (
+                round(min(self.processed / self.total, 1.0) * 100, 2)
+                if self.total
+                else (100.0 if self.status == STATUS_COMPLETED else 0.0)
+            ),
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.processed / elapsed) if elapsed else 0,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
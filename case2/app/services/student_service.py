@@ -2,20 +2,57 @@
 Students Service
 """
 
+import asyncio
+import base64
+import csv
+import io
+import json
 import logging
-from typing import List, Optional
+import time
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Set, Tuple
 
+from pydantic import ValidationError
+from pydantic_core import to_json
+
+from app.metrics import stage_timer
 from app.models.schemas import (
+    BulkRowResult,
+    PredictionResponse,
     StudentCreate,
     StudentInput,
+    StudentPage,
     StudentResponse,
     StudentUpdate,
 )
-from app.repositories.student_repository import StudentRepository
+from app.repositories.aggregates import StudentAggregates
+from app.repositories.base import IStudentRepository
+from app.services.prediction_executor import ExecutorSaturatedError, PredictionExecutor
 from app.services.prediction_service import PredictionService
 
 logger = logging.getLogger(__name__)
 
+EXPORT_INPUT_FIELDS = list(StudentInput.model_fields)
+EXPORT_PREDICTION_FIELDS = list(PredictionResponse.model_fields)
+EXPORT_CSV_HEADER = (
+    ["student_id", "name"]
+    + EXPORT_INPUT_FIELDS
+    + EXPORT_PREDICTION_FIELDS
+    + ["model_version", "created_at", "updated_at"]
+)
+
+
+def _json_default(value):
+    """Serializes the datetimes of stored students"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+_EXPORT_JSON_ENCODER = json.JSONEncoder(default=_json_default, separators=(",", ":"))
+
+STUDENT_FIELDS = tuple(StudentResponse.model_fields)
+
 
 class StudentService:
     """
@@ -23,7 +60,12 @@ class StudentService:
     """
 
     def __init__(
-        self, repository: StudentRepository, prediction_service: PredictionService
+        self,
+        repository: IStudentRepository,
+        prediction_service: PredictionService,
+        rescore_on_read: bool = True,
+        fast_serialization: bool = False,
+        executor: Optional[PredictionExecutor] = None,
     ):
         """
         Initialize the service
@@ -31,16 +73,32 @@ class StudentService:
         Args:
             repository: Student repository
             prediction_service: Prediction service
+            rescore_on_read: Recompute stale predictions when students are read
+            fast_serialization: Serve reads with the *_json methods, which
+                encode stored students without revalidating them
+            executor: Executor that recomputes stale predictions (optional,
+                scored inline if missing)
         """
         self.repository = repository
         self.prediction_service = prediction_service
-
-    def create_student(self, student_data: StudentCreate) -> StudentResponse:
+        self.rescore_on_read = rescore_on_read
+        self.executor = executor
+        self.fast_serialization = fast_serialization
+
+    def create_student(
+        self,
+        student_data: StudentCreate,
+        prediction: Optional[PredictionResponse] = None,
+        model_version: Optional[str] = None,
+    ) -> StudentResponse:
         """
         Create a new student with automatic prediction
 
         Args:
             student_data: Data of the student
+            prediction: Precomputed prediction (optional, computed if missing)
+            model_version: Version of the models that made the precomputed
+                prediction (defaults to the current one)
 
         Returns:
             StudentResponse with data and prediction
@@ -53,20 +111,146 @@ class StudentService:
                 f"Student with ID {student_data.student_id} already exists"
             )
 
-        prediction = self.prediction_service.predict(student_data.input_data)
+        if prediction is None:
+            model_version, prediction = self.prediction_service.predict_versioned(
+                student_data.input_data
+            )
+        elif model_version is None:
+            model_version = self.prediction_service.get_model_version()
 
         student_dict = self.repository.create(
             student_id=student_data.student_id,
             name=student_data.name,
             input_data=student_data.input_data,
             prediction=prediction,
+            model_version=model_version,
         )
 
         logger.info(f"Student {student_data.student_id} created with prediction")
 
         return self._dict_to_response(student_dict)
 
-    def get_student(self, student_id: str) -> Optional[StudentResponse]:
+    def validate_bulk(
+        self, rows: List[dict]
+    ) -> Tuple[List[StudentCreate], List[BulkRowResult]]:
+        """
+        Validates the rows of a bulk import in one pass
+
+        Rows are rejected when they are invalid, when their student_id is
+        repeated in the upload (the first occurrence wins) or when it already
+        exists in the repository.
+
+        Args:
+            rows: Parsed rows shaped like StudentCreate
+
+        Returns:
+            Tuple of (accepted students, status of every row). Accepted rows
+            keep the status "created" only if they are later inserted.
+        """
+        results: List[BulkRowResult] = []
+        candidates: List[Tuple[int, StudentCreate]] = []
+        seen: Set[str] = set()
+
+        for position, row in enumerate(rows):
+            try:
+                student = StudentCreate.model_validate(row)
+            except ValidationError as e:
+                student_id = row.get("student_id") if isinstance(row, dict) else None
+                error = e.errors()[0]
+                location = ".".join(str(part) for part in error["loc"])
+                results.append(
+                    BulkRowResult(
+                        row=position,
+                        student_id=student_id if isinstance(student_id, str) else None,
+                        status="invalid",
+                        detail=f"{location}: {error['msg']}",
+                    )
+                )
+                continue
+
+            if student.student_id in seen:
+                results.append(
+                    BulkRowResult(
+                        row=position,
+                        student_id=student.student_id,
+                        status="duplicate",
+                        detail="student_id repeated in the upload",
+                    )
+                )
+                continue
+
+            seen.add(student.student_id)
+            candidates.append((position, student))
+
+        existing = self.repository.existing_ids(seen)
+        accepted = []
+        for position, student in candidates:
+            if student.student_id in existing:
+                results.append(
+                    BulkRowResult(
+                        row=position,
+                        student_id=student.student_id,
+                        status="exists",
+                        detail="student_id already exists",
+                    )
+                )
+            else:
+                accepted.append(student)
+                results.append(
+                    BulkRowResult(
+                        row=position, student_id=student.student_id, status="created"
+                    )
+                )
+
+        results.sort(key=lambda result: result.row)
+        return accepted, results
+
+    def create_students_bulk(
+        self,
+        students: List[StudentCreate],
+        predictions: Optional[List[PredictionResponse]] = None,
+        model_version: Optional[str] = None,
+    ) -> int:
+        """
+        Creates validated students in one repository transaction
+
+        Args:
+            students: Students accepted by validate_bulk
+            predictions: Precomputed predictions (optional, scored in one
+                matrix call if missing)
+            model_version: Version of the models that made the precomputed
+                predictions (defaults to the current one)
+
+        Returns:
+            Number of students created
+
+        Raises:
+            ValueError: If any student was created concurrently (nothing is
+                inserted)
+        """
+        if not students:
+            return 0
+
+        inputs = [student.input_data for student in students]
+        if predictions is None:
+            model_version, predictions = self.prediction_service.predict_many_versioned(
+                inputs
+            )
+        elif model_version is None:
+            model_version = self.prediction_service.get_model_version()
+
+        self.repository.create_many(
+            student_ids=[student.student_id for student in students],
+            names=[student.name for student in students],
+            inputs=inputs,
+            predictions=predictions,
+            model_version=model_version,
+        )
+
+        logger.info(f"{len(students)} students created in bulk import")
+        return len(students)
+
+    async def get_student(self, student_id: str) -> Optional[StudentResponse]:
         """
         Get student by ID
 
@@ -81,8 +265,30 @@ class StudentService:
         if student_dict is None:
             return None
 
+        await self._refresh_stale([student_dict])
         return self._dict_to_response(student_dict)
 
+    async def get_student_json(self, student_id: str) -> Optional[bytes]:
+        """
+        Get a student by ID serialized as a StudentResponse JSON object
+
+        The stored dict is encoded as it is (see list_students_json).
+
+        Args:
+            student_id: ID of the student
+
+        Returns:
+            JSON of the student or None if not found
+        """
+        student_dict = self.repository.get_by_id(student_id)
+
+        if student_dict is None:
+            return None
+
+        await self._refresh_stale([student_dict])
+        with stage_timer("response.serialization"):
+            return to_json(student_dict)
+
     def get_all_students(self) -> List[StudentResponse]:
         """
         Get all students
@@ -93,8 +299,367 @@ class StudentService:
         students_dict = self.repository.get_all()
         return [self._dict_to_response(s) for s in students_dict]
 
+    async def list_students(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort_by: str = "created_at",
+        order: str = "asc",
+        risk_level: Optional[str] = None,
+        low_performance_predicted: Optional[int] = None,
+        fields: Optional[Set[str]] = None,
+    ) -> StudentPage:
+        """
+        Get a page of students
+
+        Args:
+            limit: Maximum number of students
+            cursor: Cursor returned by the previous page (optional)
+            sort_by: created_at or performance_index_predicted
+            order: asc or desc
+            risk_level: Filter on risk level (optional)
+            low_performance_predicted: Filter on low performance (optional)
+            fields: Fields to include in each item (optional, all by default)
+
+        Returns:
+            StudentPage
+
+        Raises:
+            ValueError: If the cursor or the fields are invalid
+        """
+        students, next_cursor = await self._list_page(
+            limit, cursor, sort_by, order, risk_level, low_performance_predicted, fields
+        )
+
+        with stage_timer("response.serialization"):
+            items = [
+                self._dict_to_response(student).model_dump(mode="json", include=fields)
+                for student in students
+            ]
+
+        return StudentPage(
+            items=items,
+            limit=limit,
+            next_cursor=next_cursor,
+        )
+
+    async def list_students_json(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort_by: str = "created_at",
+        order: str = "asc",
+        risk_level: Optional[str] = None,
+        low_performance_predicted: Optional[int] = None,
+        fields: Optional[Set[str]] = None,
+    ) -> bytes:
+        """
+        Get a page of students serialized as a StudentPage JSON object
+
+        Same output as list_students. The stored dicts already have the shape
+        of StudentResponse and were validated when written, so they are
+        encoded by pydantic-core as they are (projected to the fields) instead
+        of going through a StudentResponse and a StudentPage each.
+
+        Args:
+            Same as list_students
+
+        Returns:
+            JSON of the page
+
+        Raises:
+            ValueError: If the cursor or the fields are invalid
+        """
+        students, next_cursor = await self._list_page(
+            limit, cursor, sort_by, order, risk_level, low_performance_predicted, fields
+        )
+
+        with stage_timer("response.serialization"):
+            if fields is not None:
+                students = [
+                    {name: student[name] for name in STUDENT_FIELDS if name in fields}
+                    for student in students
+                ]
+            return to_json(
+                {"items": students, "limit": limit, "next_cursor": next_cursor}
+            )
+
+    async def _list_page(
+        self,
+        limit: int,
+        cursor: Optional[str],
+        sort_by: str,
+        order: str,
+        risk_level: Optional[str],
+        low_performance_predicted: Optional[int],
+        fields: Optional[Set[str]],
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        Reads a page of stored students, refreshing their stale predictions
+
+        Returns:
+            Tuple (student dicts, next_cursor)
+
+        Raises:
+            ValueError: If the cursor or the fields are invalid
+        """
+        if fields is not None:
+            unknown = fields - set(StudentResponse.model_fields)
+            if unknown:
+                raise ValueError(f"Unknown fields: {sorted(unknown)}")
+
+        rows = self.repository.list_page(
+            limit=limit + 1,
+            sort_by=sort_by,
+            descending=order == "desc",
+            cursor=self._decode_cursor(cursor, sort_by, order) if cursor else None,
+            risk_level=risk_level,
+            low_performance_predicted=low_performance_predicted,
+        )
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(rows[-1][0], sort_by, order)
+
+        students = [student for _, student in rows]
+        await self._refresh_stale(students)
+        return students, next_cursor
+
+    async def _refresh_stale(self, students: List[dict]) -> int:
+        """
+        Recomputes the predictions made by other versions of the models
+
+        Stale students are scored in one matrix call on the prediction
+        executor and stored back, so each one is recomputed once, on its
+        first read after a model swap. They are tagged with the version of the
+        models that actually scored them, which may be newer than the one
+        they were found stale against if a reload happened meanwhile. The
+        dicts are updated in place. When the executor is saturated, the
+        stored predictions are served as they are.
+
+        Args:
+            students: Stored student dicts
+
+        Returns:
+            Number of students recomputed
+        """
+        if not self.rescore_on_read:
+            return 0
+
+        current_version = self.prediction_service.get_model_version()
+        stale = [
+            student
+            for student in students
+            if student.get("prediction") is not None
+            and student.get("model_version") != current_version
+        ]
+        if not stale:
+            return 0
+
+        inputs = [StudentInput(**student["input_data"]) for student in stale]
+        try:
+            if self.executor is None:
+                model_version, predictions = (
+                    self.prediction_service.predict_many_versioned(inputs)
+                )
+            else:
+                model_version, predictions = await self.executor.predict_many_versioned(
+                    inputs
+                )
+        except ExecutorSaturatedError as e:
+            logger.warning(f"Stale predictions served as stored: {str(e)}")
+            return 0
+
+        self.repository.update_predictions(
+            [student["student_id"] for student in stale], predictions, model_version
+        )
+        for student, prediction in zip(stale, predictions):
+            # Students written meanwhile (or stored dicts the repository
+            # already updated) keep their own prediction
+            if student.get("model_version") != model_version:
+                student["prediction"] = prediction.model_dump()
+                student["model_version"] = model_version
+
+        logger.info(f"{len(stale)} stale predictions recomputed on read")
+        return len(stale)
+
+    @staticmethod
+    def _encode_cursor(sort_key: tuple, sort_by: str, order: str) -> str:
+        """
+        Encodes the sort key of the last student of a page as an opaque cursor
+
+        Args:
+            sort_key: (sort_value, student_id)
+            sort_by: Sort field of the page
+            order: Sort direction of the page
+
+        Returns:
+            URL-safe cursor string
+        """
+        value, student_id = sort_key
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        payload = json.dumps([sort_by, order, value, student_id])
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str, sort_by: str, order: str) -> tuple:
+        """
+        Decodes a cursor produced by _encode_cursor
+
+        Args:
+            cursor: Cursor string
+            sort_by: Sort field of the requested page
+            order: Sort direction of the requested page
+
+        Returns:
+            Sort key (sort_value, student_id)
+
+        Raises:
+            ValueError: If the cursor is malformed or was built for another sort
+        """
+        try:
+            cursor_sort_by, cursor_order, value, student_id = json.loads(
+                base64.urlsafe_b64decode(cursor.encode())
+            )
+            if sort_by == "created_at":
+                value = datetime.fromisoformat(value)
+            else:
+                value = float(value)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {str(e)}")
+
+        if (cursor_sort_by, cursor_order) != (sort_by, order):
+            raise ValueError("Cursor was created for a different sort order")
+
+        return (value, str(student_id))
+
+    async def export_students(
+        self,
+        export_format: str = "ndjson",
+        chunk_size: int = 1000,
+        sort_by: str = "created_at",
+        order: str = "asc",
+        risk_level: Optional[str] = None,
+        low_performance_predicted: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Streams students as NDJSON or CSV in constant memory
+
+        Walks the repository in keyset order, chunk_size students at a time,
+        and serializes the stored dicts directly (no StudentResponse per row).
+        Each yielded string is one flushed chunk.
+
+        Stale predictions are recomputed as on reads when the walk is in
+        created_at order without prediction filters. Sorted or filtered on
+        the predictions, a recomputed row could move past the keyset cursor
+        and be exported twice, so rows are exported as stored, with their
+        model_version (run the re-scoring job first to export fresh ones).
+
+        Args:
+            export_format: ndjson or csv
+            chunk_size: Students serialized per chunk
+            sort_by: created_at or performance_index_predicted
+            order: asc or desc
+            risk_level: Filter on risk level (optional)
+            low_performance_predicted: Filter on low performance (optional)
+
+        Yields:
+            Serialized chunks
+        """
+        start = time.perf_counter()
+        total = 0
+        cursor = None
+        refresh = (
+            sort_by == "created_at"
+            and risk_level is None
+            and low_performance_predicted is None
+        )
+
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator="\n")
+            writer.writerow(EXPORT_CSV_HEADER)
+            yield buffer.getvalue()
+
+        while True:
+            rows = self.repository.list_page(
+                limit=chunk_size,
+                sort_by=sort_by,
+                descending=order == "desc",
+                cursor=cursor,
+                risk_level=risk_level,
+                low_performance_predicted=low_performance_predicted,
+            )
+            if not rows:
+                break
+
+            cursor = rows[-1][0]
+            total += len(rows)
+            students = [student for _, student in rows]
+            if refresh:
+                await self._refresh_stale(students)
+
+            if export_format == "csv":
+                yield self._csv_chunk(students)
+            else:
+                encode = _EXPORT_JSON_ENCODER.encode
+                yield "\n".join(encode(student) for student in students) + "\n"
+
+            if len(rows) < chunk_size:
+                break
+
+            # Let other requests run between chunks
+            await asyncio.sleep(0)
+
+        elapsed = time.perf_counter() - start
+        logger.info(
+            f"Export finished: {total} rows in {elapsed:.3f}s "
+            f"({total / elapsed if elapsed else 0:,.0f} rows/s)"
+        )
+
+    @staticmethod
+    def _csv_chunk(students) -> str:
+        """
+        Serializes students as CSV rows
+
+        Args:
+            students: Iterable of stored student dicts
+
+        Returns:
+            CSV text (without header)
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        empty_prediction = [None] * len(EXPORT_PREDICTION_FIELDS)
+
+        for student in students:
+            input_data = student["input_data"]
+            prediction = student.get("prediction")
+            writer.writerow(
+                [student["student_id"], student["name"]]
+                + [input_data[field] for field in EXPORT_INPUT_FIELDS]
+                + (
+                    [prediction[field] for field in EXPORT_PREDICTION_FIELDS]
+                    if prediction
+                    else empty_prediction
+                )
+                + [
+                    student.get("model_version"),
+                    student["created_at"].isoformat(),
+                    student["updated_at"].isoformat(),
+                ]
+            )
+
+        return buffer.getvalue()
+
     def update_student(
-        self, student_id: str, update_data: StudentUpdate
+        self,
+        student_id: str,
+        update_data: StudentUpdate,
+        prediction: Optional[PredictionResponse] = None,
+        model_version: Optional[str] = None,
     ) -> Optional[StudentResponse]:
         """
         Update a student and recalculate prediction if new data is available
@@ -102,6 +667,9 @@ class StudentService:
         Args:
             student_id: ID of the student
             update_data: Data to update
+            prediction: Precomputed prediction for the new data (optional)
+            model_version: Version of the models that made the precomputed
+                prediction (defaults to the current one)
 
         Returns:
             StudentResponse updated or None if not exists
@@ -109,15 +677,19 @@ class StudentService:
         if not self.repository.exists(student_id):
             return None
 
-        prediction = None
-        if update_data.input_data is not None:
-            prediction = self.prediction_service.predict(update_data.input_data)
+        if prediction is None and update_data.input_data is not None:
+            model_version, prediction = self.prediction_service.predict_versioned(
+                update_data.input_data
+            )
+        elif model_version is None:
+            model_version = self.prediction_service.get_model_version()
 
         student_dict = self.repository.update(
             student_id=student_id,
             name=update_data.name,
             input_data=update_data.input_data,
             prediction=prediction,
+            model_version=model_version,
         )
 
         logger.info(f"Student {student_id} updated")
@@ -141,42 +713,64 @@ class StudentService:
 
         return deleted
 
-    def get_statistics(self) -> dict:
+    def get_statistics(self, detailed: bool = False) -> dict:
         """
-        Gets general statistics
+        Gets general statistics from the running aggregates (O(1))
+
+        Args:
+            detailed: Include std, risk level counts and approximate percentiles
 
         Returns:
             Dict with statistics
         """
-        all_students = self.repository.get_all()
+        aggregates = self.repository.get_aggregates()
+        total = aggregates.count
+
+        stats = {
+            "total_students": total,
+            "students_at_risk": aggregates.at_risk,
+            "risk_percentage": (
+                round((aggregates.at_risk / total) * 100, 2) if total else 0.0
+            ),
+            "average_performance": round(aggregates.mean(), 2),
+        }
 
-        if not all_students:
-            return {
-                "total_students": 0,
-                "students_at_risk": 0,
-                "risk_percentage": 0.0,
-                "average_performance": 0.0,
-            }
+        if detailed:
+            p25, p50, p75, p90, p99 = aggregates.sketch.quantiles(
+                [0.25, 0.5, 0.75, 0.9, 0.99]
+            )
+            stats.update(
+                {
+                    "performance_std": round(aggregates.std(), 2),
+                    "risk_level_counts": aggregates.snapshot()["risk_levels"],
+                    "performance_percentiles": {
+                        "p25": p25,
+                        "p50": p50,
+                        "p75": p75,
+                        "p90": p90,
+                        "p99": p99,
+                    },
+                }
+            )
 
-        students_at_risk = sum(
-            1
-            for s in all_students
-            if s.get("prediction") and s["prediction"]["low_performance_predicted"] == 1
-        )
+        return stats
 
-        performances = [
-            s["prediction"]["performance_index_predicted"]
-            for s in all_students
-            if s.get("prediction")
-        ]
+    def check_statistics_consistency(self) -> dict:
+        """
+        Compares the running aggregates against a full recompute
 
-        avg_performance = sum(performances) / len(performances) if performances else 0.0
+        Returns:
+            Dict with the consistency flag and both snapshots
+        """
+        incremental = self.repository.get_aggregates().snapshot()
+        recomputed = StudentAggregates.from_students(
+            self.repository.get_all()
+        ).snapshot()
 
         return {
-            "total_students": len(all_students),
-            "students_at_risk": students_at_risk,
-            "risk_percentage": round((students_at_risk / len(all_students)) * 100, 2),
-            "average_performance": round(avg_performance, 2),
+            "consistent": incremental == recomputed,
+            "incremental": incremental,
+            "recomputed": recomputed,
         }
 
     def _dict_to_response(self, student_dict: dict) -> StudentResponse:
@@ -194,6 +788,7 @@ class StudentService:
             name=student_dict["name"],
             input_data=StudentInput(**student_dict["input_data"]),
             prediction=student_dict.get("prediction"),
+            model_version=student_dict.get("model_version"),
             created_at=student_dict["created_at"],
             updated_at=student_dict["updated_at"],
         )
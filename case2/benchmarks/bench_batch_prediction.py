@@ -0,0 +1,72 @@
+"""
+Benchmark: batch prediction throughput
+
+Compares scoring a batch one student at a time (PredictionService.predict)
+against a single vectorized pass (PredictionService.predict_many).
+
+Usage (from case2/):
+    python -m benchmarks.bench_batch_prediction
+"""
+
+import random
+import time
+import warnings
+
+from app.config import get_settings
+from app.models.schemas import StudentInput
+from app.services.model_loader import ModelLoader
+from app.services.prediction_service import PredictionService
+
+BATCH_SIZES = [100, 1_000, 5_000, 50_000]
+LOOP_LIMIT = 5_000
+
+
+def random_students(n: int, seed: int = 42) -> list[StudentInput]:
+    rng = random.Random(seed)
+    return [
+        StudentInput(
+            hours_studied=rng.randint(1, 9),
+            previous_scores=rng.randint(40, 99),
+            extracurricular_activities=rng.randint(0, 1),
+            sleep_hours=rng.randint(4, 9),
+            sample_questions_practiced=rng.randint(0, 9),
+        )
+        for _ in range(n)
+    ]
+
+
+def rows_per_second(fn, n: int) -> float:
+    start = time.perf_counter()
+    fn()
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    warnings.filterwarnings("ignore")
+    settings = get_settings()
+    model_loader = ModelLoader()
+    model_loader.load_models(
+        models_path=settings.MODELS_PATH,
+        classification_name=settings.CLASSIFICATION_MODEL,
+        regression_name=settings.REGRESSION_MODEL,
+        scaler_name=settings.SCALER_MODEL,
+    )
+    service = PredictionService(model_loader)
+
+    print(f"{'batch':>8} {'loop rows/s':>14} {'vectorized rows/s':>18} {'speedup':>8}")
+    for n in BATCH_SIZES:
+        students = random_students(n)
+
+        vectorized = rows_per_second(lambda: service.predict_many(students), n)
+
+        if n <= LOOP_LIMIT:
+            loop = rows_per_second(lambda: [service.predict(s) for s in students], n)
+            print(
+                f"{n:>8} {loop:>14,.0f} {vectorized:>18,.0f} {vectorized / loop:>7.1f}x"
+            )
+        else:
+            print(f"{n:>8} {'-':>14} {vectorized:>18,.0f} {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
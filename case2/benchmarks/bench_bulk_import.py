@@ -0,0 +1,74 @@
+"""
+Benchmark: bulk student import
+
+Measures rows/sec of POST /students/bulk end to end (parsing, validation,
+scoring, insertion and response) for JSON, NDJSON and CSV uploads. The
+backend is taken from the settings (REPOSITORY_BACKEND, SQLITE_PATH).
+
+Usage (from case2/):
+    python -m benchmarks.bench_bulk_import [n_rows]
+"""
+
+import csv
+import io
+import json
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.schemas import StudentInput
+from benchmarks.bench_batch_prediction import random_students
+
+INPUT_FIELDS = list(StudentInput.model_fields)
+
+
+def build_uploads(n: int, prefix: str) -> dict:
+    inputs = random_students(n)
+    rows = [
+        {
+            "student_id": f"{prefix}{i:08d}",
+            "name": f"Student {i}",
+            "input_data": input_data.model_dump(),
+        }
+        for i, input_data in enumerate(inputs)
+    ]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["student_id", "name"] + INPUT_FIELDS)
+    for row in rows:
+        data = row["input_data"]
+        writer.writerow(
+            [row["student_id"], row["name"]] + [data[f] for f in INPUT_FIELDS]
+        )
+    return {
+        "json": (json.dumps(rows), "application/json"),
+        "ndjson": ("\n".join(json.dumps(row) for row in rows), "application/x-ndjson"),
+        "csv": (buffer.getvalue(), "text/csv"),
+    }
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+    with TestClient(app) as client:
+        print(f"{n:,} rows per upload")
+        for upload_format in ["json", "ndjson", "csv"]:
+            body, content_type = build_uploads(n, f"B{upload_format}-")[upload_format]
+            start = time.perf_counter()
+            response = client.post(
+                "/api/v1/students/bulk",
+                content=body,
+                headers={"content-type": content_type},
+            )
+            elapsed = time.perf_counter() - start
+            created = response.json()["created"]
+            print(
+                f"{upload_format:>8}: {n / elapsed:>12,.0f} rows/s "
+                f"({created:,} created in {elapsed:.2f}s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: cold start
+
+Prints the slowest imports of app.main (python -X importtime) and measures
+the time from launching uvicorn to the first healthy /health response,
+loading the models from the pickles and from the compact bundle.
+
+Usage (from case2/):
+    python -m app.services.model_loader  # writes models/model_bundle.npz
+    python -m benchmarks.bench_cold_start [runs]
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+TOP_IMPORTS = 10
+TIMEOUT_SECONDS = 60
+
+
+def import_profile() -> list[tuple[int, str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            imports[name.strip()] = int(cumulative)
+    return sorted(((us, name) for name, us in imports.items()), reverse=True)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_healthy(env: dict) -> float:
+    port = free_port()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < TIMEOUT_SECONDS:
+            try:
+                with urllib.request.urlopen(
+                    f"http://127.0.0.1:{port}/health", timeout=1
+                ) as response:
+                    if json.load(response)["status"] == "healthy":
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError("API did not become healthy")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    profile = import_profile()
+    print(f"import app.main: {profile[0][0] / 1e6:.3f}s")
+    for us, name in profile[1 : TOP_IMPORTS + 1]:
+        print(f"{us / 1e6:>10.3f}s  {name}")
+
+    print(f"\ntime to first healthy response (best of {runs})")
+    for label, env in [
+        ("pickles", {"MODEL_BUNDLE": ""}),
+        ("compact", {"MODEL_BUNDLE": "model_bundle.npz"}),
+    ]:
+        best = min(time_to_healthy(env) for _ in range(runs))
+        print(f"{label:>8}: {best:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Benchmark: dict vs columnar in-memory repositories
+
+Measures the resident memory per student and the latency of the statistics
+and filter queries of both backends. Each backend is filled in its own
+process, so the memory delta only holds that repository. Stats are timed as
+a full recompute; both backends keep them incrementally on writes, so this
+is the cost of rebuilding them from the stored students.
+
+Usage (from case2/):
+    python -m benchmarks.bench_columnar [n_students]
+"""
+
+import gc
+import multiprocessing
+import random
+import resource
+import sys
+import time
+
+from app.models.schemas import PredictionResponse
+from app.repositories.aggregates import StudentAggregates
+from app.repositories.columnar_student_repository import ColumnarStudentRepository
+from app.repositories.student_repository import StudentRepository
+from benchmarks.bench_batch_prediction import random_students
+
+BULK_CHUNK = 50_000
+ROUNDS = 5
+RISK_LEVELS = ("LOW", "MEDIUM-LOW", "MEDIUM-HIGH", "HIGH")
+
+
+def rss_bytes() -> int:
+    """Current resident set size (peak size where /proc is not available)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def random_predictions(n: int):
+    rng = random.Random(0)
+    predictions = []
+    for _ in range(n):
+        performance = round(rng.uniform(10, 100), 2)
+        predictions.append(
+            PredictionResponse(
+                performance_index_predicted=performance,
+                low_performance_predicted=int(performance < 40),
+                low_performance_probability=round(rng.random(), 4),
+                risk_level=rng.choice(RISK_LEVELS),
+            )
+        )
+    return predictions
+
+
+def best_ms(fn) -> float:
+    fn()
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def dict_stats(repository):
+    return StudentAggregates.from_students(repository.get_all())
+
+
+def columnar_stats(repository):
+    return repository._rows_aggregates(repository.filter_rows())
+
+
+def dict_filter_count(repository):
+    return sum(
+        1
+        for student in repository.get_all()
+        if student["prediction"]
+        and student["prediction"]["risk_level"] == "HIGH"
+        and student["prediction"]["low_performance_predicted"] == 1
+    )
+
+
+def columnar_filter_count(repository):
+    return len(repository.filter_rows("HIGH", 1))
+
+
+def run(backend: str, n: int, results):
+    inputs = random_students(1_000)
+    predictions = random_predictions(1_000)
+    gc.collect()
+    before = rss_bytes()
+
+    if backend == "memory":
+        repository = StudentRepository()
+        stats, filter_count = dict_stats, dict_filter_count
+    else:
+        repository = ColumnarStudentRepository()
+        stats, filter_count = columnar_stats, columnar_filter_count
+
+    for start in range(0, n, BULK_CHUNK):
+        stop = min(start + BULK_CHUNK, n)
+        repository.create_many(
+            [f"S{i:08d}" for i in range(start, stop)],
+            [f"Student {i}" for i in range(start, stop)],
+            [inputs[i % len(inputs)] for i in range(start, stop)],
+            [predictions[i % len(predictions)] for i in range(start, stop)],
+            "bench",
+        )
+    gc.collect()
+    memory = rss_bytes() - before
+
+    top_page = repository.list_page(
+        50, "performance_index_predicted", descending=True, risk_level="HIGH"
+    )
+    results[backend] = {
+        "bytes_per_student": memory / n,
+        "stats_ms": best_ms(lambda: stats(repository)),
+        "filter_count_ms": best_ms(lambda: filter_count(repository)),
+        "top_page_ms": best_ms(
+            lambda: repository.list_page(
+                50, "performance_index_predicted", descending=True, risk_level="HIGH"
+            )
+        ),
+        "cursor_page_ms": best_ms(
+            lambda: repository.list_page(
+                50,
+                "performance_index_predicted",
+                descending=True,
+                cursor=top_page[-1][0],
+                low_performance_predicted=1,
+            )
+        ),
+        "snapshot": stats(repository).snapshot(),
+    }
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    context = multiprocessing.get_context("spawn")
+    results = context.Manager().dict()
+    for backend in ("memory", "columnar"):
+        process = context.Process(target=run, args=(backend, n, results))
+        process.start()
+        process.join()
+
+    memory, columnar = results["memory"], results["columnar"]
+    assert memory.pop("snapshot") == columnar.pop("snapshot")
+
+    print(f"{n:,} students, best of {ROUNDS}")
+    print(f"{'':<24} {'memory':>10} {'columnar':>10} {'ratio':>8}")
+    labels = {
+        "bytes_per_student": "bytes/student",
+        "stats_ms": "stats recompute ms",
+        "filter_count_ms": "filter count ms",
+        "top_page_ms": "filtered top-50 ms",
+        "cursor_page_ms": "filtered cursor page ms",
+    }
+    for key, label in labels.items():
+        print(
+            f"{label:<24} {memory[key]:>10.1f} {columnar[key]:>10.1f} "
+            f"{memory[key] / columnar[key]:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: streaming student export
+
+Measures rows/sec of StudentService.export_students for NDJSON and CSV, and
+compares it with building the full list of StudentResponse objects.
+
+Usage (from case2/):
+    python -m benchmarks.bench_export [n_students]
+"""
+
+import asyncio
+import sys
+import time
+
+from app.models.schemas import PredictionResponse
+from app.repositories.student_repository import StudentRepository
+from app.services.student_service import StudentService
+from benchmarks.bench_batch_prediction import random_students
+
+
+async def consume(stream) -> int:
+    size = 0
+    async for chunk in stream:
+        size += len(chunk)
+    return size
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    inputs = random_students(1_000)
+    prediction = PredictionResponse(
+        performance_index_predicted=55.5,
+        low_performance_predicted=0,
+        low_performance_probability=0.12,
+        risk_level="LOW",
+    )
+
+    repository = StudentRepository()
+    repository.create_many(
+        [f"S{i:08d}" for i in range(n)],
+        [f"Student {i}" for i in range(n)],
+        [inputs[i % len(inputs)] for i in range(n)],
+        [prediction] * n,
+    )
+    service = StudentService(repository, prediction_service=None, rescore_on_read=False)
+
+    print(f"{n:,} students")
+    for export_format in ["ndjson", "csv"]:
+        start = time.perf_counter()
+        size = asyncio.run(consume(service.export_students(export_format)))
+        elapsed = time.perf_counter() - start
+        print(
+            f"{export_format:>8}: {n / elapsed:>12,.0f} rows/s "
+            f"({size / 1e6:.1f} MB in {elapsed:.2f}s)"
+        )
+
+    start = time.perf_counter()
+    [service._dict_to_response(s).model_dump_json() for s in repository.get_all()]
+    elapsed = time.perf_counter() - start
+    print(f"{'list':>8}: {n / elapsed:>12,.0f} rows/s (StudentResponse per row)")
+
+
+if __name__ == "__main__":
+    main()
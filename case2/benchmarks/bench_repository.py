@@ -0,0 +1,95 @@
+"""
+Benchmark: student repository backends
+
+Compares create/get/list throughput of the in-memory dict backend and the
+SQLite backend.
+
+Usage (from case2/):
+    python -m benchmarks.bench_repository [n_students]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from app.models.schemas import PredictionResponse
+from app.repositories.sqlite_student_repository import SQLiteStudentRepository
+from app.repositories.student_repository import StudentRepository
+from benchmarks.bench_batch_prediction import random_students
+
+SINGLE_CREATES = 20_000
+GETS = 100_000
+BULK_CHUNK = 50_000
+
+
+def ops_per_second(fn, n: int) -> float:
+    start = time.perf_counter()
+    fn()
+    return n / (time.perf_counter() - start)
+
+
+def bench(name: str, repository, n: int, inputs, prediction):
+    ids = [f"S{i:08d}" for i in range(n)]
+    names = [f"Student {i}" for i in range(n)]
+
+    single = ops_per_second(
+        lambda: [
+            repository.create(ids[i], names[i], inputs[i % len(inputs)], prediction)
+            for i in range(SINGLE_CREATES)
+        ],
+        SINGLE_CREATES,
+    )
+
+    def bulk():
+        for start in range(SINGLE_CREATES, n, BULK_CHUNK):
+            stop = min(start + BULK_CHUNK, n)
+            repository.create_many(
+                ids[start:stop],
+                names[start:stop],
+                [inputs[i % len(inputs)] for i in range(start, stop)],
+                [prediction] * (stop - start),
+            )
+
+    bulk_rate = ops_per_second(bulk, n - SINGLE_CREATES)
+
+    rng = random.Random(0)
+    sample = [ids[rng.randrange(n)] for _ in range(GETS)]
+    get_rate = ops_per_second(
+        lambda: [repository.get_by_id(sid) for sid in sample], GETS
+    )
+
+    list_rate = ops_per_second(repository.get_all, n)
+
+    print(
+        f"{name:>8} {single:>14,.0f} {bulk_rate:>14,.0f} {get_rate:>12,.0f} "
+        f"{list_rate:>14,.0f}"
+    )
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    inputs = random_students(1_000)
+    prediction = PredictionResponse(
+        performance_index_predicted=55.5,
+        low_performance_predicted=0,
+        low_performance_probability=0.12,
+        risk_level="LOW",
+    )
+
+    print(f"{n:,} students")
+    print(
+        f"{'backend':>8} {'create ops/s':>14} {'bulk rows/s':>14} {'get ops/s':>12} "
+        f"{'list rows/s':>14}"
+    )
+    bench("memory", StudentRepository(), n, inputs, prediction)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repository = SQLiteStudentRepository(os.path.join(tmp, "students.db"))
+        bench("sqlite", repository, n, inputs, prediction)
+        repository.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark: response serialization of 10k-item payloads
+
+Compares the default path (pydantic models validated and dumped as FastAPI
+does for a response_model) against FAST_SERIALIZATION, which encodes the
+output arrays and the stored student dicts directly. Both produce the same
+JSON. Times are in-process, without the HTTP layer.
+
+Usage (from case2/):
+    python -m benchmarks.bench_serialization
+"""
+
+import asyncio
+import json
+import time
+import warnings
+
+from pydantic import TypeAdapter
+
+from app.config import get_settings
+from app.models.schemas import (
+    PredictionResponse,
+    StudentCreate,
+    StudentPage,
+    StudentResponse,
+)
+from app.repositories.student_repository import StudentRepository
+from app.services.model_loader import ModelLoader
+from app.services.prediction_service import PredictionService
+from app.services.student_service import StudentService
+from benchmarks.bench_batch_prediction import random_students
+
+ITEMS = 10_000
+ROUNDS = 5
+
+
+def best_ms(fn) -> float:
+    fn()
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def report(label: str, default_fn, fast_fn):
+    assert json.loads(default_fn()) == json.loads(fast_fn()), label
+    default_ms = best_ms(default_fn)
+    fast_ms = best_ms(fast_fn)
+    print(
+        f"{label:<28} {default_ms:>10.1f} {fast_ms:>10.1f} "
+        f"{default_ms / fast_ms:>7.1f}x"
+    )
+
+
+def main():
+    warnings.filterwarnings("ignore")
+    settings = get_settings()
+    model_loader = ModelLoader()
+    model_loader.load_models(
+        models_path=settings.MODELS_PATH,
+        classification_name=settings.CLASSIFICATION_MODEL,
+        regression_name=settings.REGRESSION_MODEL,
+        scaler_name=settings.SCALER_MODEL,
+        compact_name=settings.MODEL_BUNDLE,
+    )
+    prediction_service = PredictionService(model_loader)
+    students = random_students(ITEMS)
+
+    repository = StudentRepository()
+    default_service = StudentService(repository, prediction_service)
+    fast_service = StudentService(
+        repository, prediction_service, fast_serialization=True
+    )
+    version = prediction_service.get_model_version()
+    for i, (student, prediction) in enumerate(
+        zip(students, prediction_service.predict_many(students))
+    ):
+        default_service.create_student(
+            StudentCreate(student_id=f"S{i:05d}", name="Bench", input_data=student),
+            prediction,
+            version,
+        )
+
+    predictions_adapter = TypeAdapter(list[PredictionResponse])
+    page_adapter = TypeAdapter(StudentPage)
+    student_adapter = TypeAdapter(StudentResponse)
+    student_ids = [f"S{i:05d}" for i in range(ITEMS)]
+
+    print(f"{ITEMS:,} items, best of {ROUNDS}")
+    print(f"{'':<28} {'default ms':>10} {'fast ms':>10} {'speedup':>8}")
+    report(
+        "POST /predictions/batch",
+        lambda: predictions_adapter.dump_json(
+            predictions_adapter.validate_python(
+                prediction_service.predict_many(students)
+            )
+        ),
+        lambda: prediction_service.predict_many_json(students),
+    )
+    report(
+        "GET /students/ (page)",
+        lambda: page_adapter.dump_json(
+            page_adapter.validate_python(
+                asyncio.run(default_service.list_students(limit=ITEMS))
+            )
+        ),
+        lambda: asyncio.run(fast_service.list_students_json(limit=ITEMS)),
+    )
+    report(
+        "GET /students/ (fields)",
+        lambda: page_adapter.dump_json(
+            page_adapter.validate_python(
+                asyncio.run(
+                    default_service.list_students(
+                        limit=ITEMS, fields={"student_id", "prediction"}
+                    )
+                )
+            )
+        ),
+        lambda: asyncio.run(
+            fast_service.list_students_json(
+                limit=ITEMS, fields={"student_id", "prediction"}
+            )
+        ),
+    )
+
+    async def get_students(get_student) -> list:
+        return [await get_student(student_id) for student_id in student_ids]
+
+    report(
+        "GET /students/{id} x 10k",
+        lambda: b"["
+        + b",".join(
+            student_adapter.dump_json(student_adapter.validate_python(student))
+            for student in asyncio.run(get_students(default_service.get_student))
+        )
+        + b"]",
+        lambda: b"["
+        + b",".join(asyncio.run(get_students(fast_service.get_student_json)))
+        + b"]",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark: QPS scaling with the number of API worker processes
+
+Starts the API (python -m app.main) with 1/2/4/8 workers on a shared SQLite
+repository and drives it with several client processes over keep-alive
+connections. Each client alternates a single prediction, a student creation
+and a read of the student just created (possibly served by another worker).
+Speedups are bounded by the number of CPUs.
+
+Usage (from case2/):
+    python -m benchmarks.bench_workers [seconds] [clients]
+"""
+
+import http.client
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from benchmarks.bench_cold_start import TIMEOUT_SECONDS, free_port
+
+WORKER_COUNTS = [1, 2, 4, 8]
+
+STUDENT_INPUT = {
+    "hours_studied": 7.0,
+    "previous_scores": 85.0,
+    "extracurricular_activities": 1,
+    "sleep_hours": 7.5,
+    "sample_questions_practiced": 5,
+}
+HEADERS = {"Content-Type": "application/json"}
+
+
+def wait_healthy(port: int):
+    start = time.perf_counter()
+    while time.perf_counter() - start < TIMEOUT_SECONDS:
+        try:
+            with urllib.request.urlopen(
+                f"http://127.0.0.1:{port}/health", timeout=1
+            ) as response:
+                if json.load(response)["status"] == "healthy":
+                    return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError("API did not become healthy")
+
+
+def client(args) -> tuple[int, int]:
+    port, client_id, seconds = args
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    requests = errors = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        student_id = f"C{client_id}-{requests}"
+        for method, path, body in (
+            ("POST", "/api/v1/predictions/", STUDENT_INPUT),
+            (
+                "POST",
+                "/api/v1/students/",
+                {
+                    "student_id": student_id,
+                    "name": "Bench",
+                    "input_data": STUDENT_INPUT,
+                },
+            ),
+            ("GET", f"/api/v1/students/{student_id}", None),
+        ):
+            conn.request(
+                method,
+                path,
+                body=json.dumps(body) if body is not None else None,
+                headers=HEADERS,
+            )
+            response = conn.getresponse()
+            response.read()
+            requests += 1
+            errors += response.status >= 400
+    conn.close()
+    return requests, errors
+
+
+def bench(workers: int, seconds: float, clients: int) -> tuple[float, int]:
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "WORKERS": str(workers),
+            "REPOSITORY_BACKEND": "sqlite",
+            "SQLITE_PATH": os.path.join(tmp, "students.db"),
+            "PREDICTION_EXECUTOR": "inline",
+            "PORT": str(port),
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "app.main"],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_healthy(port)
+            # Lets every worker finish its startup before measuring
+            time.sleep(1)
+            with multiprocessing.Pool(clients) as pool:
+                results = pool.map(client, [(port, i, seconds) for i in range(clients)])
+        finally:
+            server.terminate()
+            server.wait()
+
+    requests = sum(r for r, _ in results)
+    errors = sum(e for _, e in results)
+    return requests / seconds, errors
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    print(f"{os.cpu_count()} CPUs, {clients} clients, {seconds:g}s per run")
+    print(f"{'workers':>8} {'req/s':>10} {'speedup':>8} {'errors':>7}")
+    baseline = None
+    for workers in WORKER_COUNTS:
+        qps, errors = bench(workers, seconds, clients)
+        baseline = baseline or qps
+        print(f"{workers:>8} {qps:>10,.0f} {qps / baseline:>7.2f}x {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -73,7 +73,82 @@ def test_list_students():
     response = requests.get(f"{BASE_URL}/api/v1/students/")
 
     print(f"Status: {response.status_code}")
-    print(f"Total students: {len(response.json())}")
+    print(f"Students in page: {len(response.json()['items'])}")
+    assert response.status_code == 200
+
+
+def test_list_students_paginated():
+    print("TEST 5b: List Students (filtered, sorted and paginated)")
+
+    params = {
+        "limit": 1,
+        "sort_by": "performance_index_predicted",
+        "order": "desc",
+        "low_performance_predicted": 0,
+        "fields": "student_id,prediction",
+    }
+    response = requests.get(f"{BASE_URL}/api/v1/students/", params=params)
+
+    print(f"Status: {response.status_code}")
+    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    assert response.status_code == 200
+
+    next_cursor = response.json()["next_cursor"]
+    if next_cursor:
+        response = requests.get(
+            f"{BASE_URL}/api/v1/students/", params={**params, "cursor": next_cursor}
+        )
+        print(f"Next page status: {response.status_code}")
+        assert response.status_code == 200
+
+
+def test_export_students():
+    print("TEST 5c: Export Students")
+
+    for export_format in ["ndjson", "csv"]:
+        response = requests.get(
+            f"{BASE_URL}/api/v1/students/export", params={"format": export_format}
+        )
+
+        print(f"Status ({export_format}): {response.status_code}")
+        print(f"Lines: {len(response.text.splitlines())}")
+        assert response.status_code == 200
+
+
+def test_bulk_import(student_id):
+    print("TEST 5d: Bulk Import Students")
+
+    input_data = {
+        "hours_studied": 6.0,
+        "previous_scores": 75.0,
+        "extracurricular_activities": 0,
+        "sleep_hours": 7.0,
+        "sample_questions_practiced": 4,
+    }
+    rows = [
+        {"student_id": "BULK001", "name": "Bulk One", "input_data": input_data},
+        {"student_id": "BULK001", "name": "Bulk Repeated", "input_data": input_data},
+        {"student_id": student_id, "name": "Existing", "input_data": input_data},
+    ]
+
+    response = requests.post(f"{BASE_URL}/api/v1/students/bulk", json=rows)
+
+    print(f"Status (json): {response.status_code}")
+    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == len(rows)
+
+    csv_upload = (
+        "student_id,name," + ",".join(input_data) + "\n"
+        "BULK002,Bulk Two," + ",".join(str(v) for v in input_data.values()) + "\n"
+    )
+    response = requests.post(
+        f"{BASE_URL}/api/v1/students/bulk",
+        files={"file": ("students.csv", csv_upload, "text/csv")},
+    )
+
+    print(f"Status (csv): {response.status_code}")
+    print(f"Created: {response.json()['created']}")
     assert response.status_code == 200
 
 
@@ -109,6 +184,25 @@ def test_statistics():
     assert response.status_code == 200
 
 
+def test_statistics_detailed():
+    print("TEST 7b: Detailed Statistics and Consistency")
+
+    response = requests.get(
+        f"{BASE_URL}/api/v1/students/stats/summary", params={"detailed": True}
+    )
+
+    print(f"Status: {response.status_code}")
+    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    assert response.status_code == 200
+
+    response = requests.get(f"{BASE_URL}/api/v1/students/stats/consistency")
+
+    print(f"Status: {response.status_code}")
+    print(f"Consistent: {response.json()['consistent']}")
+    assert response.status_code == 200
+    assert response.json()["consistent"]
+
+
 def test_delete_student(student_id):
     print("TEST 8: Delete Student")
 
@@ -150,6 +244,96 @@ def test_batch_prediction():
     assert response.status_code == 200
 
 
+def test_cache_stats():
+    print("TEST 10: Prediction Cache Stats")
+
+    response = requests.get(f"{BASE_URL}/api/v1/predictions/cache/stats")
+
+    print(f"Status: {response.status_code}")
+    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    assert response.status_code == 200
+
+
+def test_table_stats():
+    print("TEST 11: Prediction Table Stats")
+
+    response = requests.get(f"{BASE_URL}/api/v1/predictions/table/stats")
+
+    print(f"Status: {response.status_code}")
+    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    assert response.status_code == 200
+
+
+def test_executor_stats():
+    print("TEST 12: Prediction Executor Stats")
+
+    response = requests.get(f"{BASE_URL}/api/v1/predictions/executor/stats")
+
+    print(f"Status: {response.status_code}")
+    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    assert response.status_code == 200
+
+
+def test_batcher_stats():
+    print("TEST 13: Prediction Batcher Stats")
+
+    response = requests.get(f"{BASE_URL}/api/v1/predictions/batcher/stats")
+
+    print(f"Status: {response.status_code}")
+    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    assert response.status_code == 200
+
+
+def test_rescore():
+    print("TEST 14: Re-score Stored Predictions")
+
+    response = requests.post(f"{BASE_URL}/api/v1/admin/rescore")
+    print(f"Status (start): {response.status_code}")
+    assert response.status_code in (202, 409)
+
+    response = requests.get(f"{BASE_URL}/api/v1/admin/rescore")
+
+    print(f"Status (progress): {response.status_code}")
+    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    assert response.status_code == 200
+
+
+def test_model_reload():
+    print("TEST 15: Hot Model Reload")
+
+    response = requests.post(f"{BASE_URL}/api/v1/admin/models/reload")
+    print(f"Status (start): {response.status_code}")
+    assert response.status_code in (202, 409)
+
+    response = requests.get(f"{BASE_URL}/api/v1/admin/models/reload")
+
+    print(f"Status (progress): {response.status_code}")
+    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    assert response.status_code == 200
+
+
+def test_metrics():
+    print("TEST 16: Prometheus Metrics")
+
+    response = requests.get(f"{BASE_URL}/metrics")
+    print(f"Status: {response.status_code}")
+    print("\n".join(line for line in response.text.splitlines()[:10]))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/api/v1/predictions/"' in response.text
+    assert "app_stage_duration_seconds_bucket" in response.text
+
+
+def test_profiling():
+    print("TEST 17: On-demand Profiling")
+
+    response = requests.get(f"{BASE_URL}/api/v1/admin/profiling")
+    print(f"Status: {response.status_code}")
+    print(f"Response: {json.dumps(response.json(), indent=2)}")
+    # 404 unless the API runs with PROFILING_ENABLED=true
+    assert response.status_code in (200, 404)
+
+
 def run_all_tests():
     try:
         test_health()
@@ -157,10 +341,22 @@ def run_all_tests():
         student_id = test_create_student()
         test_get_student(student_id)
         test_list_students()
+        test_list_students_paginated()
+        test_export_students()
+        test_bulk_import(student_id)
         test_update_student(student_id)
         test_statistics()
+        test_statistics_detailed()
         test_batch_prediction()
         test_delete_student(student_id)
+        test_cache_stats()
+        test_table_stats()
+        test_executor_stats()
+        test_batcher_stats()
+        test_rescore()
+        test_model_reload()
+        test_metrics()
+        test_profiling()
 
         print("All tests passed successfully!")
     except AssertionError as e:
@@ -0,0 +1,96 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from app.main import app
+from fastapi.testclient import TestClient
+from test_prediction_service import random_students
+
+N_STUDENTS = 25
+
+READS = [
+    "/api/v1/students/S000",
+    "/api/v1/students/S017",
+    "/api/v1/students/?limit=1000",
+    "/api/v1/students/?limit=10&order=desc",
+    "/api/v1/students/?limit=10&sort_by=performance_index_predicted&order=desc",
+    "/api/v1/students/?limit=1000&risk_level=High",
+    "/api/v1/students/?limit=1000&low_performance_predicted=0",
+    "/api/v1/students/?limit=5&fields=student_id,prediction",
+    "/api/v1/students/?limit=5&fields=name,model_version,updated_at",
+]
+
+
+@pytest.fixture(scope="module")
+def client():
+    # The app loads ./models
+    cwd = os.getcwd()
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    try:
+        with TestClient(app) as client:
+            for i, student in enumerate(random_students(N_STUDENTS, seed=11)):
+                response = client.post(
+                    "/api/v1/students/",
+                    json={
+                        "student_id": f"S{i:03d}",
+                        "name": f'Student {i} é"\\',
+                        "input_data": student.model_dump(),
+                    },
+                )
+                assert response.status_code == 201
+            yield client
+    finally:
+        os.chdir(cwd)
+
+
+def get_both(client: TestClient, method: str, path: str, **kwargs):
+    """Responses of a request with FAST_SERIALIZATION on and off"""
+    container = client.app.state.container
+    responses = []
+    for fast in (True, False):
+        container.settings.FAST_SERIALIZATION = fast
+        container.student_service.fast_serialization = fast
+        responses.append(client.request(method, path, **kwargs))
+    container.settings.FAST_SERIALIZATION = True
+    container.student_service.fast_serialization = True
+    return responses
+
+
+def test_reads_are_byte_identical(client):
+    for path in READS:
+        fast, slow = get_both(client, "GET", path)
+        assert fast.status_code == slow.status_code == 200, path
+        assert fast.headers["content-type"] == slow.headers["content-type"]
+        assert fast.content == slow.content, path
+
+
+def test_pages_follow_the_same_cursors(client):
+    path = "/api/v1/students/?limit=7&sort_by=performance_index_predicted"
+    pages = 0
+    while path is not None:
+        fast, slow = get_both(client, "GET", path)
+        assert fast.content == slow.content
+        cursor = fast.json()["next_cursor"]
+        path = cursor and (
+            "/api/v1/students/?limit=7&sort_by=performance_index_predicted"
+            f"&cursor={cursor}"
+        )
+        pages += 1
+    assert pages == 4
+
+
+def test_batch_predictions_are_byte_identical(client):
+    students = [s.model_dump() for s in random_students(200, seed=12)]
+    fast, slow = get_both(client, "POST", "/api/v1/predictions/batch", json=students)
+    assert fast.status_code == slow.status_code == 200
+    assert len(fast.json()) == 200
+    assert fast.content == slow.content
+
+    fast, slow = get_both(client, "POST", "/api/v1/predictions/batch", json=[])
+    assert fast.content == slow.content == b"[]"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,57 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.services.linear_fast_path import LinearFastPath
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+
+def fitted_models(with_mean: bool, with_std: bool, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    features = rng.normal(
+        loc=[5, 70, 0.5, 7, 10], scale=[2, 15, 0.5, 1, 5], size=(500, 5)
+    )
+    target = features @ np.array([2.0, 1.0, 0.5, 0.3, 0.2]) + rng.normal(size=500)
+    labels = (target < np.median(target)).astype(int)
+
+    scaler = StandardScaler(with_mean=with_mean, with_std=with_std).fit(features)
+    scaled = scaler.transform(features)
+    regression = LinearRegression().fit(scaled, target)
+    classification = LogisticRegression().fit(scaled, labels)
+    return scaler, regression, classification, features
+
+
+def test_fast_path_matches_sklearn():
+    for with_mean in (True, False):
+        for with_std in (True, False):
+            scaler, regression, classification, features = fitted_models(
+                with_mean, with_std
+            )
+            fast_path = LinearFastPath.from_models(scaler, regression, classification)
+            assert fast_path is not None
+
+            scaled = scaler.transform(features)
+            expected = (
+                regression.predict(scaled),
+                classification.predict(scaled),
+                classification.predict_proba(scaled)[:, 1],
+            )
+
+            performance, predicted, probability = fast_path.score(features)
+            np.testing.assert_allclose(performance, expected[0], rtol=1e-9, atol=1e-9)
+            np.testing.assert_array_equal(predicted, expected[1])
+            np.testing.assert_allclose(probability, expected[2], rtol=1e-9, atol=1e-12)
+
+            for i in range(0, len(features), 50):
+                one = fast_path.score_one(features[i])
+                assert abs(one[0] - expected[0][i]) < 1e-9
+                assert one[1] == expected[1][i]
+                assert abs(one[2] - expected[2][i]) < 1e-12
+
+
+if __name__ == "__main__":
+    test_fast_path_matches_sklearn()
+    print("All linear fast path tests passed")
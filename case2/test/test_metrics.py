@@ -0,0 +1,136 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import metrics
+from app.metrics import MetricsMiddleware, MetricsRegistry, stage_timer
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+
+def samples(text: str) -> dict:
+    """Parses the sample lines of an exposition text into {series: value}"""
+    values = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            series, value = line.rsplit(" ", 1)
+            values[series] = float(value)
+    return values
+
+
+def test_render_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("route", "status"))
+    in_flight = registry.gauge("in_flight", "In flight")
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), (0.1, 1))
+
+    requests.inc("/a", "200")
+    requests.inc("/a", "200", amount=2)
+    requests.inc('/b"\\\n', "500")
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, "/a")
+
+    text = registry.render()
+
+    assert text.endswith("\n")
+    assert text.splitlines()[:2] == [
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+    ]
+    assert "# TYPE in_flight gauge" in text
+    assert "# TYPE latency_seconds histogram" in text
+    assert samples(text) == {
+        'requests_total{route="/a",status="200"}': 3,
+        'requests_total{route="/b\\"\\\\\\n",status="500"}': 1,
+        "in_flight": 1,
+        'latency_seconds_bucket{route="/a",le="0.1"}': 2,
+        'latency_seconds_bucket{route="/a",le="1"}': 3,
+        'latency_seconds_bucket{route="/a",le="+Inf"}': 4,
+        'latency_seconds_sum{route="/a"}': 3.65,
+        'latency_seconds_count{route="/a"}': 4,
+    }
+
+
+def test_collectors_run_before_render():
+    registry = MetricsRegistry()
+    gauge = registry.gauge("component_items", "Items", ("component",))
+    items = {"cache": 0}
+
+    def collect():
+        gauge.set(items["cache"], "cache")
+
+    registry.add_collector(collect)
+    items["cache"] = 7
+    assert samples(registry.render()) == {'component_items{component="cache"}': 7}
+
+    registry.remove_collector(collect)
+    items["cache"] = 9
+    assert samples(registry.render()) == {'component_items{component="cache"}': 7}
+
+
+def stage_count(stage: str) -> float:
+    return samples("\n".join(metrics.STAGE_DURATION.render())).get(
+        f'app_stage_duration_seconds_count{{stage="{stage}"}}', 0
+    )
+
+
+def test_stage_timer_observes_only_when_enabled():
+    before = stage_count("test.stage")
+    with stage_timer("test.stage"):
+        pass
+    assert stage_count("test.stage") == before + 1
+
+    metrics.REGISTRY.enabled = False
+    try:
+        with stage_timer("test.stage"):
+            pass
+    finally:
+        metrics.REGISTRY.enabled = True
+    assert stage_count("test.stage") == before + 1
+
+
+def test_middleware_counts_requests_by_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return PlainTextResponse(item_id * 10)
+
+    @app.get("/metrics")
+    async def scrape():
+        return PlainTextResponse(metrics.REGISTRY.render())
+
+    before = samples(metrics.REGISTRY.render())
+    client = TestClient(app)
+    for item_id in ("a", "b", "c"):
+        assert client.get(f"/items/{item_id}").status_code == 200
+    assert client.get("/missing").status_code == 404
+    after = samples(client.get("/metrics").text)
+
+    def delta(series: str) -> float:
+        return after.get(series, 0) - before.get(series, 0)
+
+    route = 'method="GET",route="/items/{item_id}"'
+    assert delta(f'http_requests_total{{{route},status="200"}}') == 3
+    assert delta(f"http_request_duration_seconds_count{{{route}}}") == 3
+    assert delta(f"http_response_size_bytes_sum{{{route}}}") == 30
+    assert delta(f"http_request_size_bytes_sum{{{route}}}") == 0
+    assert (
+        delta('http_requests_total{method="GET",route="unmatched",status="404"}') == 1
+    )
+    assert not any("/metrics" in series for series in after)
+    assert after["http_requests_in_flight"] == 0
+
+
+if __name__ == "__main__":
+    test_render_text_format()
+    test_collectors_run_before_render()
+    test_stage_timer_observes_only_when_enabled()
+    test_middleware_counts_requests_by_route_template()
+    print("All metrics tests passed")
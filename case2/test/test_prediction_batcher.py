@@ -0,0 +1,168 @@
+import asyncio
+import functools
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Settings
+from app.models.schemas import StudentInput
+from app.services.prediction_batcher import PredictionBatcher
+from app.services.prediction_cache import PredictionCache
+from app.services.prediction_executor import PredictionExecutor
+from app.services.prediction_service import PredictionService
+from app.services.prediction_table import FIELDS, PredictionTable
+from test_prediction_service import load_models, random_students
+
+
+def make_batcher(service: PredictionService) -> PredictionBatcher:
+    executor = PredictionExecutor(
+        service, Settings(PREDICTION_EXECUTOR="thread", PREDICTION_WORKERS=2)
+    )
+    return PredictionBatcher(executor, service, max_wait_ms=20, max_batch_size=64)
+
+
+async def predict_concurrently(batcher: PredictionBatcher, students: list) -> list:
+    return await asyncio.gather(*(batcher.predict(s) for s in students))
+
+
+def test_concurrent_requests_are_coalesced():
+    loader, _ = load_models()
+    students = random_students(200, seed=3)
+    expected = [PredictionService(loader).predict(s) for s in students]
+
+    cache = PredictionCache(max_entries=1000, ttl_seconds=0)
+    batcher = make_batcher(PredictionService(loader, cache))
+    try:
+        predictions = asyncio.run(predict_concurrently(batcher, students))
+        assert predictions == expected
+        assert batcher.items == len(students)
+        assert batcher.batches <= len(students) // 64 + 1
+        assert batcher.hits == 0
+        assert cache.stats()["size"] == len(students)
+
+        # Repeated inputs are answered by the cache without a new batch
+        predictions = asyncio.run(predict_concurrently(batcher, students))
+        assert predictions == expected
+        assert batcher.hits == len(students)
+        assert batcher.items == len(students)
+    finally:
+        batcher.executor.shutdown()
+
+
+def test_table_hits_skip_the_batch():
+    loader, bundle = load_models()
+    service = PredictionService(loader)
+    table = PredictionTable.build(
+        score_fn=functools.partial(service.score_features, bundle=bundle),
+        model_version=bundle.version,
+        float_step=12.0,
+        max_cells=10_000,
+    )
+    on_grid = [
+        StudentInput(
+            hours_studied=12.0,
+            previous_scores=float(score),
+            extracurricular_activities=score % 2,
+            sleep_hours=0.0,
+            sample_questions_practiced=score % 21,
+        )
+        for score in range(0, 100, 12)
+    ]
+    off_grid = random_students(50, seed=4)
+    expected = [service.predict(s) for s in on_grid + off_grid]
+
+    batcher = make_batcher(PredictionService(loader, table=table))
+    try:
+        predictions = asyncio.run(predict_concurrently(batcher, on_grid + off_grid))
+        assert predictions == expected
+        assert batcher.hits == len(on_grid)
+        assert batcher.items == len(off_grid)
+    finally:
+        batcher.executor.shutdown()
+
+
+def test_interpolation_agrees_with_the_grid():
+    loader, bundle = load_models()
+    service = PredictionService(loader)
+    table = PredictionTable.build(
+        score_fn=functools.partial(service.score_features, bundle=bundle),
+        model_version=bundle.version,
+        float_step=4.0,
+        max_cells=100_000,
+        off_grid="interpolate",
+    )
+
+    # On a cell boundary the interpolation weighs a single cell, including
+    # the last grid point of each field
+    for hours, scores, sleep in [(0, 0, 0), (12, 48, 8), (24, 100, 24)]:
+        for questions in (0, 7, 20):
+            student = StudentInput(
+                hours_studied=hours,
+                previous_scores=scores,
+                extracurricular_activities=questions % 2,
+                sleep_hours=sleep,
+                sample_questions_practiced=questions,
+            )
+            positions = [
+                (getattr(student, field) - lower) / step
+                for field, lower, step in zip(FIELDS, table.lowers, table.steps)
+            ]
+            exact = table.lookup(student, bundle.version)
+            assert exact == service.predict(student)
+            assert table._interpolate(positions, list(range(len(FIELDS)))) == exact
+
+    # Off the grid the class is never guessed from the probability
+    for student in random_students(300, seed=6):
+        interpolated = table.lookup(student, bundle.version)
+        if interpolated is not None:
+            assert (
+                interpolated.low_performance_predicted
+                == service.predict(student).low_performance_predicted
+            )
+    assert table.interpolations > 0
+    assert table.interpolations + table.fallbacks == 300
+
+
+def test_cancelled_request_keeps_its_queue_slot():
+    loader, _ = load_models()
+    service = PredictionService(loader)
+    executor = PredictionExecutor(
+        service, Settings(PREDICTION_EXECUTOR="thread", PREDICTION_WORKERS=1)
+    )
+    release = threading.Event()
+
+    def blocked_predict(student):
+        release.wait(timeout=10)
+        return service.predict(student)
+
+    executor._predict = blocked_predict
+    (student,) = random_students(1, seed=5)
+
+    async def cancel_while_running():
+        task = asyncio.ensure_future(executor.predict(student))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.sleep(0.05)
+        # The job is still running in the pool and still holds its slot
+        assert task.cancelled()
+        assert executor.queue_depth == 1
+        release.set()
+
+    try:
+        asyncio.run(cancel_while_running())
+        executor._pool.shutdown(wait=True)
+        assert executor.queue_depth == 0
+        assert executor.completed == 1
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    test_concurrent_requests_are_coalesced()
+    test_table_hits_skip_the_batch()
+    test_interpolation_agrees_with_the_grid()
+    test_cancelled_request_keeps_its_queue_slot()
+    print("All prediction batcher tests passed")
@@ -0,0 +1,76 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.config import get_settings
+from app.models.schemas import StudentInput
+from app.services.linear_fast_path import LinearFastPath
+from app.services.model_loader import ModelBundle, ModelLoader
+from app.services.prediction_service import PredictionService
+
+
+def load_models(enable_fast_path: bool = True):
+    settings = get_settings()
+    loader = ModelLoader()
+    bundle = loader.build_bundle(
+        settings.MODELS_PATH,
+        settings.CLASSIFICATION_MODEL,
+        settings.REGRESSION_MODEL,
+        settings.SCALER_MODEL,
+        enable_fast_path=enable_fast_path,
+    )
+    loader.swap(bundle)
+    return loader, bundle
+
+
+def random_students(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [
+        StudentInput(
+            hours_studied=rng.uniform(0, 24),
+            previous_scores=rng.uniform(0, 100),
+            extracurricular_activities=rng.randint(0, 1),
+            sleep_hours=rng.uniform(0, 24),
+            sample_questions_practiced=rng.randint(0, 20),
+        )
+        for _ in range(n)
+    ]
+
+
+def test_predict_matches_predict_many():
+    for enable_fast_path in (True, False):
+        loader, bundle = load_models(enable_fast_path)
+        assert (bundle.fast_path is not None) == enable_fast_path
+        service = PredictionService(loader)
+        students = random_students(500, seed=int(enable_fast_path))
+
+        batch = service.predict_many(students)
+        single = [service.predict(student) for student in students]
+        with_bundle = [service.predict_with(bundle, student) for student in students]
+
+        assert single == batch
+        assert with_bundle == batch
+        assert [p.model_dump() for p in single] == [p.model_dump() for p in batch]
+
+
+def test_single_and_batch_round_alike():
+    # Ties where np.round (scale, rint, unscale) and round() disagree
+    loader = ModelLoader()
+    service = PredictionService(loader)
+    student = random_students(1)[0]
+    for performance in (90.975, 66.815, 37.865):
+        fast_path = LinearFastPath(
+            np.zeros((5, 2)), np.array([performance, 0.0]), np.array([0, 1])
+        )
+        loader.swap(ModelBundle(None, None, None, fast_path, "constant"))
+
+        assert service.predict(student) == service.predict_many([student])[0]
+
+
+if __name__ == "__main__":
+    test_predict_matches_predict_many()
+    test_single_and_batch_round_alike()
+    print("All prediction service tests passed")
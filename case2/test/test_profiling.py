@@ -0,0 +1,133 @@
+import asyncio
+import marshal
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from app.config import Settings
+from app.profiling import Profiler, ProfilingMiddleware
+from app.routers.admin import _check_profiling_enabled
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+FORCED = {"X-Profile": "1"}
+ROUTE = "/work/{size}"
+
+
+def busy_loop(seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    iterations = 0
+    while time.perf_counter() < deadline:
+        iterations += 1
+    return iterations
+
+
+def make_client(profiler: Profiler) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+    @app.get("/work/{size}")
+    async def work(size: int):
+        busy_loop(size / 1000)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, profiler.bind(busy_loop), size / 1000)
+        return {"size": size}
+
+    return TestClient(app)
+
+
+def test_disabled_profiling_endpoints_are_not_found():
+    with pytest.raises(HTTPException) as error:
+        _check_profiling_enabled(SimpleNamespace(settings=Settings()))
+    assert error.value.status_code == 404
+    _check_profiling_enabled(SimpleNamespace(settings=Settings(PROFILING_ENABLED=True)))
+
+
+def test_requests_pass_through_without_a_session():
+    profiler = Profiler()
+    client = make_client(profiler)
+
+    assert client.get("/work/1", headers=FORCED).json() == {"size": 1}
+    assert profiler.status() == {"active": False, "mode": None, "routes": {}}
+    with pytest.raises(LookupError):
+        profiler.export("text")
+
+
+def test_start_rejects_invalid_settings():
+    profiler = Profiler()
+    with pytest.raises(ValueError):
+        profiler.start("tracing", 0.5)
+    with pytest.raises(ValueError):
+        profiler.start("sampling", 0)
+    with pytest.raises(ValueError):
+        profiler.start("sampling", 1, interval_ms=0)
+    assert profiler.session is None
+
+
+def test_cprofile_session_profiles_forced_requests():
+    profiler = Profiler()
+    client = make_client(profiler)
+    profiler.start("cprofile", sample_rate=1e-12)
+    try:
+        client.get("/work/5", headers=FORCED)
+        client.get("/work/5", headers=FORCED)
+        client.get("/work/5")
+    finally:
+        status = profiler.stop()
+
+    assert status["active"] is False
+    assert status["mode"] == "cprofile"
+    assert status["routes"] == {ROUTE: {"requests": 2, "samples": 0}}
+
+    stats = marshal.loads(profiler.export("pstats", route=ROUTE))
+    calls = {
+        function: total_calls
+        for (_, _, function), (_, total_calls, *_) in stats.items()
+    }
+    # Once on the event loop and once on the executor thread per request
+    assert calls["busy_loop"] == 4
+    assert b"busy_loop" in profiler.export("text")
+    with pytest.raises(LookupError):
+        profiler.export("text", route="/other")
+    with pytest.raises(ValueError):
+        profiler.export("collapsed")
+
+
+def test_sampling_session_attributes_stacks_to_routes():
+    profiler = Profiler()
+    client = make_client(profiler)
+    profiler.start("sampling", sample_rate=1, interval_ms=1)
+    try:
+        client.get("/work/100")
+    finally:
+        status = profiler.stop()
+
+    assert status["routes"][ROUTE]["requests"] == 1
+    assert status["routes"][ROUTE]["samples"] > 0
+
+    lines = profiler.export("collapsed").decode().splitlines()
+    stacks = [line.rsplit(" ", 1) for line in lines]
+    assert all(stack.startswith(ROUTE) for stack, _ in stacks)
+    assert sum(int(count) for _, count in stacks) == status["routes"][ROUTE]["samples"]
+    busy = [
+        stack for stack, _ in stacks if stack.endswith(")") and "busy_loop" in stack
+    ]
+    # Sampled on the event loop (under the endpoint) and on the executor thread
+    endpoint = "make_client.<locals>.work ("
+    assert any(endpoint in stack for stack in busy)
+    assert any(endpoint not in stack for stack in busy)
+    with pytest.raises(ValueError):
+        profiler.export("pstats")
+
+
+if __name__ == "__main__":
+    test_disabled_profiling_endpoints_are_not_found()
+    test_requests_pass_through_without_a_session()
+    test_start_rejects_invalid_settings()
+    test_cprofile_session_profiles_forced_requests()
+    test_sampling_session_attributes_stacks_to_routes()
+    print("All profiling tests passed")
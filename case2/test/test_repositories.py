@@ -0,0 +1,290 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from app.models.schemas import PredictionResponse
+from app.repositories import columnar_student_repository
+from app.repositories.aggregates import StudentAggregates
+from app.repositories.columnar_student_repository import ColumnarStudentRepository
+from app.repositories.sorted_index import sort_value
+from app.repositories.sqlite_student_repository import SQLiteStudentRepository
+from app.repositories.student_repository import StudentRepository
+from test_prediction_service import random_students
+
+BACKENDS = ["memory", "sqlite", "columnar"]
+RISK_LEVELS = ["Low", "Medium", "High"]
+
+
+@pytest.fixture(params=BACKENDS)
+def repository(request, tmp_path):
+    if request.param == "memory":
+        repository = StudentRepository()
+    elif request.param == "sqlite":
+        repository = SQLiteStudentRepository(str(tmp_path / "students.db"))
+    else:
+        repository = ColumnarStudentRepository()
+    yield repository
+    repository.close()
+
+
+def random_predictions(n: int, seed: int) -> list:
+    """Predictions with ties on the performance, and some students without"""
+    rng = random.Random(seed)
+    predictions = []
+    for _ in range(n):
+        if rng.random() < 0.1:
+            predictions.append(None)
+            continue
+        low = int(rng.random() < 0.3)
+        predictions.append(
+            PredictionResponse(
+                performance_index_predicted=round(rng.uniform(10, 100), 1),
+                low_performance_predicted=low,
+                low_performance_probability=round(rng.random(), 4),
+                risk_level=rng.choice(RISK_LEVELS),
+            )
+        )
+    return predictions
+
+
+def populate(repository, n: int, seed: int = 0) -> list:
+    ids = [f"S{i:05d}" for i in range(n)]
+    rng = random.Random(seed)
+    rng.shuffle(ids)
+    repository.create_many(
+        ids,
+        [f"Student {i} ñ" for i in range(n)],
+        random_students(n, seed),
+        random_predictions(n, seed),
+        model_version="v1",
+    )
+    return ids
+
+
+def all_pages(repository, limit: int, sort_by: str, descending: bool, **filters):
+    students = []
+    cursor = None
+    while True:
+        page = repository.list_page(
+            limit, sort_by=sort_by, descending=descending, cursor=cursor, **filters
+        )
+        students += [student for _, student in page]
+        if len(page) < limit:
+            return students
+        cursor = page[-1][0]
+
+
+def expected_order(repository, sort_by: str, descending: bool, **filters):
+    students = [
+        student for student in repository.get_all() if matches(student, **filters)
+    ]
+    return sorted(
+        students,
+        key=lambda s: (sort_value(s, sort_by), s["student_id"]),
+        reverse=descending,
+    )
+
+
+def matches(student, risk_level=None, low_performance_predicted=None) -> bool:
+    prediction = student["prediction"]
+    if risk_level is not None and (
+        prediction is None or prediction["risk_level"] != risk_level
+    ):
+        return False
+    if low_performance_predicted is not None and (
+        prediction is None
+        or prediction["low_performance_predicted"] != low_performance_predicted
+    ):
+        return False
+    return True
+
+
+def assert_aggregates(repository):
+    expected = StudentAggregates.from_students(repository.get_all())
+    aggregates = repository.get_aggregates()
+    assert aggregates.snapshot() == expected.snapshot()
+    assert aggregates.sketch.bins == expected.sketch.bins
+    assert aggregates.sketch.count == expected.sketch.count
+
+
+def test_crud(repository):
+    (data,) = random_students(1, seed=1)
+    (prediction,) = [p for p in random_predictions(5, seed=1) if p][:1]
+
+    created = repository.create("A1", "Ana", data, prediction, "v1")
+    assert created["student_id"] == "A1"
+    assert created["prediction"] == prediction.model_dump()
+    assert created["model_version"] == "v1"
+    with pytest.raises(ValueError):
+        repository.create("A1", "Other", data)
+    with pytest.raises(ValueError):
+        repository.create_many(["B1", "A1"], ["B", "A"], [data, data], [None, None])
+    with pytest.raises(ValueError):
+        repository.create_many(["B1", "B1"], ["B", "B"], [data, data], [None, None])
+    assert repository.count() == 1
+
+    stored = repository.get_by_id("A1")
+    assert stored["name"] == "Ana"
+    assert stored["input_data"] == data.model_dump()
+    assert repository.get_by_id("missing") is None
+    assert repository.exists("A1") and not repository.exists("B1")
+    assert repository.existing_ids(["A1", "B1"]) == {"A1"}
+
+    (new_data,) = random_students(1, seed=2)
+    updated = repository.update("A1", name="Ana B", input_data=new_data)
+    assert updated["name"] == "Ana B"
+    assert updated["input_data"] == new_data.model_dump()
+    assert updated["prediction"] == prediction.model_dump()
+    assert updated["created_at"] == stored["created_at"]
+    assert updated["updated_at"] >= stored["updated_at"]
+    assert repository.update("missing", name="X") is None
+    assert repository.get_by_id("A1") == updated
+
+    assert repository.delete("A1")
+    assert not repository.delete("A1")
+    assert repository.get_by_id("A1") is None
+    assert repository.count() == 0
+    assert_aggregates(repository)
+
+
+def test_update_predictions_skips_current_and_missing(repository):
+    ids = populate(repository, 50)
+    predictions = random_predictions(50, seed=9)
+    scored = [p for p in predictions if p is not None]
+    targets = ids[: len(scored)]
+    repository.update_predictions(targets[:10], scored[:10], "v2")
+
+    assert (
+        repository.update_predictions(targets + ["missing"], scored + [scored[0]], "v2")
+        == len(targets) - 10
+    )
+    for student_id, prediction in zip(targets, scored):
+        student = repository.get_by_id(student_id)
+        assert student["prediction"] == prediction.model_dump()
+        assert student["model_version"] == "v2"
+    assert_aggregates(repository)
+
+
+@pytest.mark.parametrize("sort_by", ["created_at", "performance_index_predicted"])
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize(
+    "filters",
+    [{}, {"risk_level": "High"}, {"low_performance_predicted": 1}, {"risk_level": "X"}],
+)
+def test_keyset_pages(repository, sort_by, descending, filters):
+    populate(repository, 300)
+    expected = expected_order(repository, sort_by, descending, **filters)
+    pages = all_pages(repository, 17, sort_by, descending, **filters)
+    assert [s["student_id"] for s in pages] == [s["student_id"] for s in expected]
+    assert pages == expected
+
+
+def test_writes_keep_aggregates(repository):
+    ids = populate(repository, 400)
+    assert_aggregates(repository)
+
+    rng = random.Random(3)
+    predictions = random_predictions(100, seed=4)
+    for student_id, prediction in zip(rng.sample(ids, 100), predictions):
+        repository.update(student_id, prediction=prediction, model_version="v2")
+    assert_aggregates(repository)
+
+    for student_id in rng.sample(ids, 150):
+        repository.delete(student_id)
+    assert_aggregates(repository)
+
+    new_ids = [f"T{i}" for i in range(50)]
+    repository.create_many(
+        new_ids,
+        new_ids,
+        random_students(50, seed=5),
+        random_predictions(50, seed=5),
+        "v2",
+    )
+    assert_aggregates(repository)
+    assert repository.count() == 300
+
+
+def test_tombstone_compaction(repository, monkeypatch):
+    monkeypatch.setattr(columnar_student_repository, "COMPACT_MIN_ROWS", 16)
+    ids = populate(repository, 200)
+    deleted = set(ids[:150])
+    for student_id in ids[:150]:
+        assert repository.delete(student_id)
+
+    if isinstance(repository, ColumnarStudentRepository):
+        # The tombstones were dropped once they were the majority
+        assert repository._size < 200
+
+    assert repository.count() == 50
+    assert {s["student_id"] for s in repository.get_all()} == set(ids) - deleted
+    for student_id in ids[:160]:
+        assert repository.exists(student_id) == (student_id not in deleted)
+    for sort_by in ("created_at", "performance_index_predicted"):
+        assert all_pages(repository, 7, sort_by, False) == expected_order(
+            repository, sort_by, False
+        )
+    assert_aggregates(repository)
+
+    # Deleted IDs can be created again after compaction
+    (data,) = random_students(1, seed=6)
+    repository.create(ids[0], "Again", data)
+    assert repository.get_by_id(ids[0])["name"] == "Again"
+    assert_aggregates(repository)
+
+
+def test_sqlite_peers_share_stored_aggregates(tmp_path, monkeypatch):
+    path = str(tmp_path / "students.db")
+    first = SQLiteStudentRepository(path)
+    second = SQLiteStudentRepository(path)
+    ids = populate(first, 200)
+    for student_id, prediction in zip(ids[:40], random_predictions(40, seed=7)):
+        second.update(student_id, prediction=prediction, model_version="v2")
+    for student_id in ids[40:80]:
+        second.delete(student_id)
+
+    # Writes of the peer are read from the aggregate tables, without a scan
+    monkeypatch.setattr(
+        SQLiteStudentRepository,
+        "_scan_aggregates",
+        lambda self: pytest.fail("aggregates rebuilt with a scan"),
+    )
+    assert_aggregates(first)
+    assert_aggregates(second)
+    first.close()
+    second.close()
+
+    monkeypatch.undo()
+    reopened = SQLiteStudentRepository(path)
+    assert_aggregates(reopened)
+    reopened.close()
+
+
+def test_sqlite_stale_read_does_not_drift(tmp_path, monkeypatch):
+    path = str(tmp_path / "students.db")
+    repository = SQLiteStudentRepository(path)
+    peer = SQLiteStudentRepository(path)
+    ids = populate(repository, 20)
+    stale = {student_id: repository.get_by_id(student_id) for student_id in ids}
+    peer.delete(ids[0])
+    peer.delete(ids[1])
+
+    # The row was read before the peer deleted it
+    monkeypatch.setattr(
+        repository, "get_by_id", lambda student_id: stale.get(student_id)
+    )
+    assert repository.update(ids[0], name="Gone") is None
+    assert not repository.delete(ids[1])
+    monkeypatch.undo()
+
+    assert repository.count() == 18
+    assert_aggregates(repository)
+    repository.close()
+    peer.close()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
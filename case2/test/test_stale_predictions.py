@@ -0,0 +1,171 @@
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from app.config import Settings
+from app.repositories.student_repository import StudentRepository
+from app.services.linear_fast_path import LinearFastPath
+from app.services.model_loader import ModelBundle
+from app.services.prediction_executor import PredictionExecutor
+from app.services.prediction_service import PredictionService
+from app.services.rescore_job import RescoreJob
+from app.services.student_service import StudentService
+from test_prediction_service import load_models, random_students
+
+N_STUDENTS = 30
+
+
+def constant_bundle(version: str = "constant") -> ModelBundle:
+    fast_path = LinearFastPath(
+        np.zeros((5, 2)), np.array([50.0, 0.0]), np.array([0, 1])
+    )
+    return ModelBundle(None, None, None, fast_path, version)
+
+
+def stale_repository(service: PredictionService) -> StudentRepository:
+    repository = StudentRepository()
+    inputs = random_students(N_STUDENTS, seed=5)
+    repository.create_many(
+        [f"S{i:03d}" for i in range(N_STUDENTS)],
+        [f"Student {i}" for i in range(N_STUDENTS)],
+        inputs,
+        service.predict_many(inputs),
+        model_version="old",
+    )
+    return repository
+
+
+class ReloadingExecutor:
+    """Swaps in another bundle right before scoring, as a hot reload would"""
+
+    def __init__(self, service: PredictionService, bundle: ModelBundle):
+        self.service = service
+        self.bundle = bundle
+        self.retry_after_seconds = 0
+        self.calls = 0
+
+    async def predict_many_versioned(self, students):
+        self.calls += 1
+        self.service.model_loader.swap(self.bundle)
+        return self.service.predict_many_versioned(students)
+
+
+def test_reads_refresh_stale_rows_on_the_executor():
+    loader, bundle = load_models()
+    service = PredictionService(loader)
+    repository = stale_repository(service)
+    executor = PredictionExecutor(
+        service, Settings(PREDICTION_EXECUTOR="thread", PREDICTION_WORKERS=1)
+    )
+    students = StudentService(repository, service, executor=executor)
+    try:
+        page = asyncio.run(students.list_students(limit=N_STUDENTS))
+    finally:
+        executor.shutdown()
+
+    assert executor.stats()["completed"] == 1
+    for item in page.items:
+        stored = repository.get_by_id(item["student_id"])
+        assert item["model_version"] == stored["model_version"] == bundle.version
+
+
+def test_refresh_tags_the_version_that_scored():
+    loader, _ = load_models()
+    service = PredictionService(loader)
+    repository = stale_repository(service)
+    reloaded = constant_bundle()
+    students = StudentService(
+        repository, service, executor=ReloadingExecutor(service, reloaded)
+    )
+
+    student = json.loads(asyncio.run(students.get_student_json("S000")))
+
+    assert student["model_version"] == "constant"
+    assert student["prediction"]["performance_index_predicted"] == 50.0
+    assert repository.get_by_id("S000")["model_version"] == "constant"
+
+
+def test_saturated_executor_serves_stored_predictions():
+    loader, _ = load_models()
+    service = PredictionService(loader)
+    repository = stale_repository(service)
+    executor = PredictionExecutor(
+        service, Settings(PREDICTION_EXECUTOR="thread", PREDICTION_QUEUE_SIZE=0)
+    )
+    students = StudentService(repository, service, executor=executor)
+    try:
+        student = asyncio.run(students.get_student("S000"))
+    finally:
+        executor.shutdown()
+
+    assert student.model_version == "old"
+    assert executor.stats()["rejected"] == 1
+
+
+def export_rows(students: StudentService, **filters) -> list:
+    async def collect():
+        chunks = []
+        async for chunk in students.export_students(chunk_size=7, **filters):
+            chunks.append(chunk)
+        return chunks
+
+    return [json.loads(line) for line in "".join(asyncio.run(collect())).splitlines()]
+
+
+def test_export_refreshes_stale_rows_in_created_at_order():
+    loader, bundle = load_models()
+    service = PredictionService(loader)
+    students = StudentService(stale_repository(service), service)
+
+    rows = export_rows(students)
+
+    assert len(rows) == N_STUDENTS
+    assert {row["model_version"] for row in rows} == {bundle.version}
+
+
+def test_export_sorted_on_predictions_keeps_stored_rows():
+    loader, _ = load_models()
+    service = PredictionService(loader)
+    students = StudentService(stale_repository(service), service)
+    loader.swap(constant_bundle())
+
+    # Refreshing would move rows past the keyset cursor, so they stay stale
+    rows = export_rows(students, sort_by="performance_index_predicted")
+
+    assert sorted(row["student_id"] for row in rows) == [
+        f"S{i:03d}" for i in range(N_STUDENTS)
+    ]
+    assert {row["model_version"] for row in rows} == {"old"}
+
+
+def test_rescore_job_stores_the_version_that_scored():
+    loader, _ = load_models()
+    service = PredictionService(loader)
+    repository = stale_repository(service)
+    executor = ReloadingExecutor(service, constant_bundle())
+    job = RescoreJob(repository, service, executor, chunk_size=7)
+
+    async def run():
+        job.start()
+        await job._task
+
+    asyncio.run(run())
+
+    assert job.progress()["status"] == "completed"
+    assert job.model_version == "constant"
+    assert job.rescored == N_STUDENTS
+    assert {s["model_version"] for s in repository.get_all()} == {"constant"}
+
+
+if __name__ == "__main__":
+    test_reads_refresh_stale_rows_on_the_executor()
+    test_refresh_tags_the_version_that_scored()
+    test_saturated_executor_serves_stored_predictions()
+    test_export_refreshes_stale_rows_in_created_at_order()
+    test_export_sorted_on_predictions_keeps_stored_rows()
+    test_rescore_job_stores_the_version_that_scored()
+    print("All stale prediction tests passed")
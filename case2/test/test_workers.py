@@ -0,0 +1,167 @@
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+import uvicorn
+from app import main
+from app.config import Settings
+from app.services.container import ServiceContainer
+from benchmarks.bench_cold_start import free_port
+from benchmarks.bench_workers import STUDENT_INPUT, wait_healthy
+from uvicorn.server import ServerState
+
+CASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("backend", ["memory", "columnar"])
+def test_container_refuses_private_backends_with_workers(backend):
+    with pytest.raises(ValueError, match="REPOSITORY_BACKEND=sqlite"):
+        ServiceContainer(Settings(WORKERS=2, REPOSITORY_BACKEND=backend))
+
+
+def test_container_accepts_sqlite_with_workers():
+    with tempfile.TemporaryDirectory() as directory:
+        container = ServiceContainer(
+            Settings(
+                WORKERS=2,
+                REPOSITORY_BACKEND="sqlite",
+                SQLITE_PATH=os.path.join(directory, "students.db"),
+            )
+        )
+        container.repository.close()
+
+
+def test_serve_runs_uvicorn_with_workers(monkeypatch):
+    calls = []
+    monkeypatch.setattr(uvicorn, "run", lambda *args, **kwargs: calls.append(kwargs))
+
+    monkeypatch.setattr(main, "settings", Settings(WORKERS=3))
+    main.serve()
+    monkeypatch.setattr(main, "settings", Settings(WORKERS=3, TCP_NODELAY=False))
+    main.serve()
+    monkeypatch.setattr(main, "settings", Settings(WORKERS=3, DEBUG=True))
+    main.serve()
+
+    assert [c["workers"] for c in calls] == [3, 3, None]
+    assert [c["http"] for c in calls] == [
+        "app.main:NoDelayHTTPProtocol",
+        "auto",
+        "app.main:NoDelayHTTPProtocol",
+    ]
+    assert calls[2]["reload"] is True
+
+
+def accepted_nodelay(http: str) -> int:
+    """TCP_NODELAY of a connection accepted on a socket bound like uvicorn's"""
+
+    async def accept():
+        config = uvicorn.Config(main.app, http=http)
+        config.load()
+        state = ServerState()
+        # uvicorn binds the socket shared by the workers with protocol 0
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(("127.0.0.1", 0))
+        server = await asyncio.get_running_loop().create_server(
+            lambda: config.http_protocol_class(config, state, {}), sock=sock
+        )
+        _, writer = await asyncio.open_connection(*sock.getsockname())
+        while not state.connections:
+            await asyncio.sleep(0.01)
+        (protocol,) = state.connections
+        nodelay = protocol.transport.get_extra_info("socket").getsockopt(
+            socket.IPPROTO_TCP, socket.TCP_NODELAY
+        )
+        writer.close()
+        server.close()
+        return nodelay
+
+    return asyncio.run(accept())
+
+
+def test_nodelay_protocol_sets_tcp_nodelay():
+    assert accepted_nodelay("auto") == 0
+    assert accepted_nodelay("app.main:NoDelayHTTPProtocol") != 0
+
+
+def request(port: int, method: str, path: str, body=None) -> dict:
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(
+        f"http://127.0.0.1:{port}{path}",
+        data=data,
+        method=method,
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(req, timeout=5) as response:
+        return json.load(response)
+
+
+def worker_processes(pid: int) -> int:
+    """Counts the spawned worker processes of the uvicorn supervisor"""
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        children = f.read().split()
+    count = 0
+    for child in children:
+        with open(f"/proc/{child}/cmdline", "rb") as f:
+            count += b"spawn_main" in f.read()
+    return count
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="inspects /proc")
+def test_workers_share_the_sqlite_repository():
+    port = free_port()
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            **os.environ,
+            "HOST": "127.0.0.1",
+            "PORT": str(port),
+            "WORKERS": "2",
+            "REPOSITORY_BACKEND": "sqlite",
+            "SQLITE_PATH": os.path.join(directory, "students.db"),
+        }
+        process = subprocess.Popen(
+            [sys.executable, "-m", "app.main"],
+            cwd=CASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_healthy(port)
+            assert worker_processes(process.pid) == 2
+
+            for i in range(10):
+                request(
+                    port,
+                    "POST",
+                    "/api/v1/students/",
+                    {"student_id": f"W{i}", "name": "W", "input_data": STUDENT_INPUT},
+                )
+            # Every read opens a new connection, so both workers answer some
+            for i in range(10):
+                assert request(port, "GET", f"/api/v1/students/W{i}")["student_id"] == (
+                    f"W{i}"
+                )
+            assert (
+                request(port, "GET", "/api/v1/students/stats/summary")["total_students"]
+                == 10
+            )
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    for backend in ("memory", "columnar"):
+        test_container_refuses_private_backends_with_workers(backend)
+    test_container_accepts_sqlite_with_workers()
+    test_nodelay_protocol_sets_tcp_nodelay()
+    test_workers_share_the_sqlite_repository()
+    print("All worker tests passed")
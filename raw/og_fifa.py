@@ -1,9 +1,16 @@
 import ast
+import sys
+from pathlib import Path
 
 import pandas as pd
 
-worldcup = "https://raw.githubusercontent.com/daramireh/simonBolivarCienciaDatos/refs/heads/main/world_cup_women.csv"
-matches = "https://raw.githubusercontent.com/daramireh/simonBolivarCienciaDatos/refs/heads/main/matches_1991_2023.csv"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "case1"))
+from services.dataset import FifaDataset
+
+# Local copies of the source CSVs, downloaded once
+dataset = FifaDataset()
+worldcup = dataset.source_file("world_cup")
+matches = dataset.source_file("matches")
 
 df_worldcup = pd.read_csv(worldcup)
 df_matches = pd.read_csv(matches)